@@ -0,0 +1,171 @@
+"""Shared helpers of benchmarks: timing, reports and synthetic data."""
+import json
+import os
+from pathlib import Path
+import platform
+import random
+from statistics import mean, median
+import sys
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+REPORT_VERSION = 1
+
+WORDS = (
+    "weather music bilibili github genshin arknights chat gpt image "
+    "translate dice fortune sign status help admin group poke rss "
+    "calendar wordcloud emoji meme quote repeat abstract pixiv steam "
+    "minecraft osu epic news stock bot manager reminder bank game"
+).split()
+TAG_COLORS = ("#ea5252", "#52ea5f", "#5262ea", "#eacd52", "#8d52ea")
+VERSIONS = ("0.1.0", "1.0.0", "1.2.3", "2.0.0b1", "23.1")
+
+
+def summarize(name: str, samples: List[float], **params: Any) -> Dict[str, Any]:
+    """Summarize timing samples (in seconds) as a result record."""
+    ordered = sorted(samples)
+    return {
+        "name": name,
+        "params": params,
+        "unit": "s",
+        "runs": len(samples),
+        "min": ordered[0],
+        "median": median(ordered),
+        "p95": ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))],
+        "mean": mean(ordered),
+    }
+
+
+def measure(func: Callable[[], Any], repeat: int, setup: Optional[Callable[[], Any]] = None) -> List[float]:
+    """Time `func` for `repeat` times, calling `setup` untimed before each."""
+    samples = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        t = time.perf_counter()
+        func()
+        samples.append(time.perf_counter() - t)
+    return samples
+
+
+def report(results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Wrap result records with information of the environment."""
+    try:
+        from importlib.metadata import version
+        pkgver = version("nonebot-desktop-tk")
+    except Exception:
+        pkgver = None
+    return {
+        "version": REPORT_VERSION,
+        "package": pkgver,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "time": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "results": results,
+    }
+
+
+def write_report(results: List[Dict[str, Any]], output: Optional[Path]) -> None:
+    """Print results as JSON lines, and save the full report if asked."""
+    for r in results:
+        print(json.dumps(r), flush=True)
+    if output is not None:
+        output.write_text(json.dumps(report(results), indent=2), encoding="utf-8")
+        print(f"[benchmarks] Report saved to {output}", file=sys.stderr)
+
+
+def make_plugins(n: int, seed: int = 0) -> List[Dict[str, Any]]:
+    """Make a synthetic plugin registry in the format of `plugins.json`."""
+    rnd = random.Random(seed)
+    plugins = []
+    for i in range(n):
+        words = rnd.sample(WORDS, 3)
+        slug = "_".join(words[:2]) + f"_{i}"
+        plugins.append({
+            "module_name": f"nonebot_plugin_{slug}",
+            "project_link": f"nonebot-plugin-{slug.replace('_', '-')}",
+            "name": " ".join(w.capitalize() for w in words[:2]),
+            "desc": " ".join(rnd.choices(WORDS, k=12)),
+            "author": f"{rnd.choice(WORDS)}{rnd.randrange(100)}",
+            "homepage": f"https://github.com/example/{slug}",
+            "tags": [
+                {"label": w, "color": rnd.choice(TAG_COLORS)}
+                for w in rnd.sample(WORDS, rnd.randrange(4))
+            ],
+            "is_official": rnd.random() < 0.05,
+        })
+    return plugins
+
+
+def make_modules(kind: str, n: int) -> List[Dict[str, str]]:
+    """Make a synthetic driver or adapter registry."""
+    return [
+        {
+            "name": f"{kind.capitalize()} {i}",
+            "module_name": f"nonebot.{kind}s.m{i}",
+            "project_link": f"nonebot-{kind}-m{i}",
+            "desc": f"synthetic {kind} {i}",
+        }
+        for i in range(n)
+    ]
+
+
+def make_project(root: Path, ndists: int, plugins: List[Dict[str, Any]], seed: int = 0) -> Path:
+    """
+    Make a synthetic project with a venv of `ndists` distributions.
+
+    Some plugins of the registry are installed and enabled, so that state
+    updaters have work to do.
+    """
+    rnd = random.Random(seed)
+    root.mkdir(parents=True, exist_ok=True)
+    sp = root / ".venv" / "lib" / f"python{sys.version_info[0]}.{sys.version_info[1]}" / "site-packages"
+    sp.mkdir(parents=True, exist_ok=True)
+    picked = rnd.sample(plugins, min(len(plugins), ndists // 2))
+    names = [pl["project_link"] for pl in picked]
+    names += [f"synthetic-dist-{i}" for i in range(ndists - len(names))]
+    for name in names:
+        ver = rnd.choice(VERSIONS)
+        di = sp / f"{name.replace('-', '_')}-{ver}.dist-info"
+        di.mkdir(exist_ok=True)
+        (di / "METADATA").write_text(
+            "Metadata-Version: 2.1\n"
+            f"Name: {name}\n"
+            f"Version: {ver}\n"
+            f"Summary: synthetic distribution {name}\n"
+            "Requires-Dist: nonebot2 (>=2.0.0)\n"
+            "\n"
+            "Long description.\n",
+            encoding="utf-8"
+        )
+    enabled = [pl["module_name"] for pl in picked[: len(picked) // 2]]
+    (root / "pyproject.toml").write_text(
+        "[project]\n"
+        'name = "synthetic"\n'
+        'version = "0.1.0"\n\n'
+        "[tool.nonebot]\n"
+        'adapters = [{name = "Adapter 0", module_name = "nonebot.adapters.m0"}]\n'
+        f"plugins = {json.dumps(enabled)}\n"
+        "plugin_dirs = []\n",
+        encoding="utf-8"
+    )
+    (root / ".env").write_text("ENVIRONMENT=dev\nDRIVER=nonebot.drivers.m0\n", encoding="utf-8")
+    (root / ".env.dev").write_text("HOST=127.0.0.1\nPORT=8080\n", encoding="utf-8")
+    return root
+
+
+def isolate(tmp: Path) -> None:
+    """Keep caches and registries of benchmarks away from the user's."""
+    os.environ["XDG_CACHE_HOME"] = str(tmp / "cache")
+    os.environ["LOCALAPPDATA"] = str(tmp / "cache")
+    # never download registries during benchmarks
+    os.environ["NBDESKTOP_REGISTRY_URL"] = "http://127.0.0.1:9/{name}.json"
+
+
+def use_registry(name: str, data: List[Dict[str, Any]]) -> None:
+    """Replace a registry in memory, without touching its snapshot."""
+    from nonebot_desktop_tk.registry import registry
+    snap = registry.snapshots[name]
+    with snap.lock:
+        snap._loaded = True
+        snap.data = data
@@ -0,0 +1,47 @@
+"""
+Compare two benchmark reports saved by `--output`.
+
+Results are matched by name and parameters. Exits with 1 if any median
+grows more than the threshold.
+"""
+import argparse
+import json
+from pathlib import Path
+import sys
+from typing import Any, Dict, Tuple
+
+
+def load(fp: Path) -> Dict[Tuple[str, str], Dict[str, Any]]:
+    data = json.loads(fp.read_text(encoding="utf-8"))
+    return {
+        (r["name"], json.dumps(r["params"], sort_keys=True)): r
+        for r in data["results"]
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("base", type=Path, help="report of the old release")
+    parser.add_argument("head", type=Path, help="report of the new release")
+    parser.add_argument("--threshold", type=float, default=0.2, help="allowed growth of medians")
+    args = parser.parse_args()
+
+    base, head = load(args.base), load(args.head)
+    regressions = 0
+    print(f"{'benchmark':<44} {'params':<28} {'base':>10} {'head':>10} {'change':>8}")
+    for key in sorted(base.keys() & head.keys()):
+        b, h = base[key]["median"], head[key]["median"]
+        change = (h - b) / b if b else 0.0
+        flag = ""
+        if change > args.threshold:
+            flag = "  REGRESSION"
+            regressions += 1
+        params = " ".join(f"{k}={v}" for k, v in head[key]["params"].items())
+        print(f"{key[0]:<44} {params:<28} {b * 1000:>8.2f}ms {h * 1000:>8.2f}ms {change:>+7.0%}{flag}")
+    for key in sorted(base.keys() ^ head.keys()):
+        print(f"{key[0]:<44} {key[1]:<28} only in {'base' if key in base else 'head'}")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,334 @@
+"""
+Benchmarks of GUI hot paths, fed with synthetic registries and venvs.
+
+Paths needing Tk run in a withdrawn `tk.Tk()`, so a display is required,
+e.g. `xvfb-run -a python benchmarks/run.py`. `--no-gui` runs only the
+paths without Tk. Each result is printed as a JSON line; `--output` saves
+a full report to be compared by `benchmarks/compare.py`.
+"""
+import argparse
+from pathlib import Path
+import shutil
+import sys
+from tempfile import TemporaryDirectory
+import time
+from typing import Any, Callable, Dict, List
+
+from common import (
+    isolate, make_modules, make_plugins, make_project, measure, summarize,
+    use_registry, write_report
+)
+
+PLUGIN_SIZES = (100, 1000, 10000)
+DIST_SIZES = (50, 200, 1000)
+NDRIVERS = 10
+NADAPTERS = 30
+STORE_DISTS = 200
+LOG_SIZES = (10000, 100000, 500000)
+LOG_LEVELS = ("DEBUG", "INFO", "INFO", "SUCCESS", "WARNING", "ERROR")
+ENV_SIZES = (50, 500, 5000)
+GRAPH_SIZES = (100, 500, 2000)
+# typed one character at a time, including a typo and a second keyword
+QUERIES = ("weather", "wether", "music bili", "nonebot_plugin_g")
+
+Results = List[Dict[str, Any]]
+
+
+def bench_search(results: Results, plugins: List[Dict[str, Any]], repeat: int) -> None:
+    from nonebot_desktop_tk.pluginsearch import PluginSearchIndex
+
+    n = len(plugins)
+    results.append(summarize("PluginSearchIndex.build", measure(lambda: PluginSearchIndex(plugins), repeat), plugins=n))
+    samples: List[float] = []
+    for _ in range(repeat):
+        idx = PluginSearchIndex(plugins)
+        for q in QUERIES:
+            for end in range(1, len(q) + 1):
+                t = time.perf_counter()
+                idx.rank(q[:end])
+                samples.append(time.perf_counter() - t)
+    results.append(summarize("PluginSearchIndex.rank.keystroke", samples, plugins=n))
+
+
+def bench_distindex(results: Results, project: Path, ndists: int, repeat: int) -> None:
+    from nonebot_desktop_tk.distindex import DistIndex
+
+    def cold():
+        DistIndex._instances.clear()
+        shutil.rmtree(DistIndex.of(project).cachefile.parent, ignore_errors=True)
+        DistIndex._instances.clear()
+
+    results.append(summarize("DistIndex.scan.cold", measure(lambda: DistIndex.of(project).scan(), repeat, cold), dists=ndists))
+    results.append(summarize("DistIndex.scan.warm", measure(lambda: DistIndex.of(project).scan(), repeat), dists=ndists))
+
+
+def make_log(n: int) -> List[str]:
+    lines = []
+    for i in range(n):
+        if i % 97 == 1:
+            lines.append(f'  File "bot.py", line {i}, in <module>')
+        else:
+            lines.append(
+                f"08-14 12:{i // 60 % 60:02}:{i % 60:02} [{LOG_LEVELS[i % len(LOG_LEVELS)]}] "
+                f"nonebot_plugin_{i % 20} | handled message {i} from user {i * 7919 % 100000}"
+            )
+    return lines
+
+
+def bench_logstore(results: Results, lines: List[str], repeat: int) -> None:
+    from nonebot_desktop_tk.logstore import LEVEL_NO, LogFilter, LogStore, match
+
+    n = len(lines)
+    stores: List[LogStore] = []
+
+    def fill():
+        store = LogStore()
+        for line in lines:
+            store.append("out", line)
+        stores.append(store)
+
+    results.append(summarize("LogStore.append", measure(fill, repeat), lines=n))
+    snap = stores[-1].snapshot()
+    for name, flt in (
+        ("level", LogFilter(LEVEL_NO["WARNING"])),
+        ("module", LogFilter(module="nonebot_plugin_7")),
+        ("regex", LogFilter(pattern=r"user 4\d{3}$")),
+    ):
+        results.append(summarize(f"LogStore.match.{name}", measure(lambda: match(snap, flt), repeat), lines=n))
+    for store in stores:
+        store.close()
+
+
+def bench_dotenv(results: Results, root: Path, nkeys: int, repeat: int) -> None:
+    from nonebot_desktop_wing import recursive_find_env_config
+    from nonebot_desktop_tk.envindex import EnvIndex, patch_env_file, read_env_file
+
+    root.mkdir()
+    envf = root / ".env.prod"
+    envf.write_text("".join(
+        f"# option {n}\nCONFIG_{n}=value {n}\n" + ("\n" if n % 10 == 0 else "") for n in range(nkeys)
+    ) + "DRIVER=~fastapi\n")
+
+    results.append(summarize("recursive_find_env_config.wing", measure(lambda: recursive_find_env_config(root, "DRIVER"), repeat), keys=nkeys))
+    results.append(summarize("EnvIndex.get.warm", measure(lambda: EnvIndex.of(root).get("DRIVER"), repeat), keys=nkeys))
+    results.append(summarize("read_env_file", measure(lambda: read_env_file(envf), repeat), keys=nkeys))
+    results.append(summarize("patch_env_file", measure(lambda: patch_env_file(envf, {"CONFIG_1": "changed"}), repeat), keys=nkeys))
+
+
+def make_records(n: int, seed: int = 0) -> List[Any]:
+    import random
+    from nonebot_desktop_tk.distindex import DistRecord
+
+    rnd = random.Random(seed)
+    markers = ("", ' ; python_version >= "3.8"', ' ; sys_platform == "win32"', ' ; extra == "dev"')
+    res = []
+    for i in range(n):
+        reqs = tuple(
+            f"Synthetic_Dist.{j} (>=1.0){rnd.choice(markers)}"
+            for j in rnd.sample(range(i), min(i, rnd.randint(0, 6)))
+        )
+        res.append(DistRecord(f"synthetic-dist-{i}", "1.0.0", "", reqs, "", (0, 0)))
+    return res
+
+
+def bench_depgraph(results: Results, records: List[Any], repeat: int) -> None:
+    from nonebot_desktop_tk.depgraph import DepGraph
+
+    n = len(records)
+    results.append(summarize("DepGraph.build", measure(lambda: DepGraph(records), repeat), dists=n))
+    graph = DepGraph(records)
+    keys = list(graph.records)[::max(n // 20, 1)]
+    results.append(summarize("DepGraph.removal_closure", measure(lambda: [graph.removal_closure(k) for k in keys], repeat), dists=n, packages=len(keys)))
+
+
+class GUIBench:
+    def __init__(self, repeat: int) -> None:
+        import tkinter as tk
+        from nonebot_desktop_tk import gui
+
+        # grabs fail on windows which are not viewable yet, and are
+        # irrelevant to timing
+        tk.Misc.grab_set = lambda self: None  # type: ignore
+        self.tk = tk
+        self.gui = gui
+        self.repeat = repeat
+        self.root = tk.Tk()
+        self.root.withdraw()
+        self.app = gui.MainApp(self.root)
+        self.app.warm_up = lambda: None  # type: ignore
+        self.context = self.app.context
+        self.root.update()
+
+    def pump_until(self, cond: Callable[[], bool], timeout: float = 30.0) -> None:
+        deadline = time.perf_counter() + timeout
+        while not cond():
+            if time.perf_counter() > deadline:
+                raise TimeoutError("condition not met in time")
+            self.root.update()
+            time.sleep(0.0005)
+
+    def open_project(self, project: Path) -> None:
+        cwd = str(project)
+        self.context.cwd_str = cwd
+        self.pump_until(lambda: self.context.distroot == cwd)
+        if self.context.watcher is not None:
+            self.context.watcher.stop()
+
+    def sub(self, cls: type) -> Any:
+        return cls(self.app.win.sub_window(), self.context)
+
+    def bench_upddists(self, results: Results, ndists: int) -> None:
+        from nonebot_desktop_tk.distindex import DistIndex
+        ctx = self.context
+        cwd = ctx.cwd_str
+
+        def reset():
+            DistIndex._instances.clear()
+            shutil.rmtree(DistIndex.of(cwd).cachefile.parent, ignore_errors=True)
+            DistIndex._instances.clear()
+            ctx.distroot = None
+
+        def run():
+            ctx.upddists(cwd)
+            ctx.uiqueue.drain()
+            self.root.update_idletasks()
+
+        results.append(summarize("Context.upddists.cold", measure(run, self.repeat, reset), dists=ndists))
+        results.append(summarize("Context.upddists.warm", measure(run, self.repeat), dists=ndists))
+
+    def bench_envmanager(self, results: Results, ndists: int) -> None:
+        ctx = self.context
+        cwd = ctx.cwd_str
+        win = self.sub(self.gui.EnvironmentManager)
+
+        def clear():
+            ctx.distroot = None
+            ctx.curdists = []
+            ctx.curdistnames = []
+            ctx.distvar.set([])  # type: ignore
+            self.root.update_idletasks()
+
+        def populate():
+            ctx.upddists(cwd)
+            ctx.uiqueue.drain()
+            self.root.update_idletasks()
+
+        results.append(summarize("EnvironmentManager.populate", measure(populate, self.repeat, clear), dists=ndists))
+        win.win.base.destroy()
+
+    def bench_state_updators(self, results: Results, ndists: int) -> None:
+        dm = self.sub(self.gui.DriverManager)
+        results.append(summarize(
+            "DriverManager.driver_st_updator", measure(dm.driver_st_updator, self.repeat),
+            dists=ndists, drivers=NDRIVERS
+        ))
+        dm.win.base.destroy()
+        am = self.sub(self.gui.AdapterManager)
+        results.append(summarize(
+            "AdapterManager.adapter_st_updator", measure(am.adapter_st_updator, self.repeat),
+            dists=ndists, adapters=NADAPTERS
+        ))
+        am.win.base.destroy()
+
+    def bench_store(self, results: Results, nplugins: int) -> None:
+        stores: List[Any] = []
+
+        def open_store():
+            stores.append(self.sub(self.gui.PluginStore))
+            self.root.update_idletasks()
+
+        def close_store():
+            while stores:
+                stores.pop().win.base.destroy()
+            self.root.update()
+
+        results.append(summarize("PluginStore.open", measure(open_store, self.repeat, close_store), plugins=nplugins))
+        store = stores[-1]
+
+        def flip():
+            store.chpage(1)
+            self.root.update_idletasks()
+
+        results.append(summarize("PluginStore.update_page.flip", measure(flip, self.repeat * 5), plugins=nplugins))
+
+        # latency from a keystroke to the page showing its result
+        applied: List[int] = []
+        apply_search = store._apply_search
+
+        def _apply_search(gen: int, found: List[int]):
+            apply_search(gen, found)
+            applied.append(gen)
+
+        store._apply_search = _apply_search
+        samples: List[float] = []
+        for _ in range(self.repeat):
+            for q in QUERIES:
+                for end in range(1, len(q) + 1):
+                    t = time.perf_counter()
+                    store.searchvar.set(q[:end])
+                    gen = store.search_worker.generation
+                    self.pump_until(lambda: bool(applied) and applied[-1] == gen)
+                    self.root.update_idletasks()
+                    samples.append(time.perf_counter() - t)
+                store.searchvar.set("")
+        results.append(summarize("PluginStore.do_search.keystroke", samples, plugins=nplugins))
+        close_store()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-r", "--repeat", type=int, default=5, help="runs of each case")
+    parser.add_argument("--quick", action="store_true", help="skip the largest sizes")
+    parser.add_argument("--no-gui", action="store_true", help="skip paths needing Tk")
+    parser.add_argument("-o", "--output", type=Path, help="save a full report in JSON")
+    args = parser.parse_args()
+
+    plugin_sizes = PLUGIN_SIZES[:-1] if args.quick else PLUGIN_SIZES
+    dist_sizes = DIST_SIZES[:-1] if args.quick else DIST_SIZES
+    log_sizes = LOG_SIZES[:-1] if args.quick else LOG_SIZES
+    env_sizes = ENV_SIZES[:-1] if args.quick else ENV_SIZES
+    graph_sizes = GRAPH_SIZES[:-1] if args.quick else GRAPH_SIZES
+    results: Results = []
+
+    with TemporaryDirectory(prefix="nbdesktop-bench-") as tmpdir:
+        tmp = Path(tmpdir)
+        isolate(tmp)
+        registries = {n: make_plugins(n) for n in plugin_sizes}
+        projects = {
+            n: make_project(tmp / f"project-{n}", n, registries[plugin_sizes[0]])
+            for n in (*dist_sizes, STORE_DISTS)
+        }
+
+        for n, plugins in registries.items():
+            bench_search(results, plugins, args.repeat)
+        for n in dist_sizes:
+            bench_distindex(results, projects[n], n, args.repeat)
+        for n in log_sizes:
+            bench_logstore(results, make_log(n), args.repeat)
+        for n in env_sizes:
+            bench_dotenv(results, tmp / f"dotenv-{n}", n, args.repeat)
+        for n in graph_sizes:
+            bench_depgraph(results, make_records(n), args.repeat)
+
+        if not args.no_gui:
+            use_registry("drivers", make_modules("driver", NDRIVERS))
+            use_registry("adapters", make_modules("adapter", NADAPTERS))
+            use_registry("plugins", registries[plugin_sizes[0]])
+            bench = GUIBench(args.repeat)
+            for n in dist_sizes:
+                bench.open_project(projects[n])
+                bench.bench_upddists(results, n)
+                bench.bench_envmanager(results, n)
+                bench.bench_state_updators(results, n)
+            bench.open_project(projects[STORE_DISTS])
+            for n, plugins in registries.items():
+                use_registry("plugins", plugins)
+                bench.bench_store(results, n)
+            bench.root.destroy()
+
+    write_report(results, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
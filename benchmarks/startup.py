@@ -0,0 +1,89 @@
+"""
+Time-to-first-frame benchmark of the main window.
+
+Each run starts a fresh interpreter, builds `MainApp` and stops at its first
+idle callback (right after `MainApp.on_first_frame`). The run fails if a
+heavy module is imported before the first frame, or if the median time
+exceeds the budget or grows too much against a saved baseline.
+
+Needs a display, e.g. `xvfb-run python benchmarks/startup.py`.
+"""
+import argparse
+import json
+from pathlib import Path
+import subprocess
+import sys
+import time
+
+from common import summarize, write_report
+
+HEAVY_MODULES = ("nonebot_desktop_wing", "nb_cli", "dotenv", "httpx")
+
+CHILD = f"""
+import json, sys, time
+import tkinter as tk
+from nonebot_desktop_tk import gui
+
+root = tk.Tk()
+app = gui.MainApp(root)
+
+def done():
+    print(json.dumps({{
+        "wall": time.time(),
+        "first_frame": app.first_frame_at - gui.t0,
+        "heavy": [m for m in {HEAVY_MODULES!r} if m in sys.modules],
+    }}))
+    root.destroy()
+
+root.after_idle(done)
+root.mainloop()
+"""
+
+
+def run_once() -> dict:
+    start = time.time()
+    out = subprocess.run(
+        [sys.executable, "-c", CHILD], check=True, capture_output=True, text=True
+    ).stdout
+    res = json.loads(out.strip().splitlines()[-1])
+    res["process"] = res.pop("wall") - start
+    return res
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("-n", "--runs", type=int, default=7, help="number of fresh processes")
+    parser.add_argument("--budget", type=float, default=2.0, help="max median seconds from process start")
+    parser.add_argument("--baseline", type=Path, help="report saved by a previous run")
+    parser.add_argument("--max-growth", type=float, default=0.25, help="allowed growth against baseline")
+    parser.add_argument("-o", "--output", type=Path, help="save a full report in JSON")
+    args = parser.parse_args()
+
+    runs = [run_once() for _ in range(args.runs)]
+    process = summarize("startup.first_frame.process", [r["process"] for r in runs])
+    imported = summarize("startup.first_frame.import", [r["first_frame"] for r in runs])
+    write_report([process, imported], args.output)
+
+    failures = []
+    heavy = sorted({m for r in runs for m in r["heavy"]})
+    if heavy:
+        failures.append(f"imported before first frame: {', '.join(heavy)}")
+    if process["median"] > args.budget:
+        failures.append(f"median {process['median']:.3f}s exceeds budget {args.budget:.3f}s")
+    if args.baseline is not None and args.baseline.is_file():
+        base = {
+            r["name"]: r for r in json.loads(args.baseline.read_text(encoding="utf-8"))["results"]
+        }[process["name"]]["median"]
+        if process["median"] > base * (1 + args.max_growth):
+            failures.append(
+                f"median {process['median']:.3f}s grew more than "
+                f"{args.max_growth:.0%} against baseline {base:.3f}s"
+            )
+
+    for f in failures:
+        print(f"[startup] FAIL: {f}", file=sys.stderr)
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,3 +1,22 @@
-from nonebot_desktop_tk.gui import start_window
+from argparse import REMAINDER, SUPPRESS, ArgumentParser
+import sys
 
-start_window()
\ No newline at end of file
+from nonebot_desktop_tk import instrument
+
+parser = ArgumentParser(prog="nonebot_desktop_tk", description="NoneBot2 GUI manager written with tkinter.")
+parser.add_argument(
+    "--trace", metavar="FILE", nargs="?", const="1",
+    help="write profiling spans to FILE (`.json` for Chrome trace format, JSON lines otherwise)"
+)
+# pip installs through the shared wheel store run in a process of this app
+parser.add_argument("--wheel-store", nargs=REMAINDER, help=SUPPRESS)
+args = parser.parse_args()
+if args.wheel_store is not None:
+    from nonebot_desktop_tk.wheelstore import main
+    sys.exit(main(args.wheel_store))
+if args.trace:
+    instrument.enable(args.trace)
+
+from nonebot_desktop_tk.gui import start_window  # noqa: E402
+
+start_window()
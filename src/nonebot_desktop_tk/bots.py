@@ -0,0 +1,253 @@
+from pathlib import Path
+import time
+from typing import Any, Callable, Dict, Iterator, List, NamedTuple, Optional, Set, Union
+
+from nonebot_desktop_tk.logstore import LogStore
+from nonebot_desktop_tk.procrunner import ProcessRun
+from nonebot_desktop_tk.resmon import Metrics
+from nonebot_desktop_tk.storage import dump_json, load_json, user_data_dir
+
+STOPPED = "stopped"
+RUNNING = "running"
+STOPPING = "stopping"
+EXITED = "exited"
+CRASHED = "crashed"
+BACKOFF = "backoff"
+STATE_NAMES = {
+    STOPPED: "未运行", RUNNING: "运行中", STOPPING: "正在停止",
+    EXITED: "已退出", CRASHED: "已崩溃", BACKOFF: "等待重启"
+}
+
+RESTART_MODES = ("no", "on-failure", "always")
+RESTART_MODE_NAMES = {"no": "不自动重启", "on-failure": "失败时重启", "always": "总是重启"}
+
+
+class RestartPolicy(NamedTuple):
+    """
+    How a bot is restarted when it exits or stops responding.
+
+    - mode: `str`               - one of `RESTART_MODES`.
+    - max_retries: `int`        - restarts in a row before giving up, 0 for
+                                  unlimited.
+    - backoff: `float`          - seconds before the first restart, doubled
+                                  for each retry in a row.
+    - backoff_max: `float`      - upper bound of the delay.
+    - reset_after: `float`      - seconds of uptime after which the retries
+                                  in a row are forgotten.
+    - health_check: `bool`      - whether to probe the HTTP port of the bot.
+    - health_interval: `float`  - seconds between probes.
+    - health_grace: `float`     - seconds after start before probing.
+    - health_failures: `int`    - failed probes in a row to restart the bot.
+    """
+    mode: str = "no"
+    max_retries: int = 5
+    backoff: float = 1.0
+    backoff_max: float = 60.0
+    reset_after: float = 60.0
+    health_check: bool = False
+    health_interval: float = 10.0
+    health_grace: float = 30.0
+    health_failures: int = 3
+
+    @classmethod
+    def load(cls, data: Any) -> "RestartPolicy":
+        if not isinstance(data, dict):
+            return cls()
+        try:
+            policy = cls(**{k: type(getattr(cls(), k))(v) for k, v in data.items() if k in cls._fields})
+        except (TypeError, ValueError):
+            return cls()
+        return policy if policy.mode in RESTART_MODES else policy._replace(mode="no")
+
+    def should_restart(self, code: Optional[int], retries: int) -> bool:
+        if self.mode == "no" or (self.mode == "on-failure" and code == 0):
+            return False
+        return not self.max_retries or retries < self.max_retries
+
+    def delay(self, retries: int) -> float:
+        return min(self.backoff * 2 ** retries, self.backoff_max)
+
+
+def is_project_dir(fp: Union[str, Path]) -> bool:
+    p = Path(fp)
+    return p.is_dir() and ((p / "pyproject.toml").is_file() or (p / "bot.py").is_file())
+
+
+class BotInstance:
+    """A project in `ProjectRegistry`, and the bot process running in it."""
+    def __init__(self, root: str, name: str = "") -> None:
+        self.root = root
+        self.name = name or Path(root).name
+        self.state = STOPPED
+        self.run: Optional[ProcessRun] = None
+        self.logstore: Optional[LogStore] = None
+        self.returncode: Optional[int] = None
+        self.metrics = Metrics()
+        self.alerts: Set[str] = set()
+        self.stop_requested = False
+        self.restart_requested = False
+        self.policy = RestartPolicy()
+        self.retries = 0
+        self.restart_timer: Optional[str] = None
+        self.health_failures = 0
+        # stopped for failing health checks, handled like a crash
+        self.unhealthy = False
+
+    @property
+    def running(self) -> bool:
+        return self.state in (RUNNING, STOPPING)
+
+    @property
+    def active(self) -> bool:
+        """Running, or waiting to be restarted."""
+        return self.running or self.state == BACKOFF
+
+    @property
+    def pid(self) -> Optional[int]:
+        return self.run.proc.pid if self.running and self.run is not None else None
+
+    @property
+    def uptime(self) -> Optional[float]:
+        return time.time() - self.run.started if self.running and self.run is not None else None
+
+    def started(self, run: ProcessRun, logstore: LogStore) -> None:
+        if self.logstore is not None:
+            self.logstore.close()
+        self.run, self.logstore = run, logstore
+        self.metrics = Metrics()
+        self.alerts = set()
+        self.state = RUNNING
+        self.returncode = None
+        self.health_failures = 0
+        self.stop_requested = self.restart_requested = self.unhealthy = False
+
+    def exited(self, code: Optional[int]) -> None:
+        self.returncode = code
+        if self.stop_requested and not self.unhealthy:
+            self.state = STOPPED
+        else:
+            self.state = EXITED if code == 0 and not self.unhealthy else CRASHED
+
+
+class ProjectRegistry:
+    """
+    Projects managed together, each with its own `BotInstance`.
+
+    The list of projects is kept in the user data directory. Listeners are
+    called in Tk main loop when projects or their states change.
+    """
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path or user_data_dir() / "projects.json"
+        self.bots: Dict[str, BotInstance] = {}
+        self.listeners: List[Callable[[], Any]] = []
+        for item in load_json(self.path, []):
+            try:
+                bot = self.bots[item["root"]] = BotInstance(item["root"], item.get("name", ""))
+            except (KeyError, TypeError):
+                continue
+            bot.policy = RestartPolicy.load(item.get("policy"))
+
+    @staticmethod
+    def key(root: Union[str, Path]) -> str:
+        return str(Path(root).resolve())
+
+    def __iter__(self) -> Iterator[BotInstance]:
+        return iter(list(self.bots.values()))
+
+    def __len__(self) -> int:
+        return len(self.bots)
+
+    def notify(self) -> None:
+        for listener in list(self.listeners):
+            listener()
+
+    def save(self) -> None:
+        try:
+            dump_json(self.path, [
+                {"root": b.root, "name": b.name, "policy": b.policy._asdict()}
+                for b in self.bots.values()
+            ])
+        except OSError as e:
+            print(f"[ProjectRegistry] Failed to save: {e!r}")
+
+    def get(self, root: Union[str, Path]) -> Optional[BotInstance]:
+        return self.bots.get(self.key(root))
+
+    def add(self, root: Union[str, Path], name: str = "") -> BotInstance:
+        """Get the instance of a project, adding it if not known."""
+        key = self.key(root)
+        bot = self.bots.get(key)
+        if bot is None:
+            bot = self.bots[key] = BotInstance(key, name)
+            self.save()
+            self.notify()
+        return bot
+
+    def remove(self, root: Union[str, Path]) -> None:
+        """Forget a project, which must not be running."""
+        bot = self.bots.pop(self.key(root), None)
+        if bot is not None:
+            if bot.logstore is not None:
+                bot.logstore.close()
+            self.save()
+            self.notify()
+
+    def set_policy(self, bot: BotInstance, policy: RestartPolicy) -> None:
+        bot.policy = policy
+        self.save()
+        self.notify()
+
+    @property
+    def running(self) -> List[BotInstance]:
+        return [b for b in self.bots.values() if b.running]
+
+    def close(self) -> None:
+        for bot in self.bots.values():
+            if bot.logstore is not None:
+                bot.logstore.close()
+
+
+class CrashStats:
+    """
+    Starts, crashes and restarts of each project, kept in the user data
+    directory across sessions.
+    """
+    RECENT = 20
+
+    def __init__(self, path: Optional[Path] = None) -> None:
+        self.path = path or user_data_dir() / "crashstats.json"
+        data = load_json(self.path, {})
+        self.stats: Dict[str, Dict[str, Any]] = data if isinstance(data, dict) else {}
+
+    def of(self, root: str) -> Dict[str, Any]:
+        st = self.stats.setdefault(root, {})
+        for k in ("starts", "crashes", "restarts", "unhealthy"):
+            st.setdefault(k, 0)
+        st.setdefault("recent", [])
+        return st
+
+    def save(self) -> None:
+        try:
+            dump_json(self.path, self.stats)
+        except OSError as e:
+            print(f"[CrashStats] Failed to save: {e!r}")
+
+    def record(self, root: str, event: str, code: Optional[int] = None) -> None:
+        """
+        - root: `str`               - the project.
+        - event: `str`              - `"starts"`, `"crashes"`, `"restarts"`
+                                      or `"unhealthy"`.
+        - code: `Optional[int]`     - return code of a crash.
+        """
+        st = self.of(root)
+        st[event] += 1
+        if event == "crashes":
+            now = time.time()
+            st["last_crash"] = now
+            st["last_code"] = code
+            st["recent"] = [*st["recent"], now][-self.RECENT:]
+        self.save()
+
+    def crashes_within(self, root: str, seconds: float) -> int:
+        since = time.time() - seconds
+        return sum(t >= since for t in self.of(root)["recent"])
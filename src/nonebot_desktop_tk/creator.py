@@ -0,0 +1,145 @@
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import shutil
+import sys
+import tempfile
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Sequence
+
+from nonebot_desktop_tk import instrument
+from nonebot_desktop_tk.wheelstore import runner_command
+
+if TYPE_CHECKING:
+    from nb_cli.config import Adapter, Driver
+
+WINDOWS = sys.platform.startswith("win")
+
+STAGES = ("scaffold", "venv", "install")
+STAGE_NAMES = {"scaffold": "生成项目文件", "venv": "创建虚拟环境", "install": "安装依赖"}
+
+PENDING = "pending"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+SKIPPED = "skipped"
+STATUS_NAMES = {PENDING: "等待", RUNNING: "进行中", DONE: "完成", FAILED: "失败", SKIPPED: "跳过"}
+
+# (stage, status, seconds spent), called in the thread running the stage
+StageCallback = Callable[[str, str, float], Any]
+
+
+def venv_python(target: Path) -> Path:
+    return target / ".venv" / ("Scripts" if WINDOWS else "bin") / ("python.exe" if WINDOWS else "python")
+
+
+class StageTimer:
+    """Time of each stage, reported to a callback when it starts and ends."""
+    def __init__(self, on_stage: StageCallback) -> None:
+        self.on_stage = on_stage
+        self.started: Dict[str, float] = {}
+        self.times: Dict[str, float] = {}
+
+    def start(self, stage: str) -> None:
+        self.started[stage] = time.perf_counter()
+        self.on_stage(stage, RUNNING, 0.0)
+
+    def finish(self, stage: str, status: str = DONE) -> None:
+        end = time.perf_counter()
+        start = self.started.get(stage, end)
+        self.times[stage] = end - start
+        instrument.complete(f"create.{stage}", start, end, status=status)
+        self.on_stage(stage, status, end - start)
+
+    def skip(self, stage: str) -> None:
+        self.times[stage] = 0.0
+        self.on_stage(stage, SKIPPED, 0.0)
+
+
+def scaffold(target: Path, drivers: Sequence["Driver"], adapters: Sequence["Adapter"], dev: bool) -> None:
+    """
+    Generate project files into `target`, which may already contain the
+    virtual environment.
+
+    The template is rendered in a staging directory next to the target and
+    moved in, so it does not collide with the environment being created.
+    """
+    from nonebot_desktop_wing.lazylib import nb_cli
+    staging = Path(tempfile.mkdtemp(prefix=".nbdesktop-create-", dir=target.parent))
+    try:
+        nb_cli.handlers.create_project(
+            "simple" if dev else "bootstrap",
+            {
+                "nonebot": {
+                    "project_name": target.name,
+                    "drivers": [d.dict() for d in drivers],
+                    "adapters": [a.dict() for a in adapters],
+                    "use_src": True
+                }
+            },
+            str(staging)
+        )
+        # the template names its directory after the project
+        rendered, = staging.iterdir()
+        for item in rendered.iterdir():
+            shutil.move(str(item), str(target / item.name))
+    finally:
+        shutil.rmtree(staging, ignore_errors=True)
+
+
+def make_venv(target: Path) -> None:
+    from venv import create as create_venv
+    create_venv(target / ".venv", prompt=target.name.replace(" ", "-"), with_pip=True)
+
+
+def prepare(
+    target: Path, drivers: Sequence["Driver"], adapters: Sequence["Adapter"],
+    dev: bool, usevenv: bool, timer: StageTimer
+) -> None:
+    """
+    Run the stages before installing, at the same time. Raises the first
+    failure.
+
+    - target: `Path`                - project directory, must be empty or
+                                      not exist.
+    - drivers: `Sequence[Driver]`   - drivers to be installed.
+    - adapters: `Sequence[Adapter]` - adapters to be installed.
+    - dev: `bool`                   - whether to use a profile for
+                                      developing plugins.
+    - usevenv: `bool`               - whether to create a virtual
+                                      environment.
+    - timer: `StageTimer`           - receives the progress.
+    """
+    target.mkdir(parents=True, exist_ok=True)
+
+    def _stage(stage: str, func: Callable[[], Any]) -> None:
+        timer.start(stage)
+        try:
+            func()
+        except BaseException:
+            timer.finish(stage, FAILED)
+            raise
+        timer.finish(stage)
+
+    jobs = [("scaffold", lambda: scaffold(target, drivers, adapters, dev))]
+    if usevenv:
+        jobs.append(("venv", lambda: make_venv(target)))
+    else:
+        timer.skip("venv")
+    with ThreadPoolExecutor(len(jobs)) as pool:
+        futures = [pool.submit(_stage, stage, func) for stage, func in jobs]
+    for future in futures:
+        future.result()
+
+
+def packages(drivers: Sequence["Driver"], adapters: Sequence["Adapter"]) -> List[str]:
+    """Requirements of a new project, installed by a single pip run."""
+    return ["nonebot2", *(p.project_link for p in (*drivers, *adapters) if p.project_link)]
+
+
+def pip_install_stored(pyexec: str, reqs: Sequence[str], index: Optional[str] = None) -> List[str]:
+    """
+    Command installing the latest matching versions from the index. Wheels
+    already in the store are not downloaded again, the missing ones are
+    downloaded or built into it first.
+    """
+    return runner_command("install", pyexec, [*reqs, *(("-i", index) if index else ())])
@@ -0,0 +1,147 @@
+import re
+from typing import Dict, FrozenSet, Iterable, List, NamedTuple, Optional, Set, Tuple
+
+from nonebot_desktop_tk.distindex import DistRecord
+
+# never offered for removal as leftover dependencies, by normalized names
+PROTECTED = frozenset(("pip", "setuptools", "wheel"))
+
+REQUIREMENT = re.compile(r"\s*([A-Za-z0-9][A-Za-z0-9._-]*)\s*(?:\[([^\]]*)\])?[^;]*(?:;(.*))?$")
+EXTRA_MARKER = re.compile(r"""\bextra\s*==\s*['"]([^'"]+)['"]""")
+
+
+def normalize(name: str) -> str:
+    """Normalize a project name as in PEP 503."""
+    return re.sub(r"[-_.]+", "-", name).lower()
+
+
+class Requirement(NamedTuple):
+    name: str  # normalized
+    extras: Tuple[str, ...]
+    extra: Optional[str]  # the extra of the requiring dist, if any
+    marker: str
+
+
+def parse_requirement(spec: str) -> Optional[Requirement]:
+    """Parse a `Requires-Dist` value, without validating versions."""
+    m = REQUIREMENT.match(spec)
+    if m is None:
+        return None
+    name, extras, marker = m.groups()
+    marker = (marker or "").strip()
+    em = EXTRA_MARKER.search(marker)
+    extra = None if em is None else normalize(em[1])
+    return Requirement(
+        normalize(name), tuple(normalize(e.strip()) for e in (extras or "").split(",") if e.strip()), extra, marker
+    )
+
+
+# results of markers, the same markers appear in many packages
+_markers: Dict[Tuple[str, str], bool] = {}
+
+
+def marker_holds(marker: str, extra: str = "") -> bool:
+    """
+    Evaluate an environment marker for this interpreter.
+
+    Markers are evaluated by `packaging` when available, otherwise they are
+    assumed to hold, which at worst shows an unused dependency.
+    """
+    key = marker, extra
+    if key not in _markers:
+        try:
+            from packaging.markers import Marker
+            _markers[key] = Marker(marker).evaluate({"extra": extra})
+        except Exception:
+            _markers[key] = True
+    return _markers[key]
+
+
+class DepGraph:
+    """
+    Dependencies between installed distributions, by their `DistRecord.key`.
+
+    Built in one pass over `requires` of the records, which `DistIndex`
+    already keeps. Requirements on packages which are not installed are
+    kept in `missing`. Requirements of an extra count only when the extra is
+    requested by another package, or when all of them are installed, which
+    means the extra was most likely installed on purpose.
+    """
+    def __init__(self, records: Iterable[DistRecord]) -> None:
+        self.records: Dict[str, DistRecord] = {}
+        self.names: Dict[str, str] = {}  # record key -> normalized name
+        keys: Dict[str, str] = {}  # normalized name -> record key
+        parsed: Dict[str, List[Requirement]] = {}
+        for rec in records:
+            self.records[rec.key] = rec
+            name = self.names[rec.key] = normalize(rec.name)
+            keys[name] = rec.key
+            parsed[rec.key] = [
+                r for r in map(parse_requirement, rec.requires)
+                if r is not None and (not r.marker or marker_holds(r.marker, r.extra or ""))
+            ]
+
+        self.deps: Dict[str, Set[str]] = {k: set() for k in self.records}
+        self.rdeps: Dict[str, Set[str]] = {k: set() for k in self.records}
+        self.missing: Dict[str, Set[str]] = {}
+        # requested extras by record key
+        requested: Dict[str, Set[str]] = {}
+        for key, reqs in parsed.items():
+            for r in reqs:
+                if r.extra is None and r.extras and r.name in keys:
+                    requested.setdefault(keys[r.name], set()).update(r.extras)
+
+        for key, reqs in parsed.items():
+            extras: Dict[str, List[Requirement]] = {}
+            for r in reqs:
+                if r.extra is None:
+                    self._add(key, r.name, keys)
+                else:
+                    extras.setdefault(r.extra, []).append(r)
+            for extra, ereqs in extras.items():
+                if extra in requested.get(key, ()) or all(r.name in keys for r in ereqs):
+                    for r in ereqs:
+                        self._add(key, r.name, keys)
+
+    def _add(self, key: str, name: str, keys: Dict[str, str]) -> None:
+        dep = keys.get(name)
+        if dep is None:
+            self.missing.setdefault(key, set()).add(name)
+        elif dep != key:
+            self.deps[key].add(dep)
+            self.rdeps[dep].add(key)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def orphans(self, keep: FrozenSet[str] = PROTECTED) -> List[str]:
+        """
+        Packages not required by any other, i.e. installed on purpose or left
+        over, except those in `keep` (normalized names).
+        """
+        return sorted(k for k, r in self.rdeps.items() if not r and self.names[k] not in keep)
+
+    def removal_closure(self, key: str, keep: FrozenSet[str] = PROTECTED) -> List[str]:
+        """
+        Get packages which can be removed together with `key`: it, and its
+        dependencies (transitively) required only by packages removed too.
+
+        - key: `str`                - the package to be removed.
+        - keep: `FrozenSet[str]`    - normalized names of packages never
+                                      removed as dependencies, like those
+                                      the project requires itself.
+
+        - return: `List[str]`       - `key` first, then the others by name.
+        """
+        closure = {key}
+        frontier = set(self.deps.get(key, ()))
+        while frontier:
+            added = {
+                d for d in frontier
+                if d not in closure and self.names[d] not in keep and self.rdeps[d] <= closure
+            }
+            if not added:
+                break
+            closure |= added
+            frontier = {d for a in added for d in self.deps[a]} | (frontier - added)
+        return [key, *sorted(closure - {key})]
@@ -0,0 +1,258 @@
+from hashlib import sha1
+import os
+from pathlib import Path
+import sys
+from threading import Lock
+import time
+from typing import TYPE_CHECKING, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+from nonebot_desktop_tk import instrument
+from nonebot_desktop_tk.storage import dump_json, load_json, user_cache_dir
+
+if TYPE_CHECKING:
+    from importlib.metadata import Distribution, PackageMetadata
+
+CACHE_VERSION = 1
+META_SUFFIXES = (".dist-info", ".egg-info")
+
+
+class DistRecord(NamedTuple):
+    """Metadata headers of an installed distribution."""
+    name: str
+    version: str
+    summary: str
+    requires: Tuple[str, ...]
+    path: str
+    stamp: Tuple[int, int]
+
+    @property
+    def key(self) -> str:
+        return self.name.lower()
+
+    @property
+    def distribution(self) -> "Distribution":
+        from importlib.metadata import PathDistribution
+        return PathDistribution(Path(self.path))
+
+    @property
+    def metadata(self) -> "PackageMetadata":
+        return self.distribution.metadata
+
+
+def interpreter_paths() -> List[Path]:
+    """Directories searched for distributions of this interpreter."""
+    seen: Dict[str, Path] = {}
+    for entry in sys.path:
+        p = Path(entry or ".").resolve()
+        if str(p) not in seen and p.is_dir():
+            seen[str(p)] = p
+    return list(seen.values())
+
+
+def find_site_packages(root: Union[str, Path]) -> List[Path]:
+    """
+    Find `site-packages` directories of the venv in a project. Without a
+    venv, the project runs on this interpreter (as `wing.find_python`
+    picks), so its paths are used like `nonebot_desktop_wing.getdist`.
+    """
+    venv = Path(root) / ".venv"
+    found = [*venv.glob("lib/python*/site-packages"), *venv.glob("Lib/site-packages")]
+    if not found and venv.is_dir():
+        # unusual layout, same as `nonebot_desktop_wing.getdist`
+        found = list(venv.glob("**/site-packages"))
+    return found or interpreter_paths()
+
+
+def _cachefile(sps: Iterable[Path]) -> Path:
+    # keyed on the directories, so projects on the same interpreter share it
+    key = "\n".join(sorted(str(sp) for sp in sps))
+    return user_cache_dir("dists") / f"{sha1(key.encode()).hexdigest()}.json"
+
+
+def _stamp(st: os.stat_result) -> Tuple[int, int]:
+    return st.st_ino, st.st_mtime_ns
+
+
+def read_dist_headers(path: Path) -> Optional[Tuple[str, str, str, Tuple[str, ...]]]:
+    """
+    Read only the header part of `METADATA` (or `PKG-INFO`).
+
+    - path: `Path`  - path to `.dist-info` or `.egg-info` directory.
+
+    - return: `(name, version, summary, requires)` or `None` if unreadable.
+    """
+    mfile = path / ("METADATA" if path.suffix == ".dist-info" else "PKG-INFO")
+    headers: Dict[str, str] = {}
+    requires: List[str] = []
+    last = ""
+    try:
+        with open(mfile, "r", encoding="utf-8", errors="replace") as f:
+            for line in f:
+                line = line.rstrip("\r\n")
+                if not line:
+                    break
+                if line[0] in " \t":
+                    if last == "summary":
+                        headers["summary"] += " " + line.strip()
+                    continue
+                k, _, v = line.partition(":")
+                last = k.strip().lower()
+                v = v.strip()
+                if last == "requires-dist":
+                    requires.append(v)
+                elif last not in headers:
+                    headers[last] = v
+    except OSError:
+        return None
+    if "name" not in headers:
+        return None
+    return headers["name"], headers.get("version", ""), headers.get("summary", ""), tuple(requires)
+
+
+class DistIndex:
+    """
+    Index of distributions installed in a project venv, persisted on disk.
+
+    A `site-packages` directory whose mtime is unchanged is not listed again,
+    and in a changed directory only the metadata directories whose
+    `(inode, mtime)` stamps changed are re-read.
+    """
+    _instances: Dict[str, "DistIndex"] = {}
+    _instances_lock = Lock()
+
+    def __init__(self, root: Union[str, Path]) -> None:
+        self.root = Path(root).resolve()
+        self.cachefile = _cachefile(find_site_packages(self.root))
+        self.lock = Lock()
+        # {site-packages: (mtime_ns, {dirname: record})}
+        self.dirs: Dict[str, Tuple[int, Dict[str, DistRecord]]] = {}
+        self._load()
+
+    @classmethod
+    def of(cls, root: Union[str, Path]) -> "DistIndex":
+        """Get the shared index of a project."""
+        key = str(Path(root).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(key)
+            return cls._instances[key]
+
+    def _load(self) -> None:
+        data = load_json(self.cachefile, {})
+        if data.get("version") != CACHE_VERSION:
+            return
+        for sp, (mtime, entries) in data["dirs"].items():
+            self.dirs[sp] = (mtime, {
+                dn: DistRecord(e[0], e[1], e[2], tuple(e[3]), str(Path(sp) / dn), (e[4], e[5]))
+                for dn, e in entries.items()
+            })
+
+    def _save(self) -> None:
+        data = {
+            "version": CACHE_VERSION,
+            "dirs": {
+                sp: (mtime, {
+                    dn: (r.name, r.version, r.summary, r.requires, *r.stamp)
+                    for dn, r in entries.items()
+                })
+                for sp, (mtime, entries) in self.dirs.items()
+            }
+        }
+        try:
+            dump_json(self.cachefile, data)
+        except OSError as e:
+            print(f"[DistIndex] Cannot save cache: {e!r}")
+
+    def _scan_dir(self, sp: Path, old: Dict[str, DistRecord]) -> Tuple[Dict[str, DistRecord], int]:
+        new: Dict[str, DistRecord] = {}
+        nread = 0
+        with os.scandir(sp) as it:
+            for entry in it:
+                if not entry.name.endswith(META_SUFFIXES) or not entry.is_dir():
+                    continue
+                stamp = _stamp(entry.stat())
+                rec = old.get(entry.name)
+                if rec is not None and rec.stamp == stamp:
+                    new[entry.name] = rec
+                    continue
+                nread += 1
+                headers = read_dist_headers(Path(entry.path))
+                if headers is not None:
+                    new[entry.name] = DistRecord(*headers, entry.path, stamp)
+        return new, nread
+
+    def scan(self) -> List[DistRecord]:
+        """
+        Bring the index up to date and return all distributions.
+
+        - return: `List[DistRecord]`    - installed distributions.
+        """
+        with self.lock:
+            changed = False
+            nread = 0
+            sps = {str(sp): sp for sp in find_site_packages(self.root)}
+            cachefile = _cachefile(sps.values())
+            if cachefile != self.cachefile:
+                # a venv was created or removed
+                self.cachefile = cachefile
+                self.dirs = {}
+                self._load()
+            for gone in set(self.dirs) - set(sps):
+                del self.dirs[gone]
+                changed = True
+            for key, sp in sps.items():
+                try:
+                    mtime = sp.stat().st_mtime_ns
+                except OSError:
+                    continue
+                old = self.dirs.get(key)
+                if old is not None and old[0] == mtime:
+                    continue
+                entries, n = self._scan_dir(sp, old[1] if old else {})
+                nread += n
+                # a directory modified just now may be modified again within
+                # the mtime granularity, so do not trust its mtime next time
+                if time.time_ns() - mtime < 2_000_000_000:
+                    mtime = 0
+                self.dirs[key] = (mtime, entries)
+                changed = True
+            if changed:
+                self._save()
+            instrument.count("DistIndex.metadata", "read", nread)
+            return self.records()
+
+    def records(self) -> List[DistRecord]:
+        """Get all distributions in the index without scanning, sorted by name."""
+        return sorted(
+            (r for _, entries in self.dirs.values() for r in entries.values()),
+            key=lambda r: r.key
+        )
+
+
+class DistDelta(NamedTuple):
+    """Changes between two snapshots of installed distributions."""
+    added: List[DistRecord]
+    removed: List[DistRecord]
+    upgraded: List[Tuple[DistRecord, DistRecord]]
+
+    def __bool__(self) -> bool:
+        return bool(self.added or self.removed or self.upgraded)
+
+
+def diff_records(old: Iterable[DistRecord], new: Iterable[DistRecord]) -> DistDelta:
+    """
+    Compare two snapshots of installed distributions by name.
+
+    - old: `Iterable[DistRecord]`   - the previous snapshot.
+    - new: `Iterable[DistRecord]`   - the current snapshot.
+
+    - return: `DistDelta`           - `upgraded` holds `(old, new)` pairs of
+                                      distributions whose metadata changed.
+    """
+    omap = {r.key: r for r in old}
+    nmap = {r.key: r for r in new}
+    return DistDelta(
+        [r for k, r in nmap.items() if k not in omap],
+        [r for k, r in omap.items() if k not in nmap],
+        [(omap[k], r) for k, r in nmap.items() if k in omap and omap[k] != r]
+    )
@@ -0,0 +1,207 @@
+import io
+from pathlib import Path
+import re
+from threading import Lock
+from typing import Dict, List, NamedTuple, Optional, Tuple, Union
+
+from nonebot_desktop_tk import instrument
+from nonebot_desktop_tk.storage import atomic_write
+
+# bare values lose surrounding spaces and quotes, and are cut before ` #`
+NEEDS_QUOTE = re.compile(r"^$|^[\s'\"]|\s$|\s#|\n")
+
+
+class EnvEntry(NamedTuple):
+    """Where a config is defined."""
+    file: str  # name of the dotenv file
+    line: int  # 0-based first line
+    count: int  # lines taken, quoted values may span lines
+    value: Optional[str]
+
+
+class EnvFile(NamedTuple):
+    stamp: Tuple[int, int]
+    lines: List[str]
+    entries: Dict[str, EnvEntry]
+
+
+def _stamp(fp: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = fp.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+def read_env_file(fp: Path) -> Optional[EnvFile]:
+    """Parse a dotenv file, keeping its lines, or `None` if unreadable."""
+    from dotenv.parser import parse_stream
+    stamp = _stamp(fp)
+    if stamp is None:
+        return None
+    try:
+        text = fp.read_text(encoding="utf-8")
+    except (OSError, UnicodeDecodeError):
+        return None
+    lines = text.splitlines(keepends=True)
+    entries: Dict[str, EnvEntry] = {}
+    for binding in parse_stream(io.StringIO(text)):
+        if binding.key is None or binding.error:
+            continue
+        # the original string starts with blank lines before the binding,
+        # and may end with the newline of its last line
+        raw = binding.original.string
+        body = raw.lstrip()
+        start = binding.original.line - 1 + raw[:len(raw) - len(body)].count("\n")
+        count = body.rstrip("\r\n").count("\n") + 1
+        entries[binding.key] = EnvEntry(fp.name, start, count, binding.value)
+    return EnvFile(stamp, lines, entries)
+
+
+def format_entry(config: str, value: str) -> str:
+    """Format a line, quoting the value only if it would be misread bare."""
+    if value and not NEEDS_QUOTE.search(value):
+        return f"{config}={value}\n"
+    escaped = value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'{config}="{escaped}"\n'
+
+
+def patch_env_file(fp: Path, changes: Dict[str, Optional[str]]) -> Optional[EnvFile]:
+    """
+    Apply changes to a dotenv file atomically. Only the lines of changed
+    configs are rewritten; comments, blank lines and order are kept, and
+    new configs are appended.
+
+    The file is read again right before writing, so changes made by others
+    since it was opened are merged instead of overwritten.
+
+    - fp: `Path`                            - the file, created if missing.
+    - changes: `Dict[str, Optional[str]]`   - new values by configs,
+                                              `None` to remove.
+
+    - return: `Optional[EnvFile]`           - the file after writing.
+    """
+    cur = read_env_file(fp)
+    lines = list(cur.lines) if cur is not None else []
+    entries = cur.entries if cur is not None else {}
+    # patched from the bottom, so earlier line numbers stay valid
+    for config, entry in sorted(
+        ((k, e) for k, e in entries.items() if k in changes), key=lambda ke: ke[1].line, reverse=True
+    ):
+        value = changes[config]
+        lines[entry.line:entry.line + entry.count] = [] if value is None else [format_entry(config, value)]
+    added = [format_entry(k, v) for k, v in changes.items() if v is not None and k not in entries]
+    if added and lines and not lines[-1].endswith("\n"):
+        lines[-1] += "\n"
+    lines.extend(added)
+    with instrument.span("patch_env_file", file=str(fp), changes=len(changes)):
+        atomic_write(fp, "".join(lines))
+    return read_env_file(fp)
+
+
+class EnvIndex:
+    """
+    Dotenv files of a project, parsed once and kept in memory.
+
+    A file is parsed again only when its mtime or size changes, and the
+    directory is listed again only when its own mtime changes. Configs are
+    resolved in the same way as nonebot: `.env` first, then the file of
+    its `ENVIRONMENT` (`.env.prod` if there is no `.env`), and kept in a
+    merged map for O(1) lookups. Updates rewrite only the line of the
+    config.
+    """
+    _instances: Dict[str, "EnvIndex"] = {}
+    _instances_lock = Lock()
+
+    def __init__(self, root: Union[str, Path]) -> None:
+        self.root = Path(root)
+        self.lock = Lock()
+        self.dir_stamp: Optional[Tuple[int, int]] = None
+        self.names: List[str] = []
+        self.files: Dict[str, EnvFile] = {}
+        self.merged: Dict[str, EnvEntry] = {}
+
+    @classmethod
+    def of(cls, root: Union[str, Path]) -> "EnvIndex":
+        """Get the shared index of a project."""
+        key = str(Path(root).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(key)
+            return cls._instances[key]
+
+    def _refresh(self) -> None:
+        # caller holds the lock
+        changed = False
+        stamp = _stamp(self.root)
+        if stamp != self.dir_stamp:
+            self.dir_stamp = stamp
+            names = sorted(p.name for p in self.root.glob(".env*") if p.is_file()) if stamp is not None else []
+            changed = names != self.names
+            self.names = names
+            for name in set(self.files) - set(names):
+                del self.files[name]
+        for name in self.names:
+            fp = self.root / name
+            old = self.files.get(name)
+            if old is not None and _stamp(fp) == old.stamp:
+                continue
+            with instrument.span("EnvIndex.parse", file=str(fp)):
+                new = read_env_file(fp)
+            if new is None:
+                self.files.pop(name, None)
+            else:
+                self.files[name] = new
+            changed = True
+        if changed:
+            self._merge()
+
+    def _profile(self) -> Optional[str]:
+        # caller holds the lock; the file looked up after `.env`
+        main = self.files.get(".env")
+        if main is None:
+            return ".env.prod"
+        env = main.entries.get("ENVIRONMENT")
+        return f".env.{env.value}" if env is not None and env.value else None
+
+    def _merge(self) -> None:
+        profile = self._profile()
+        merged: Dict[str, EnvEntry] = {}
+        if profile is not None and profile in self.files:
+            merged.update(self.files[profile].entries)
+        if ".env" in self.files:
+            merged.update(self.files[".env"].entries)
+        self.merged = merged
+
+    def locate(self, config: str) -> Optional[EnvEntry]:
+        with self.lock:
+            self._refresh()
+            return self.merged.get(config)
+
+    def get(self, config: str) -> Optional[str]:
+        """Get the value of a config, like `recursive_find_env_config`."""
+        entry = self.locate(config)
+        return None if entry is None else entry.value
+
+    def set(self, config: str, value: str) -> None:
+        """
+        Set a config where it is defined, or in the main file if it is not
+        defined yet. Other lines are kept as they are.
+
+        - config: `str`     - config string.
+        - value: `str`      - new value of the config.
+        """
+        with self.lock:
+            self._refresh()
+            entry = self.merged.get(config)
+            if entry is not None:
+                name = entry.file
+            else:
+                name = ".env" if ".env" in self.files else ".env.prod"
+            parsed = patch_env_file(self.root / name, {config: value})
+            if parsed is not None:
+                self.files[name] = parsed
+            if name not in self.names:
+                self.names = sorted([*self.names, name])
+            self.dir_stamp = _stamp(self.root)
+            self._merge()
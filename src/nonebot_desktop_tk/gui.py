@@ -2,59 +2,115 @@ import time
 
 t0 = time.perf_counter()
 
+from abc import abstractmethod
+from bisect import bisect_left
 from functools import partial
+from itertools import groupby
 import os
+import re
 from pathlib import Path
 from subprocess import Popen
 import sys
-from threading import Thread, Timer
-from typing import TYPE_CHECKING, Any, Callable, Dict, List, Optional, Tuple, cast
+from threading import Thread
+from typing import Any, Callable, Dict, FrozenSet, Hashable, Iterable, List, Optional, Tuple, cast
+
+from nonebot_desktop_tk import instrument
 
 t1 = time.perf_counter()
-print(f"[GUI] Import base: {t1 - t0:.3f}s")
+instrument.complete("import.base", t0, t1)
 
 import tkinter as tk
 from tkinter import BooleanVar, Event, IntVar, TclError, filedialog, messagebox, StringVar
-from tkinter import ttk
+from tkinter import font as tkfont, ttk
 
 t1_1 = time.perf_counter()
-print(f"[GUI] Import tkinter: {t1_1 - t1:.3f}s")
-
-from nonebot_desktop_wing import (
-    PYPI_MIRRORS, meta, create, rrggbb_bg2fg, getdist, find_python,
-    recursive_find_env_config, recursive_update_env_config, molecules,
-    exec_new_win, open_new_win, system_open, get_toml_config, lazylib,
-    get_builtin_plugins, find_env_file, list_paginate
-)
-
-t1_2 = time.perf_counter()
-print(f"[GUI] Import this module: {t1_2 - t1_1:.3f}s")
+instrument.complete("import.tkinter", t1, t1_1)
 
 from tkreform import Packer, Widget
 from tkreform.base import Application
 from tkreform.declarative import M, W, Gridder, MenuBinder, NotebookAdder
 from tkreform.menu import MenuCascade, MenuCommand, MenuSeparator
 from tkreform.events import LMB, X2
-from dotenv.main import DotEnv
+
+from nonebot_desktop_tk import bots, creator
+from nonebot_desktop_tk.bots import RESTART_MODE_NAMES, RESTART_MODES, BotInstance, CrashStats, ProjectRegistry, RestartPolicy, is_project_dir
+from nonebot_desktop_tk.depgraph import PROTECTED, DepGraph, parse_requirement
+from nonebot_desktop_tk.distindex import DistDelta, DistIndex, DistRecord, diff_records
+from nonebot_desktop_tk.envindex import EnvIndex, patch_env_file, read_env_file
+from nonebot_desktop_tk.health import DEFAULT_HOST, DEFAULT_PORT, HealthChecker
+from nonebot_desktop_tk.lazyload import LazyModule, prefetch
+from nonebot_desktop_tk.logstore import LEVEL_NO, LEVELS, FilterWorker, LogFilter, LogStore
+from nonebot_desktop_tk.mirrors import NETWORK_ERROR, MirrorRanking, probe_all
+from nonebot_desktop_tk.opqueue import OperationQueue, PendingOp
+from nonebot_desktop_tk.outdated import Outdated, OutdatedChecker
+from nonebot_desktop_tk.pluginsearch import PluginSearchIndex, SearchWorker
+from nonebot_desktop_tk.procrunner import ProcessRun, spawn
+from nonebot_desktop_tk.projectconfig import ProjectConfig
+from nonebot_desktop_tk.registry import FAILED, READY, registry
+from nonebot_desktop_tk.resmon import AlertRules, ResourceMonitor, Sample, check_alerts
+from nonebot_desktop_tk.supervisor import ExitCallback, ProcessSupervisor
+from nonebot_desktop_tk.uiqueue import UIQueue
+from nonebot_desktop_tk.watcher import SitePackagesWatcher
+from nonebot_desktop_tk.wheelstore import StoreSettings, WheelStore, runner_command
 
 t2 = time.perf_counter()
-print(f"[GUI] Import rest modules: {t2 - t1_2:.3f}s")
+instrument.complete("import.rest", t1_1, t2)
+
+# heavy modules, imported when a window needs them or prefetched after the
+# main window is painted
+wing = LazyModule("nonebot_desktop_wing")
+dotenv_main = LazyModule("dotenv.main")
+
 
-if TYPE_CHECKING:
-    from importlib.metadata import Distribution
+@instrument.traced("recursive_find_env_config")
+def recursive_find_env_config(fp: str, cfg: str) -> Optional[str]:
+    return EnvIndex.of(fp).get(cfg)
 
 font10 = ("Microsoft Yahei UI", 10)
 mono10 = ("Consolas", 10)
 
 
 class Context:
+    CONFIG_FLUSH_DELAY = 500
+    RUN_HISTORY = 8
+    STOP_TIMEOUT = 5000
+    MIRROR_TTL = 6 * 3600
+    MIRROR_TIMEOUT = 5.0
+
     def __init__(self, main: "MainApp") -> None:
         self.main = main
         self.cwd = StringVar(value="[点击“项目”菜单新建或打开项目]")
         self.tmpindex = StringVar()
-        self.curproc: Optional[Popen[bytes]] = None
-        self.curdists: List["Distribution"] = []
+        self.uiqueue = UIQueue(main.win.base)
+        self.supervisor = ProcessSupervisor(self.uiqueue)
+        self.curdists: List[DistRecord] = []
+        self.curdistnames: List[str] = []
+        self.distroot: Optional[str] = None
+        self._depgraph: Optional[DepGraph] = None
         self.distvar = StringVar()
+        self.distviews: List[tk.Listbox] = []
+        self.dist_listeners: List[Callable[[DistDelta], Any]] = []
+        self.watcher: Optional[SitePackagesWatcher] = None
+        self._config_flush: Optional[str] = None
+        self.config_listeners: List[Callable[[], Any]] = []
+        self.opqueue = OperationQueue()
+        self.opstatus = StringVar(value="")
+        self.runs: List[ProcessRun] = []
+        self.run_listeners: List[Callable[[ProcessRun], Any]] = []
+        self.output_view: Optional["OutputView"] = None
+        self.bots = ProjectRegistry()
+        self.monitor = ResourceMonitor(lambda samples: self.post(partial(self.apply_samples, samples), "resmon"))
+        self.alert_rules = AlertRules()
+        self.alertvar = StringVar(value="")
+        self.crashstats = CrashStats()
+        self.health = HealthChecker(lambda key, err: self.post(partial(self.apply_health, cast(str, key), err)))
+        self.mirrors = MirrorRanking()
+        # the mirror selected by probing, replaced only while the user keeps it
+        self.auto_index: Optional[str] = None
+        self.probing = False
+        self.probe_waiters: List[Callable[[], Any]] = []
+        # pid -> (command for an index, index), of runs using the selected mirror
+        self._pip_runs: Dict[int, Tuple[Callable[[str], List[str]], str]] = {}
         self.cwd.trace_add("write", self.cwd_updator)
 
     @property
@@ -73,30 +129,535 @@ class Context:
     def tmp_index(self) -> str:
         return self.tmpindex.get()
 
-    def upddists(self) -> None:
-        self.curdists = list(getdist(self.cwd_str))
-        self.curdistnames = [d.metadata["name"].lower() for d in self.curdists]
-        self.distvar.set(self.curdistnames)  # type: ignore
+    def post(self, func: Callable[[], Any], key: Optional[Hashable] = None) -> None:
+        self.uiqueue.post(func, key)
+
+    def spawn_pip(self, command: str, *args: str, index: bool = False, root: Optional[str] = None) -> "Popen[bytes]":
+        pyexec = str(wing.find_python(root or self.cwd_str))
+
+        def _command(idx: str) -> List[str]:
+            extra = ["-i", idx] if idx else []
+            if command == "install" and WheelStore.default().settings.enabled:
+                # wheels are fetched into the shared store, then installed from it
+                return runner_command("install", pyexec, [*args, *extra])
+            return [pyexec, "-m", "pip", command, *args, *extra]
+
+        return self.spawn_indexed(_command) if index else spawn(_command(""))
+
+    def spawn_indexed(self, make: Callable[[str], List[str]]) -> "Popen[bytes]":
+        """
+        Spawn a pip run with the selected index.
+
+        - make: `(str) -> List[str]`    - makes the command for an index, or
+                                          for the default one if empty.
+        """
+        idx = self.tmp_index
+        p = spawn(make(idx))
+        if idx and idx == self.auto_index:
+            # retried on the next mirror if this one cannot be reached
+            self._pip_runs[p.pid] = make, idx
+        return p
+
+    def run_process(
+        self, name: str, proc: "Popen[bytes]", callback: ExitCallback,
+        span: str = "process", sinks: Tuple[Callable[[str, str], Any], ...] = (),
+        show: bool = True, **args: Any
+    ) -> ProcessRun:
+        # output is captured and shown in `OutputView`
+        fallback = self._pip_runs.pop(proc.pid, None)
+        if fallback is not None:
+            failed: List[str] = []
+
+            def _network_error(_: str, text: str) -> None:
+                if not failed and NETWORK_ERROR.search(text):
+                    failed.append(text.strip())
+
+            sinks = (*sinks, _network_error)
+            callback = partial(self._pip_exited, name, fallback, failed, callback, span, show, args)
+        run = ProcessRun(name, proc, self._output_arrived, sinks=sinks)
+        self.runs.append(run)
+        finished = [r for r in self.runs if not r.running]
+        for r in finished[:-self.RUN_HISTORY]:
+            self.runs.remove(r)
+        if show:
+            self.show_output(run)
+        self.supervisor.watch(proc, callback, span, **args)
+        return run
+
+    def _pip_exited(
+        self, name: str, fallback: Tuple[Callable[[str], List[str]], str], failed: List[str],
+        callback: ExitCallback, span: str, show: bool, args: Dict[str, Any],
+        code: Optional[int], e: Optional[BaseException]
+    ) -> None:
+        make, index = fallback
+        if code and failed and index == self.auto_index:
+            self.mirrors.fail(index, failed[0])
+            self.select_mirror()
+            print(f"[Context] Mirror {index!r} failed, retrying with {self.tmp_index or 'the default index'!r}")
+            try:
+                p = self.spawn_indexed(make)
+            except OSError as err:
+                callback(None, err)
+                return
+            base = name.split("（换用")[0]
+            self.run_process(f"{base}（换用 {self.tmp_index or '默认下载源'}）", p, callback, span, show=show, **args)
+            return
+        callback(code, e)
+
+    def mirror_urls(self) -> List[str]:
+        """Mirrors for the comboboxes, healthy ones from the fastest."""
+        known = {u.rstrip("/"): u for u in wing.PYPI_MIRRORS}
+        ranked = [known.pop(s.url.rstrip("/")) for s in self.mirrors.ranked() if s.healthy and s.url.rstrip("/") in known]
+        return [*ranked, *known.values()]
+
+    def select_mirror(self) -> None:
+        # an index chosen by the user is kept
+        if self.tmp_index and self.tmp_index != self.auto_index:
+            return
+        best = self.mirrors.best()
+        if best is not None and best != self.tmp_index:
+            print(f"[Context] Selected the fastest mirror {best!r}")
+        self.auto_index = best
+        self.tmpindex.set(best or "")
+
+    def probe_mirrors(self, force: bool = False, then: Optional[Callable[[], Any]] = None) -> None:
+        if then is not None:
+            self.probe_waiters.append(then)
+        if self.probing:
+            return
+        self.probing = True
+
+        def _work():
+            urls = list(wing.PYPI_MIRRORS)
+            if force or self.mirrors.stale(urls, self.MIRROR_TTL):
+                with instrument.span("probe_mirrors", mirrors=len(urls)):
+                    self.mirrors.update(probe_all(urls, self.MIRROR_TIMEOUT))
+            self.post(self._mirrors_probed)
+
+        Thread(target=_work, daemon=True).start()
+
+    def _mirrors_probed(self) -> None:
+        self.probing = False
+        self.select_mirror()
+        waiters, self.probe_waiters = self.probe_waiters, []
+        for then in waiters:
+            then()
+
+    def _output_arrived(self, run: ProcessRun) -> None:
+        # called in reader threads, once per frame at most
+        self.post(partial(self.notify_output, run), ("output", id(run)))
+
+    def notify_output(self, run: ProcessRun) -> None:
+        run.buffer.acknowledge()
+        for listener in list(self.run_listeners):
+            listener(run)
+
+    def show_output(self, run: Optional[ProcessRun] = None) -> None:
+        if self.output_view is None:
+            OutputView(self.main.win.sub_window(), self)
+        assert self.output_view is not None
+        self.output_view.show(run or (self.runs[-1] if self.runs else None))
+
+    @property
+    def config(self) -> ProjectConfig:
+        return ProjectConfig.of(self.cwd_str)
+
+    def config_changed(self) -> None:
+        # coalesce a burst of edits into one write
+        base = self.main.win.base
+        if self._config_flush is not None:
+            base.after_cancel(self._config_flush)
+        self._config_flush = base.after(self.CONFIG_FLUSH_DELAY, self.flush_config)
+
+    def flush_config(self) -> None:
+        self._config_flush = None
+        ProjectConfig.flush_all()
+
+    def apply_config_ops(self, ops: List[PendingOp], root: str) -> None:
+        # all edits are written at once
+        conf = ProjectConfig.of(root)
+        drivers: List[PendingOp] = []
+        for op in ops:
+            enable = op.action == "enable"
+            if op.kind == "plugin":
+                (conf.add_plugin if enable else conf.remove_plugin)(op.module)
+            elif op.kind == "adapter":
+                info = {"name": op.name, "module_name": op.module}
+                (conf.add_adapter if enable else conf.remove_adapter)(info)
+            else:
+                drivers.append(op)
+        self.flush_config()
+        if drivers:
+            _enabled = recursive_find_env_config(root, "DRIVER")
+            enabled = [] if _enabled is None else _enabled.split("+")
+            for op in drivers:
+                if op.action == "enable" and op.module not in enabled:
+                    enabled.append(op.module)
+                elif op.action == "disable" and op.module in enabled:
+                    enabled.remove(op.module)
+            EnvIndex.of(root).set("DRIVER", "+".join(enabled))
+
+    def run_queue(self) -> None:
+        queue = self.opqueue
+        if queue.running or not len(queue):
+            return
+        plan = queue.take_plan()
+        queue.running = True
+        total, step, errors = plan.steps, 0, []
+
+        def status(text: str):
+            nonlocal step
+            step += 1
+            self.opstatus.set(f"[{step}/{total}] {text}")
+
+        if plan.config:
+            status(f"正在写入 {len(plan.config)} 项配置……")
+            try:
+                self.apply_config_ops(plan.config, plan.root)
+            except Exception as e:
+                errors.append(e)
+            self.notify_config()
+
+        commands: List[Tuple[str, List[str], Callable[[], "Popen[bytes]"]]] = []
+        if plan.uninstalls:
+            commands.append(("pip uninstall", plan.uninstalls, lambda: self.spawn_pip(
+                "uninstall", "-y", *plan.uninstalls, root=plan.root
+            )))
+        if plan.installs:
+            commands.append(("pip install", plan.installs, lambda: self.spawn_pip(
+                "install", *plan.installs, index=True, root=plan.root
+            )))
+
+        current = ""
+
+        def _next(code: Optional[int] = None, e: Optional[BaseException] = None):
+            nonlocal current
+            if e is not None:
+                errors.append(e)
+            elif code:
+                errors.append(Exception(f"{current} 失败，返回值 {code}，详见运行输出。"))
+            if not commands:
+                queue.running = False
+                self.opstatus.set(f"执行完成，{len(errors)} 项出错" if errors else "执行完成")
+                for err in errors:
+                    print(f"[run_queue] {err!r}")
+                queue.notify()
+                self.refresh_dists()
+                return
+            name, pkgs, start = commands.pop(0)
+            current = name
+            verb = "卸载" if name == "pip uninstall" else "安装"
+            status(f"正在{verb} {len(pkgs)} 个程序包……")
+            try:
+                p = start()
+            except Exception as err:
+                _next(None, err)
+                return
+            self.run_process(f"{verb} {len(pkgs)} 个程序包", p, _next, name, packages=pkgs)
+
+        _next()
+
+    def open_queue(self) -> None:
+        OperationQueueView(self.main.win.sub_window(), self)
+
+    def is_installed(self, name: str) -> bool:
+        key = name.lower()
+        idx = bisect_left(self.curdistnames, key)
+        return idx < len(self.curdistnames) and self.curdistnames[idx] == key
+
+    def upddists(self, cwd: str, then: Optional[Callable[[], Any]] = None) -> None:
+        # runs in worker threads, so does not touch Tk
+        with instrument.span("Context.upddists", cwd=cwd):
+            dists = DistIndex.of(cwd).scan()
+
+        def _apply():
+            if self.distroot != cwd:
+                delta = diff_records(self.curdists, dists)
+                self.distroot = cwd
+                self.curdists = dists
+                self.curdistnames = [d.key for d in dists]
+                self.distvar.set(self.curdistnames)  # type: ignore
+                self.notify_dists(delta)
+            else:
+                self.apply_dist_delta(cwd, diff_records(self.curdists, dists))
+
+        self.post(_apply, ("upddists", cwd))
+        if then is not None:
+            self.post(then)
         print("[upddists] Updated current dists")
 
+    def apply_dist_delta(self, root: str, delta: DistDelta) -> None:
+        # patch sorted `curdists` and views in place
+        if root != self.distroot or not delta:
+            return
+        ops: List[Tuple[int, Optional[str]]] = []
+        for rec in delta.removed:
+            idx = bisect_left(self.curdistnames, rec.key)
+            if idx < len(self.curdistnames) and self.curdistnames[idx] == rec.key:
+                del self.curdistnames[idx], self.curdists[idx]
+                ops.append((idx, None))
+        for rec in (*delta.added, *(new for _, new in delta.upgraded)):
+            idx = bisect_left(self.curdistnames, rec.key)
+            if idx < len(self.curdistnames) and self.curdistnames[idx] == rec.key:
+                self.curdists[idx] = rec
+            else:
+                self.curdistnames.insert(idx, rec.key)
+                self.curdists.insert(idx, rec)
+                ops.append((idx, rec.key))
+
+        self.distviews = [lb for lb in self.distviews if lb.winfo_exists()]
+        if self.distviews:
+            # the listbox writes through to `distvar` it is bound to
+            lb = self.distviews[0]
+            for idx, key in ops:
+                if key is None:
+                    lb.delete(idx)
+                else:
+                    lb.insert(idx, key)
+        else:
+            self.distvar.set(self.curdistnames)  # type: ignore
+        print(
+            f"[apply_dist_delta] +{len(delta.added)} -{len(delta.removed)} "
+            f"^{len(delta.upgraded)}"
+        )
+        self.notify_dists(delta)
+
+    def notify_dists(self, delta: DistDelta) -> None:
+        if not delta:
+            return
+        self._depgraph = None
+        for listener in list(self.dist_listeners):
+            try:
+                listener(delta)
+            except TclError:
+                pass
+
+    @staticmethod
+    def _subscribe(win: tk.Misc, listeners: List[Any], listener: Any) -> None:
+        # keep `listener` in `listeners` until `win` is destroyed
+        listeners.append(listener)
+
+        def _unsubscribe(event: Event):
+            if event.widget is win and listener in listeners:
+                listeners.remove(listener)
+
+        win.bind("<Destroy>", _unsubscribe, add=True)
+
+    def subscribe_dists(self, win: tk.Misc, listener: Callable[[DistDelta], Any]) -> None:
+        self._subscribe(win, self.dist_listeners, listener)
+
+    def notify_config(self) -> None:
+        # enabled drivers, adapters and plugins may have changed
+        for listener in list(self.config_listeners):
+            try:
+                listener()
+            except TclError:
+                pass
+
+    def subscribe_config(self, win: tk.Misc, listener: Callable[[], Any]) -> None:
+        self._subscribe(win, self.config_listeners, listener)
+
+    def subscribe_registry(self, win: tk.Misc, listener: Callable[[str], Any]) -> None:
+        # registry listeners are called in worker threads
+        self._subscribe(win, registry.listeners, lambda name: self.post(partial(listener, name)))
+
+    def open_with_registry(self, names: Tuple[str, ...], opener: Callable[[], Any]) -> None:
+        # windows built from registries wait for the first fetch
+        if all(registry.status(n) == READY for n in names):
+            opener()
+            return
+        registry.refresh_in_background(names)
+        RegistryLoading(self.main.win.sub_window(), self, names, opener)
+
+    def watch_dists(self) -> None:
+        if self.watcher is not None:
+            self.watcher.stop()
+        cwd = self.cwd_str
+        self.watcher = SitePackagesWatcher(
+            DistIndex.of(cwd),
+            lambda delta: self.post(partial(self.apply_dist_delta, cwd, delta))
+        ).start()
+
+    def refresh_dists(self, then: Optional[Callable[[], Any]] = None) -> None:
+        Thread(target=self.upddists, args=(self.cwd_str, then), daemon=True).start()
+
     @property
     def cwd_valid(self) -> bool:
-        return (
-            self.cwd_path.is_dir()
-            and (
-                (self.cwd_path / "pyproject.toml").is_file()
-                or (self.cwd_path / "bot.py").is_file()
+        return is_project_dir(self.cwd_path)
+
+    @property
+    def current_bot(self) -> Optional[BotInstance]:
+        return self.bots.get(self.cwd_str) if self.cwd_valid else None
+
+    def start_bot(self, bot: BotInstance, show: bool = False) -> None:
+        # started by hand, so earlier failures in a row are forgotten
+        self._cancel_restart(bot)
+        bot.retries = 0
+        self._launch(bot, show)
+
+    def _launch(self, bot: BotInstance, show: bool = False) -> None:
+        # every bot is waited on by its own supervisor thread
+        if bot.running:
+            return
+        if not is_project_dir(bot.root):
+            bot.state = bots.STOPPED
+            self.bots.notify()
+            messagebox.showerror("错误", f"{bot.root} 不是正确的项目目录。", master=self.main.win.base)
+            return
+        if ProjectRegistry.key(self.cwd_str) == bot.root:
+            self.flush_config()
+        try:
+            proc = spawn([sys.executable, "-m", "nb_cli", "run"], cwd=bot.root)
+        except OSError as e:
+            bot.state = bots.STOPPED
+            self.bots.notify()
+            messagebox.showerror("错误", f"{e}", master=self.main.win.base)
+            return
+        logstore = LogStore()
+        run = self.run_process(
+            f"nb run - {bot.name}", proc, partial(self._bot_exited, bot), "nb run",
+            sinks=(logstore.append,), show=show, project=bot.root
+        )
+        bot.started(run, logstore)
+        self.crashstats.record(bot.root, "starts")
+        self.monitor.watch(bot.root, proc.pid)
+        self.watch_health(bot)
+        self.bots.notify()
+
+    def watch_health(self, bot: BotInstance) -> None:
+        self.health.unwatch(bot.root)
+        policy = bot.policy
+        if bot.running and policy.health_check:
+            self.health.watch(
+                bot.root, partial(self.bot_address, bot.root),
+                policy.health_interval, policy.health_grace
             )
+
+    @staticmethod
+    def bot_address(root: str) -> Tuple[str, int]:
+        # called in the health checker thread
+        host = recursive_find_env_config(root, "HOST")
+        port = recursive_find_env_config(root, "PORT")
+        return (
+            host.strip("\"' ") if host else DEFAULT_HOST,
+            int(port.strip("\"' ")) if port else DEFAULT_PORT
         )
 
+    def alert(self, msg: str) -> None:
+        msg = f"{time.strftime('%H:%M:%S')} {msg}"
+        print(f"[alert] {msg}")
+        self.alertvar.set(msg)
+        self.main.win.base.bell()
+
+    def _bot_exited(self, bot: BotInstance, code: Optional[int], e: Optional[BaseException]) -> None:
+        if e is not None:
+            print(f"[Context] {bot.name} lost: {e!r}")
+        uptime = bot.uptime or 0.0
+        bot.exited(code)
+        self.monitor.unwatch(bot.root)
+        self.health.unwatch(bot.root)
+        print(f"[Context] {bot.name} exited with {code}, {bot.state}")
+        if bot.state == bots.CRASHED and not bot.unhealthy:
+            self.crashstats.record(bot.root, "crashes", code)
+        if bot.restart_requested:
+            bot.restart_requested = False
+            self._launch(bot)
+        elif bot.unhealthy or not bot.stop_requested:
+            # bots stopped for failing health checks back off like crashes
+            policy = bot.policy
+            if uptime >= policy.reset_after:
+                bot.retries = 0
+            if policy.should_restart(None if bot.unhealthy else code, bot.retries):
+                delay = policy.delay(bot.retries)
+                bot.retries += 1
+                bot.state = bots.BACKOFF
+                bot.restart_timer = self.main.win.base.after(int(delay * 1000), partial(self._auto_restart, bot))
+                print(f"[Context] Restarting {bot.name} in {delay:.0f}s (retry {bot.retries})")
+            elif bot.state == bots.CRASHED and not bot.unhealthy:
+                self.alert(f"{bot.name} 已崩溃（返回值 {code}）")
+        self.bots.notify()
+
+    def _auto_restart(self, bot: BotInstance) -> None:
+        bot.restart_timer = None
+        if bot.state != bots.BACKOFF:
+            return
+        self.crashstats.record(bot.root, "restarts")
+        self._launch(bot)
+
+    def _cancel_restart(self, bot: BotInstance) -> None:
+        if bot.restart_timer is not None:
+            self.main.win.base.after_cancel(bot.restart_timer)
+            bot.restart_timer = None
+
+    def apply_health(self, key: str, err: Optional[str]) -> None:
+        bot = self.bots.bots.get(key)
+        if bot is None or bot.state != bots.RUNNING:
+            return
+        if err is None:
+            bot.health_failures = 0
+            return
+        bot.health_failures += 1
+        print(f"[HealthChecker] {bot.name} failed {bot.health_failures} times: {err}")
+        if bot.health_failures >= bot.policy.health_failures:
+            self.crashstats.record(bot.root, "unhealthy")
+            self.alert(f"{bot.name} 健康检查连续失败 {bot.health_failures} 次，正在停止")
+            bot.unhealthy = True
+            self.stop_bot(bot)
+
+    def apply_samples(self, samples: Dict[Hashable, Optional[Sample]]) -> None:
+        for key, sample in samples.items():
+            bot = self.bots.bots.get(cast(str, key))
+            if bot is None or sample is None or not bot.running:
+                continue
+            bot.metrics.add(sample)
+            alerts = dict(check_alerts(bot.metrics, self.alert_rules))
+            # alert once until the condition clears
+            for kind in alerts.keys() - bot.alerts:
+                self.alert(f"{bot.name}：{alerts[kind]}")
+            bot.alerts = set(alerts)
+        self.bots.notify()
+
+    def stop_bot(self, bot: BotInstance) -> None:
+        if bot.state == bots.BACKOFF:
+            self._cancel_restart(bot)
+            bot.state = bots.STOPPED
+            self.bots.notify()
+            return
+        if bot.state != bots.RUNNING or bot.run is None:
+            return
+        run = bot.run
+        bot.stop_requested = True
+        bot.state = bots.STOPPING
+        self.health.unwatch(bot.root)
+        run.stop()
+
+        def _force():
+            if run.running:
+                print(f"[Context] {bot.name} did not stop in time, killing")
+                run.stop(force=True)
+
+        self.main.win.base.after(self.STOP_TIMEOUT, _force)
+        self.bots.notify()
+
+    def restart_bot(self, bot: BotInstance) -> None:
+        if bot.running:
+            self.stop_bot(bot)
+            bot.restart_requested = True
+        else:
+            self.start_bot(bot)
+
     def cwd_updator(self, *_) -> None:
         valid = self.cwd_valid
-        self.main.win[1][1].disabled = not valid
+        self.main.update_start_button()
+        self.main.update_monitor()
         m: tk.Menu = self.main.win[0].base  # type: ignore
         for entry in (2, 3, 4):
             m.entryconfig(entry, state="normal" if valid else "disabled")
+        # operations are queued for one project at a time
+        self.opqueue.set_root(self.cwd_str)
         if valid:
-            Thread(target=self.upddists).start()
+            self.refresh_dists()
+            self.watch_dists()
             print(f"[cwd_updator] Current directory is set to {self.cwd_str!r}")
 
     def check_pyproject_toml(self) -> None:
@@ -108,8 +669,34 @@ class Context:
                 raise Exception("当前目录下没有 pyproject.toml，无法修改配置。")
 
     @property
-    def curdist_dict(self):
-        return {dist.name: dist for dist in self.curdists}
+    def curdist_dict(self) -> Dict[str, DistRecord]:
+        return {dist.key: dist for dist in self.curdists}
+
+    @property
+    def depgraph(self) -> DepGraph:
+        # built on demand, dropped whenever `curdists` changes
+        if self._depgraph is None:
+            with instrument.span("DepGraph.build", dists=len(self.curdists)):
+                self._depgraph = DepGraph(self.curdists)
+        return self._depgraph
+
+    def kept_packages(self) -> FrozenSet[str]:
+        """
+        Normalized names of packages the project needs by itself, never
+        offered for removal as leftovers: its declared dependencies,
+        nonebot2, and the enabled drivers and adapters.
+        """
+        specs: List[str] = ["nonebot2"]
+        conf = self.config
+        if conf.exists:
+            specs += conf.dependencies
+            # only known registries are used, nothing is fetched here
+            if registry.status("adapters") == READY:
+                specs += [a.project_link for a in registry.adapters if a.module_name in conf.adapters and a.project_link]
+        drivers = (recursive_find_env_config(self.cwd_str, "DRIVER") or "").split("+")
+        if registry.status("drivers") == READY:
+            specs += [d.project_link for d in registry.drivers if d.module_name in drivers and d.project_link]
+        return PROTECTED | {r.name for r in map(parse_requirement, specs) if r is not None}
 
 
 class ApplicationWithContext(Application):
@@ -118,20 +705,58 @@ class ApplicationWithContext(Application):
         super().__init__(base)
 
 
+class BulkApplication(ApplicationWithContext):
+    """Windows whose items can be selected and queued in bulk."""
+    def bulk_bar(self):
+        return W(tk.LabelFrame, text="批量操作", font=font10) * Packer(anchor="sw", fill="x", side="top", expand=True) / (
+            W(tk.Button, text="安装所选", font=font10, command=lambda: self.queue_selected("install")) * Packer(side="left"),
+            W(tk.Button, text="卸载所选", font=font10, command=lambda: self.queue_selected("uninstall")) * Packer(side="left"),
+            W(tk.Button, text="启用所选", font=font10, command=lambda: self.queue_selected("enable")) * Packer(side="left"),
+            W(tk.Button, text="禁用所选", font=font10, command=lambda: self.queue_selected("disable")) * Packer(side="left"),
+            W(tk.Button, text="待执行操作", font=font10, command=self.context.open_queue) * Packer(side="right"),
+            W(tk.Label, textvariable=self.context.opstatus, font=font10) * Packer(side="right"),
+        )
+
+    @abstractmethod
+    def selected_ops(self, action: str) -> List[PendingOp]:
+        raise NotImplementedError
+
+    @abstractmethod
+    def clear_selection(self) -> None:
+        raise NotImplementedError
+
+    def queue_selected(self, action: str) -> None:
+        ops = self.selected_ops(action)
+        if not ops:
+            messagebox.showinfo("提示", "没有可以执行此操作的已选项。", master=self.win.base)
+            return
+        self.context.opqueue.add(self.context.cwd_str, *ops)
+        self.clear_selection()
+
+
 class MainApp(Application):
+    WARMUP_DELAY = 200
+    SPARK_SIZE = 106, 24
+    METRIC_NAMES = {"cpu": "CPU", "rss": "内存", "threads": "线程", "fds": "文件"}
+    METRIC_COLORS = {"cpu": "#2060c0", "rss": "#20a040", "threads": "#c08000", "fds": "#a040a0"}
+
     def setup(self) -> None:
         self.win.title = "NoneBot Desktop"
-        self.win.size = 452, 80
+        self.win.size = 452, 170
         self.win.resizable = False
 
         self.context = Context(self)
+        self.metricvars = {m: StringVar(value=f"{name} -") for m, name in self.METRIC_NAMES.items()}
 
         self.win /= (
             W(tk.Menu) * MenuBinder(self.win) / (
                 M(MenuCascade(label="项目", font=font10), tearoff=False) * MenuBinder() / (
-                    MenuCommand(label="新建项目", font=font10, command=lambda: CreateProject(self.win.sub_window(), self.context)),
+                    MenuCommand(label="新建项目", font=font10, command=lambda: self.context.open_with_registry(("drivers", "adapters"), lambda: CreateProject(self.win.sub_window(), self.context))),
                     MenuCommand(label="打开项目", font=font10, command=self.open_project),
                     MenuCommand(label="启动项目", font=font10, command=self.start),
+                    MenuCommand(label="运行输出", font=font10, command=self.context.show_output),
+                    MenuCommand(label="查看日志", font=font10, command=lambda: LogViewer(self.win.sub_window(), self.context)),
+                    MenuCommand(label="项目面板", font=font10, command=lambda: ProjectDashboard(self.win.sub_window(), self.context)),
                     MenuSeparator(),
                     MenuCommand(label="打开项目文件夹", font=font10, command=self.open_pdir),
                     MenuSeparator(),
@@ -140,19 +765,23 @@ class MainApp(Application):
                 M(MenuCascade(label="配置", font=font10), tearoff=False) * MenuBinder() / (
                     MenuCommand(label="配置文件编辑器", command=lambda: DotenvEditor(self.win.sub_window(), self.context), font=font10),
                     MenuSeparator(),
-                    MenuCommand(label="管理驱动器", command=lambda: DriverManager(self.win.sub_window(), self.context), font=font10),
-                    MenuCommand(label="管理适配器", command=lambda: AdapterManager(self.win.sub_window(), self.context), font=font10),
+                    MenuCommand(label="管理驱动器", command=lambda: self.context.open_with_registry(("drivers",), lambda: DriverManager(self.win.sub_window(), self.context)), font=font10),
+                    MenuCommand(label="管理适配器", command=lambda: self.context.open_with_registry(("adapters",), lambda: AdapterManager(self.win.sub_window(), self.context)), font=font10),
                     MenuSeparator(),
                     MenuCommand(label="管理环境", command=lambda: EnvironmentManager(self.win.sub_window(), self.context), font=font10)
                 ),
                 M(MenuCascade(label="插件", font=font10), tearoff=False) * MenuBinder() / (
                     MenuCommand(label="管理内置插件", command=lambda: BuiltinPlugins(self.win.sub_window(), self.context), font=font10),
-                    MenuCommand(label="插件商店", command=lambda: PluginStore(self.win.sub_window(), self.context), font=font10),
+                    MenuCommand(label="插件商店", command=lambda: self.context.open_with_registry(("plugins",), lambda: PluginStore(self.win.sub_window(), self.context)), font=font10),
+                    MenuSeparator(),
+                    MenuCommand(label="待执行操作", command=self.context.open_queue, font=font10),
                 ),
                 M(MenuCascade(label="高级", font=font10), tearoff=False) * MenuBinder() / (
-                    MenuCommand(label="打开命令行窗口", font=font10, command=lambda: open_new_win(self.context.cwd_path)),
+                    MenuCommand(label="打开命令行窗口", font=font10, command=lambda: wing.open_new_win(self.context.cwd_path)),
+                    MenuCommand(label="下载源测速", font=font10, command=lambda: self.context.probe_mirrors(True, self.show_mirrors)),
+                    MenuCommand(label="共享 wheel 缓存", font=font10, command=lambda: WheelStoreView(self.win.sub_window(), self.context)),
                     MenuSeparator(),
-                    MenuCommand(label="编辑 pyproject.toml", font=font10, command=lambda: system_open(self.context.cwd_path / "pyproject.toml"))
+                    MenuCommand(label="编辑 pyproject.toml", font=font10, command=lambda: wing.system_open(self.context.cwd_path / "pyproject.toml"))
                 ),
                 M(MenuCascade(label="帮助", font=font10), tearoff=False) * MenuBinder() / (
                     MenuCommand(label="使用手册", command=lambda: AppHelp(self.win.sub_window()), font=font10),
@@ -164,14 +793,54 @@ class MainApp(Application):
                     W(tk.Label, text="当前路径：", font=("Microsoft Yahei UI", 12)) * Packer(side="left"),
                     W(tk.Entry, textvariable=self.context.cwd, font=("Microsoft Yahei UI", 12), width=40) * Packer(side="left", expand=True)
                 ),
-                W(tk.Button, text="启动", command=self.start, font=("Microsoft Yahei UI", 20)) * Gridder(row=1, sticky="w")
+                W(tk.Button, text="启动", command=self.toggle_start, font=("Microsoft Yahei UI", 20)) * Gridder(row=1, sticky="w"),
+                W(tk.Frame) * Gridder(row=2, sticky="w") / (
+                    (
+                        W(tk.Frame) * Packer(side="left", padx=2) / (
+                            W(tk.Label, textvariable=self.metricvars[m], font=("Microsoft Yahei UI", 8)) * Packer(anchor="w"),
+                            W(tk.Canvas, width=self.SPARK_SIZE[0], height=self.SPARK_SIZE[1], bg="white", highlightthickness=0) * Packer()
+                        )
+                    ) for m in self.METRIC_NAMES
+                ),
+                W(tk.Label, textvariable=self.context.alertvar, fg="#c00000", font=font10) * Gridder(row=3, sticky="w")
             )
         )
 
+        self.context.bots.listeners.append(self.update_start_button)
+        self.context.bots.listeners.append(self.update_monitor)
         self.context.cwd_updator()
+        self.first_frame_at: Optional[float] = None
+        self.win.base.after_idle(self.on_first_frame)
+
+    def on_first_frame(self) -> None:
+        self.first_frame_at = time.perf_counter()
+        instrument.complete("startup.first_frame", t0, self.first_frame_at)
+        # let the window finish painting before loading heavy modules
+        self.win.base.after(self.WARMUP_DELAY, self.warm_up)
+
+    def show_mirrors(self) -> None:
+        lines = [
+            f"{s.url}  {(s.latency or 0) * 1000:.0f} ms  {(s.throughput or 0) / 1024:.0f} KiB/s" if s.healthy
+            else f"{s.url}  不可用（{s.error}）"
+            for s in self.context.mirrors.ranked()
+        ]
+        lines.append(f"\n当前使用：{self.context.tmp_index or '默认下载源'}")
+        messagebox.showinfo("下载源测速", "\n".join(lines), master=self.win.base)
+
+    def warm_up(self) -> None:
+        prefetch(wing, dotenv_main)
+        registry.refresh_in_background()
+        # the ranking of the last run is used until probing finishes
+        self.context.select_mirror()
+        self.context.probe_mirrors()
 
     def run(self) -> None:
         self.win.loop()
+        # edits not yet written when the window is closed
+        ProjectConfig.flush_all()
+        # their output pipes are closed with the window
+        self.context.supervisor.terminate_all()
+        self.context.bots.close()
 
     def open_project(self) -> None:
         self.context.cwd_str = filedialog.askdirectory(mustexist=True, parent=self.win.base, title="选择项目目录")
@@ -180,31 +849,100 @@ class MainApp(Application):
         if not self.context.cwd_valid:
             messagebox.showerror("错误", "当前目录不是正确的项目目录。", master=self.win.base)
             return
-        self.win[1][0][1].disabled = True
-        self.win[1][1].disabled = True
-        curproc, tmp = exec_new_win(
-            f'''"{sys.executable}" -m nb_cli run''',
-            cwd=self.context.cwd_str
-        )
-
-        def _restore():
-            try:
-                while curproc.poll() is None:
-                    pass
-            except Exception as e:
-                messagebox.showerror("错误", f"{e}", master=self.win.base)
-            finally:
-                # os.remove(tmp)
-                self.win[1][0][1].disabled = False
-                self.win[1][1].disabled = False
+        bot = self.context.bots.add(self.context.cwd_str)
+        if bot.running:
+            self.context.show_output(bot.run)
+            return
+        self.context.start_bot(bot, show=True)
 
-        Thread(target=_restore).start()
+    def toggle_start(self) -> None:
+        bot = self.context.current_bot
+        if bot is not None and bot.active:
+            self.context.stop_bot(bot)
+        else:
+            self.start()
+
+    @staticmethod
+    def format_metric(metric: str, value: float) -> str:
+        if metric == "cpu":
+            return f"{value:.0%}"
+        if metric == "rss":
+            return f"{value / (1 << 20):.0f} MiB"
+        return f"{value:.0f}"
+
+    def update_monitor(self) -> None:
+        # sparklines of the bot of the current project
+        bot = self.context.current_bot
+        metrics = bot.metrics if bot is not None and bot.running else None
+        w, h = self.SPARK_SIZE
+        for n, m in enumerate(self.METRIC_NAMES):
+            canvas = cast(tk.Canvas, self.win[1][2][n][1].base)
+            canvas.delete("all")
+            series = list(metrics.series[m]) if metrics is not None else []
+            last = f"{self.format_metric(m, series[-1])}" if series else "-"
+            self.metricvars[m].set(f"{self.METRIC_NAMES[m]} {last}")
+            if len(series) < 2:
+                continue
+            top = max(max(series), 1e-9)
+            step = (w - 2) / (len(series) - 1)
+            points = [
+                c for i, v in enumerate(series)
+                for c in (1 + i * step, h - 2 - (h - 4) * v / top)
+            ]
+            canvas.create_line(*points, fill=self.METRIC_COLORS[m])
+
+    def update_start_button(self) -> None:
+        # the button controls the bot of the current project
+        bot = self.context.current_bot
+        self.win[1][1].disabled = not self.context.cwd_valid or (bot is not None and bot.state == bots.STOPPING)
+        self.win[1][1].text = "停止" if bot is not None and bot.active else "启动"
 
     def open_pdir(self) -> None:
         if not self.context.cwd_valid:
             messagebox.showerror("错误", "当前目录不是正确的项目目录。", master=self.win.base)
             return
-        system_open(self.context.cwd_str)
+        wing.system_open(self.context.cwd_str)
+
+
+class RegistryLoading(ApplicationWithContext):
+    NAMES = {"drivers": "驱动器", "adapters": "适配器", "plugins": "插件"}
+
+    def __init__(self, base, context: Context, names: Tuple[str, ...], opener: Callable[[], Any]) -> None:
+        self.names = names
+        self.opener = opener
+        super().__init__(base, context)
+
+    def setup(self) -> None:
+        self.win.title = "NoneBot Desktop - 正在获取数据"
+        self.statusvar = StringVar()
+
+        self.win /= (
+            W(tk.Label, textvariable=self.statusvar, font=font10, justify="left", wraplength=360) * Packer(anchor="nw", fill="both", expand=True, padx=8, pady=8),
+            W(tk.Button, text="重试", font=font10, command=self.retry) * Packer(side="right"),
+        )
+
+        # subscribed first, so a fetch finishing in between is not missed
+        self.context.subscribe_registry(self.win.base, lambda _: self.update_status())
+        self.update_status()
+
+    def update_status(self) -> None:
+        states = {n: registry.status(n) for n in self.names}
+        if all(s == READY for s in states.values()):
+            self.win.destroy()
+            self.opener()
+            return
+        failed = [n for n, s in states.items() if s == FAILED]
+        self.win[1].disabled = not failed
+        if failed:
+            self.statusvar.set("获取以下列表失败，请检查网络后重试：\n" + "\n".join(
+                f"{self.NAMES[n]}：{registry.errors.get(n, '')}" for n in failed
+            ))
+        else:
+            self.statusvar.set(f"正在从 NoneBot 官网获取{'、'.join(self.NAMES[n] for n in self.names)}列表，请稍候……")
+
+    def retry(self) -> None:
+        registry.refresh_in_background(self.names)
+        self.update_status()
 
 
 class CreateProject(ApplicationWithContext):
@@ -212,10 +950,13 @@ class CreateProject(ApplicationWithContext):
         self.win.title = "NoneBot Desktop - 新建项目"
         self.win.base.grab_set()
         self.create_target = StringVar()
-        self.driver_select_state = [BooleanVar(value=d.name == "FastAPI") for d in meta.drivers]
-        self.adapter_select_state = [BooleanVar(value=False) for _ in meta.adapters]
+        self.drivers = registry.drivers
+        self.adapters = registry.adapters
+        self.driver_select_state = [BooleanVar(value=d.name == "FastAPI") for d in self.drivers]
+        self.adapter_select_state = [BooleanVar(value=False) for _ in self.adapters]
         self.dev_mode = BooleanVar(value=False)
         self.use_venv = BooleanVar(value=True)
+        self.stagevars = {stage: StringVar(value=f"{creator.STAGE_NAMES[stage]}：{creator.STATUS_NAMES[creator.PENDING]}") for stage in creator.STAGES}
 
         self.win /= (
             W(tk.Frame) * Packer(fill="x", expand=True, padx=2, pady=2) / (
@@ -225,26 +966,30 @@ class CreateProject(ApplicationWithContext):
             ),
             W(tk.LabelFrame, text="驱动器", font=font10) * Packer(fill="x", expand=True) / (
                 W(tk.Checkbutton, text=f"{dr.name} ({dr.desc})", variable=dv, font=font10) * Packer(side="top", anchor="w")
-                for dr, dv in zip(meta.drivers, self.driver_select_state)
+                for dr, dv in zip(self.drivers, self.driver_select_state)
             ),
             W(tk.LabelFrame, text="适配器", font=font10) * Packer(fill="x", expand=True) / (
                 W(tk.Checkbutton, text=f"{ad.name} ({ad.desc})", variable=av, font=font10) * Packer(side="top", anchor="w")
-                for ad, av in zip(meta.adapters, self.adapter_select_state)
+                for ad, av in zip(self.adapters, self.adapter_select_state)
             ),
             W(tk.Frame) * Packer(fill="x", expand=True) / (
                 W(tk.Checkbutton, text="预留配置用于开发插件（将会创建 src/plugins）", variable=self.dev_mode, font=font10) * Packer(anchor="w"),
                 W(tk.Checkbutton, text="创建虚拟环境（位于 .venv，用于隔离环境）", variable=self.use_venv, font=font10) * Packer(anchor="w"),
             ),
             W(tk.LabelFrame, text="自定义下载源", font=font10) * Packer(fill="x", expand=True) / (
-                W(ttk.Combobox, textvariable=self.context.tmpindex, value=PYPI_MIRRORS, font=mono10, width=50) * Packer(side="left", fill="x", expand=True),
+                W(ttk.Combobox, textvariable=self.context.tmpindex, value=self.context.mirror_urls(), font=mono10, width=50) * Packer(side="left", fill="x", expand=True),
             ),
-            W(tk.Frame) * Packer(fill="x", expand=True)
+            W(tk.Frame) * Packer(fill="x", expand=True),
+            W(tk.LabelFrame, text="创建进度", font=font10) * Packer(fill="x", expand=True) / (
+                W(tk.Label, textvariable=self.stagevars[stage], font=font10) * Packer(anchor="w")
+                for stage in creator.STAGES
+            )
         )
 
         self.create_btn = self.win[5].add_widget(tk.Button, text="创建", font=font10)
         self.create_btn *= Packer(side="right")
         self.create_btn.disabled = True
-        self.create_btn.callback(lambda: Thread(target=self.perform_create).start())
+        self.create_btn.callback(self.perform_create)
 
         self.create_target.trace_add("write", self.ct_checker)
 
@@ -281,8 +1026,8 @@ class CreateProject(ApplicationWithContext):
         self.ct_str = filedialog.askdirectory(parent=self.win.base, title="选择项目目录")
 
     def perform_create(self) -> None:
-        drivs = [d for d, b in zip(meta.drivers, self.driver_select_state) if b.get()]
-        adaps = [a for a, b in zip(meta.adapters, self.adapter_select_state) if b.get()]
+        drivs = [d for d, b in zip(self.drivers, self.driver_select_state) if b.get()]
+        adaps = [a for a, b in zip(self.adapters, self.adapter_select_state) if b.get()]
         if not drivs:
             messagebox.showerror("错误", "NoneBot2 项目需要*至少一个*驱动器才能正常工作！", master=self.win.base)
             return
@@ -291,26 +1036,76 @@ class CreateProject(ApplicationWithContext):
             return
         self.create_btn.text = "正在创建项目……"
         self.create_btn.disabled = True
+        for stage in creator.STAGES:
+            self.show_stage(stage, creator.PENDING, 0.0)
+        self.timer = creator.StageTimer(lambda *a: self.context.post(partial(self.show_stage, *a)))
+        args = (Path(self.ct_str), drivs, adaps, self.dev_mode.get(), self.use_venv.get())
+        Thread(target=self._create_worker, args=args, daemon=True).start()
+
+    def show_stage(self, stage: str, status: str, secs: float) -> None:
+        text = f"{creator.STAGE_NAMES[stage]}：{creator.STATUS_NAMES[status]}"
+        if status in (creator.DONE, creator.FAILED):
+            text += f"（{secs:.1f} 秒）"
+        self.stagevars[stage].set(text)
+
+    def _create_worker(self, target: Path, drivs: List[Any], adaps: List[Any], *args) -> None:
+        # files and the environment are made at the same time
         try:
-            create(
-                self.ct_str, drivs, adaps, self.dev_mode.get(), self.use_venv.get(),
-                self.context.tmp_index, new_win=True
-            )
+            with instrument.span("create", target=str(target)):
+                creator.prepare(target, drivs, adaps, *args, timer=self.timer)
         except Exception as e:
-            messagebox.showerror("错误", f"{e}", master=self.win.base)
+            self.context.post(partial(self._create_failed, e))
             return
-        self.context.cwd_str = self.ct_str
+        self.context.post(partial(self._create_installing, target, creator.packages(drivs, adaps)))
+
+    def _create_failed(self, e: BaseException) -> None:
+        if "install" in self.timer.started and "install" not in self.timer.times:
+            self.timer.finish("install", creator.FAILED)
+        messagebox.showerror("错误", f"{e}", master=self.win.base)
+        self.create_btn.text = "创建"
+        self.create_btn.disabled = False
+
+    def _create_step(self, target: Path, title: str, make: Callable[[str], List[str]], then: ExitCallback, command: str = "install") -> None:
+        # run with the selected mirror, and the next ones if it fails
+        try:
+            p = self.context.spawn_indexed(make)
+        except OSError as e:
+            self._create_failed(e)
+            return
+        self.context.run_process(f"新建项目 - {target.name} - {title}", p, then, "pip", command=command)
+
+    def _create_installing(self, target: Path, reqs: List[str]) -> None:
+        # all packages are installed by one pip run, resolved against the
+        # index; wheels already in the store are used instead of downloads
+        self.create_btn.text = "正在安装依赖……"
+        self.timer.start("install")
+        pyexec = str(wing.find_python(target))
+        self._create_step(
+            target, "安装依赖", partial(creator.pip_install_stored, pyexec, reqs),
+            partial(self._create_done, target)
+        )
+
+    def _create_done(self, target: Path, code: Optional[int], e: Optional[BaseException]) -> None:
+        if e is not None or code:
+            self._create_failed(e or Exception(f"安装依赖失败，返回值 {code}，详见运行输出。"))
+            return
+        self.timer.finish("install")
+        total = sum(self.timer.times.values())
+        print(f"[CreateProject] Created {target}: " + ", ".join(f"{k} {v:.1f}s" for k, v in self.timer.times.items()))
+        self.context.cwd_str = str(target)
         try:
             self.win.destroy()
         except TclError:
             pass
-        messagebox.showinfo(title="项目创建完成", message="项目创建成功，已自动进入该项目。", master=self.context.main.win.base)
+        messagebox.showinfo(title="项目创建完成", message=f"项目创建成功，已自动进入该项目。\n共用时 {total:.1f} 秒。", master=self.context.main.win.base)
 
 
-class DriverManager(ApplicationWithContext):
+class DriverManager(BulkApplication):
     def setup(self) -> None:
-        self.drv_installed_states = [StringVar(value="安装") for _ in meta.drivers]  # drivers' states (installed, not installed)
-        self.drv_enabled_states = [StringVar(value="启用") for _ in meta.drivers]  # drivers' states (enabled, disabled)
+        self.drivers = registry.drivers
+        self.drv_installed_states = [StringVar(value="安装") for _ in self.drivers]  # drivers' states (installed, not installed)
+        self.drv_enabled_states = [StringVar(value="启用") for _ in self.drivers]  # drivers' states (enabled, disabled)
+        self.drv_selected = [BooleanVar(value=False) for _ in self.drivers]
         self.win.title = "NoneBot Desktop - 管理驱动器"
         self.win.resizable = False
         self.win.base.grab_set()
@@ -322,17 +1117,21 @@ class DriverManager(ApplicationWithContext):
                         W(tk.Label, text=drv.desc, font=font10, width=20, height=3, justify="left") * Packer(anchor="nw", side="top"),
                         W(tk.Frame) * Packer(anchor="nw", fill="x", side="top", expand=True) / (
                             W(tk.Button, font=font10, textvariable=self.drv_enabled_states[n], command=partial(self.perform_enable, n)) * Packer(fill="x", side="left", expand=True),
-                            W(tk.Button, font=font10, textvariable=self.drv_installed_states[n], command=partial(self.perform_install, n)) * Packer(fill="x", side="left", expand=True)
+                            W(tk.Button, font=font10, textvariable=self.drv_installed_states[n], command=partial(self.perform_install, n)) * Packer(fill="x", side="left", expand=True),
+                            W(tk.Checkbutton, text="选择", font=font10, variable=self.drv_selected[n]) * Packer(side="left")
                         )
                     )
-                ) for n, drv in enumerate(meta.drivers)
+                ) for n, drv in enumerate(self.drivers)
             ),
             W(tk.LabelFrame, text="自定义下载源", font=font10) * Packer(anchor="sw", fill="x", side="top", expand=True) / (
-                W(ttk.Combobox, textvariable=self.context.tmpindex, value=PYPI_MIRRORS, font=mono10) * Packer(side="left", fill="x", expand=True),
-            )
+                W(ttk.Combobox, textvariable=self.context.tmpindex, value=self.context.mirror_urls(), font=mono10) * Packer(side="left", fill="x", expand=True),
+            ),
+            self.bulk_bar()
         )
 
         self.driver_st_updator()
+        self.context.subscribe_dists(self.win.base, lambda _: self.driver_st_updator())
+        self.context.subscribe_config(self.win.base, self.driver_st_updator)
 
     def driver_st_updator(self) -> None:
         _enabled = recursive_find_env_config(self.context.cwd_str, "DRIVER")
@@ -341,9 +1140,9 @@ class DriverManager(ApplicationWithContext):
         else:
             enabled = _enabled.split("+")
 
-        for n, d in enumerate(meta.drivers):
+        for n, d in enumerate(self.drivers):
             self.drv_enabled_states[n].set("禁用" if d.module_name in enabled else "启用")
-            if d.name.lower() in self.context.curdistnames:
+            if self.context.is_installed(d.name):
                 self.drv_installed_states[n].set("已安装")
                 self.win[0][n][1][0].disabled = False
                 self.win[0][n][1][1].disabled = True
@@ -356,8 +1155,20 @@ class DriverManager(ApplicationWithContext):
                 self.win[0][n][1][0].disabled = False
                 self.win[0][n][1][1].disabled = True
 
+    def selected_ops(self, action: str) -> List[PendingOp]:
+        return [
+            PendingOp(action, "driver", d.name, d.project_link, d.module_name)
+            for d, sel in zip(self.drivers, self.drv_selected)
+            # uninstalling drivers is not supported
+            if sel.get() and action != "uninstall" and (action in ("enable", "disable") or d.name != "None")
+        ]
+
+    def clear_selection(self) -> None:
+        for sel in self.drv_selected:
+            sel.set(False)
+
     def perform_enable(self, n: int) -> None:
-        target = meta.drivers[n]
+        target = self.drivers[n]
         _enabled = recursive_find_env_config(self.context.cwd_str, "DRIVER")
         if _enabled is None:
             enabled = []
@@ -369,41 +1180,31 @@ class DriverManager(ApplicationWithContext):
         else:
             enabled.append(target.module_name)
 
-        recursive_update_env_config(self.context.cwd_str, "DRIVER", "+".join(enabled))
-        self.context.upddists()
+        EnvIndex.of(self.context.cwd_str).set("DRIVER", "+".join(enabled))
+        # installed packages are not changed
         self.driver_st_updator()
 
     def perform_install(self, n: int) -> None:
-        target = meta.drivers[n]
-        cfp = self.context.cwd_path
+        target = self.drivers[n]
         self.win[0][n][1][1].disabled = True
 
-        p, tmp = molecules.perform_pip_install(
-            str(find_python(cfp)),
-            target.project_link,
-            index=self.context.tmp_index,
-            new_win=True
-        )
+        p = self.context.spawn_pip("install", target.project_link, index=True)
 
-        def _restore():
-            try:
-                while p.poll() is None:
-                    pass
-            except Exception as e:
+        def _restore(_, e: Optional[BaseException]):
+            if e is not None:
                 messagebox.showerror("错误", f"{e}", master=self.win.base)
-            finally:
-                # os.remove(tmp)
-                self.context.upddists()
-                self.driver_st_updator()
+            self.context.refresh_dists(self.driver_st_updator)
 
-        Thread(target=_restore).start()
+        self.context.run_process(f"安装 {target.project_link}", p, _restore, "pip install", packages=[target.project_link])
 
 
-class AdapterManager(ApplicationWithContext):
+class AdapterManager(BulkApplication):
     def setup(self) -> None:
         self.context.check_pyproject_toml()
-        self.adp_installed_state = [StringVar(value="安装") for _ in meta.adapters]  # adapters' states (installed, not installed)
-        self.adp_enabled_state = [StringVar(value="启用") for _ in meta.adapters]  # adapters' states (enabled, disabled)
+        self.adapters = registry.adapters
+        self.adp_installed_state = [StringVar(value="安装") for _ in self.adapters]  # adapters' states (installed, not installed)
+        self.adp_enabled_state = [StringVar(value="启用") for _ in self.adapters]  # adapters' states (enabled, disabled)
+        self.adp_selected = [BooleanVar(value=False) for _ in self.adapters]
         self.win.title = "NoneBot Desktop - 管理适配器"
         self.win.resizable = False
         self.win.base.grab_set()
@@ -415,75 +1216,75 @@ class AdapterManager(ApplicationWithContext):
                         W(tk.Label, text=adp.desc, font=font10, width=40, height=3, justify="left") * Packer(anchor="nw", side="top"),
                         W(tk.Frame) * Packer(anchor="nw", fill="x", side="top", expand=True) / (
                             W(tk.Button, font=font10, textvariable=self.adp_enabled_state[n], command=partial(self.perform_enable, n)) * Packer(fill="x", side="left", expand=True),
-                            W(tk.Button, font=font10, textvariable=self.adp_installed_state[n], command=partial(self.perform_install, n)) * Packer(fill="x", side="left", expand=True)
+                            W(tk.Button, font=font10, textvariable=self.adp_installed_state[n], command=partial(self.perform_install, n)) * Packer(fill="x", side="left", expand=True),
+                            W(tk.Checkbutton, text="选择", font=font10, variable=self.adp_selected[n]) * Packer(side="left")
                         )
                     )
-                ) for n, adp in enumerate(meta.adapters)
+                ) for n, adp in enumerate(self.adapters)
             ),
             W(tk.LabelFrame, text="自定义下载源", font=font10) * Packer(anchor="sw", fill="x", side="top", expand=True) / (
-                W(ttk.Combobox, textvariable=self.context.tmpindex, value=PYPI_MIRRORS, font=mono10) * Packer(side="left", fill="x", expand=True),
-            )
+                W(ttk.Combobox, textvariable=self.context.tmpindex, value=self.context.mirror_urls(), font=mono10) * Packer(side="left", fill="x", expand=True),
+            ),
+            self.bulk_bar()
         )
 
         self.adapter_st_updator()
+        self.context.subscribe_dists(self.win.base, lambda _: self.adapter_st_updator())
+        self.context.subscribe_config(self.win.base, self.adapter_st_updator)
 
     def adapter_st_updator(self) -> None:
-        conf = get_toml_config(self.context.cwd_str)
-        if not (data := conf._get_data()):
-            raise RuntimeError("Config file not found!")
-        table: Dict[str, Any] = data.setdefault("tool", {}).setdefault("nonebot", {})
-        _enabled: List[Dict[str, str]] = table.setdefault("adapters", [])
-        enabled = [a["module_name"] for a in _enabled]
-
-        for n, d in enumerate(meta.adapters):
-            installed_ = d.project_link in self.context.curdistnames
+        enabled = self.context.config.require().adapters
+
+        for n, d in enumerate(self.adapters):
+            installed_ = self.context.is_installed(d.project_link)
             enabled_ = d.module_name in enabled
             self.adp_installed_state[n].set("卸载" if installed_ else "安装")
             self.win[0][n][1][0].disabled = not (enabled_ or installed_)
             self.adp_enabled_state[n].set("禁用" if enabled_ else "启用")
             self.win[0][n][1][1].disabled = enabled_
 
+    def selected_ops(self, action: str) -> List[PendingOp]:
+        return [
+            PendingOp(action, "adapter", a.name, a.project_link, a.module_name)
+            for a, sel in zip(self.adapters, self.adp_selected) if sel.get()
+        ]
+
+    def clear_selection(self) -> None:
+        for sel in self.adp_selected:
+            sel.set(False)
+
     def perform_enable(self, n: int) -> None:
-        target = meta.adapters[n]
-        slimtarget = lazylib.nb_cli.config.SimpleInfo.parse_obj(target)
-        conf = get_toml_config(self.context.cwd_str)
+        target = self.adapters[n]
+        slimtarget = wing.lazylib.nb_cli.config.SimpleInfo.parse_obj(target).dict()
+        conf = self.context.config
         if self.adp_enabled_state[n].get() == "禁用":
             conf.remove_adapter(slimtarget)
         else:
             conf.add_adapter(slimtarget)
+        self.context.config_changed()
         self.adapter_st_updator()
 
     def perform_install(self, n: int) -> None:
-        target = meta.adapters[n]
-        cfp = Path(self.context.cwd_str)
+        target = self.adapters[n]
         self.win[0][n][1][1].disabled = True
 
-        p, tmp = (
-            molecules.perform_pip_install(
-                str(find_python(cfp)),
-                target.project_link,
-                index=self.context.tmp_index,
-                new_win=True
-            ) if self.adp_installed_state[n].get() == "安装" else
-            molecules.perform_pip_command(
-                str(find_python(cfp)),
-                "uninstall", target.project_link,
-                new_win=True
-            )
+        install = self.adp_installed_state[n].get() == "安装"
+        p = (
+            self.context.spawn_pip("install", target.project_link, index=True)
+            if install else
+            self.context.spawn_pip("uninstall", "-y", target.project_link)
         )
 
-        def _restore():
-            try:
-                while p.poll() is None:
-                    pass
-            except Exception as e:
+        def _restore(_, e: Optional[BaseException]):
+            if e is not None:
                 messagebox.showerror("错误", f"{e}", master=self.win.base)
-            finally:
-                # os.remove(tmp)
-                self.context.upddists()
-                self.adapter_st_updator()
+            self.context.refresh_dists(self.adapter_st_updator)
 
-        Thread(target=_restore).start()
+        action = "pip install" if install else "pip uninstall"
+        self.context.run_process(
+            f"{'安装' if install else '卸载'} {target.project_link}", p, _restore, action,
+            packages=[target.project_link]
+        )
 
 
 class BuiltinPlugins(ApplicationWithContext):
@@ -491,7 +1292,7 @@ class BuiltinPlugins(ApplicationWithContext):
         self.context.check_pyproject_toml()
         self.win.title = "NoneBot Desktop - 管理内置插件"
         self.win.base.grab_set()
-        self.builtin_plugins = get_builtin_plugins(str(find_python(self.context.cwd_str)))
+        self.builtin_plugins = wing.get_builtin_plugins(str(wing.find_python(self.context.cwd_str)))
         self.bp_enabled_states = [StringVar(value="启用") for _ in self.builtin_plugins]
 
         self.win /= (
@@ -506,33 +1307,34 @@ class BuiltinPlugins(ApplicationWithContext):
         self.updstate()
 
     def updstate(self) -> None:
-        cfg = get_toml_config(self.context.cwd_str)
-        if not (data := cfg._get_data()):
-            raise RuntimeError("Config file not found!")
-        table: Dict[str, Any] = data.setdefault("tool", {}).setdefault("nonebot", {})
-        plugins: List[str] = table.setdefault("builtin_plugins", [])
+        plugins = self.context.config.require().builtin_plugins
         for n, pl in enumerate(self.builtin_plugins):
             self.bp_enabled_states[n].set("禁用" if pl in plugins else "启用")
 
     def setnstate(self, n: int) -> None:
-        cfg = get_toml_config(self.context.cwd_str)
+        cfg = self.context.config
         if self.bp_enabled_states[n].get() == "启用":
             cfg.add_builtin_plugin(self.builtin_plugins[n])
         else:
             cfg.remove_builtin_plugin(self.builtin_plugins[n])
+        self.context.config_changed()
         self.updstate()
 
 
 class EnvironmentManager(ApplicationWithContext):
+    ORPHAN_COLOR = "#0050c0"
+
     def setup(self) -> None:
         self.win.title = "NoneBot Desktop - 管理环境"
         self.win.size = 720, 460
         self.win.base.grab_set()
         self.curpkg: str = ""
+        self.performing = False
 
         self.win /= (
             W(tk.PanedWindow, showhandle=True) * Packer(fill="both", expand=True) / (
                 W(tk.LabelFrame, text="程序包", font=font10) / (
+                    W(tk.Label, text="蓝色：未被其他程序包或项目依赖", fg=self.ORPHAN_COLOR, font=font10) * Packer(side="bottom", anchor="w"),
                     W(tk.Listbox, listvariable=self.context.distvar, font=mono10) * Packer(side="left", fill="both", expand=True),
                     W(ttk.Scrollbar) * Packer(side="right", fill="y")
                 ),
@@ -540,35 +1342,59 @@ class EnvironmentManager(ApplicationWithContext):
                     W(tk.Label, text="双击程序包以查看信息", font=font10, justify="left", wraplength=400) * Packer(anchor="nw", expand=True),
                     W(tk.Frame) * Packer(side="bottom", fill="x") / (
                         W(tk.Button, text="更新", command=self.perform_upgrade, font=font10, state="disabled") * Packer(side="left", fill="x", expand=True),
-                        W(tk.Button, text="卸载", command=self.perform_uninstall, font=font10, state="disabled") * Packer(side="right", fill="x", expand=True)
+                        W(tk.Button, text="卸载", command=self.perform_uninstall, font=font10, state="disabled") * Packer(side="left", fill="x", expand=True),
+                        W(tk.Button, text="检查更新", command=lambda: OutdatedView(self.context.main.win.sub_window(), self.context), font=font10) * Packer(side="right", fill="x", expand=True)
                     ),
                     W(tk.LabelFrame, text="自定义下载源", font=font10) * Packer(anchor="sw", fill="x", side="bottom", expand=True) / (
-                        W(ttk.Combobox, textvariable=self.context.tmpindex, value=PYPI_MIRRORS, font=mono10) * Packer(side="left", fill="x", expand=True),
+                        W(ttk.Combobox, textvariable=self.context.tmpindex, value=self.context.mirror_urls(), font=mono10) * Packer(side="left", fill="x", expand=True),
                     )
                 )
             ),
         )
 
-        li = cast(tk.Listbox, self.win[0][0][0].base)
-        sl = cast(ttk.Scrollbar, self.win[0][0][1].base)
+        li = cast(tk.Listbox, self.win[0][0][1].base)
+        sl = cast(ttk.Scrollbar, self.win[0][0][2].base)
         li.config(yscrollcommand=sl.set)
         sl.config(command=li.yview)
+        self.context.distviews.append(li)
+        self.context.subscribe_dists(self.win.base, lambda _: self.performing or self.info_updator())
+        self.context.subscribe_dists(self.win.base, lambda _: self.mark_orphans())
+        self.mark_orphans()
 
-        lbx = self.win[0][0][0]  # for compatibility with py38
+        lbx = self.win[0][0][1]  # for compatibility with py38
 
         @lbx.on(str(LMB - X2))
         def showinfo(event: Event):
             self.curpkg = event.widget.get(event.widget.curselection())
             self.info_updator()
 
+    def mark_orphans(self) -> None:
+        li = cast(tk.Listbox, self.win[0][0][1].base)
+        orphans = set(self.context.depgraph.orphans(self.context.kept_packages()))
+        for n, key in enumerate(self.context.curdistnames):
+            li.itemconfig(n, fg=self.ORPHAN_COLOR if key in orphans else "")
+
+    @staticmethod
+    def _names(keys: Iterable[str]) -> str:
+        return ", ".join(sorted(keys)) or "无"
+
     def info_updator(self) -> None:
         if m := self.context.curdist_dict.get(self.curpkg, None):
-            dm = m.metadata
-            self.win[0][1][0].text = (
-                f"名称：{dm['name']}\n"
-                f"版本：{dm['version']}\n"
-                f"摘要：{dm['summary']}\n"
+            graph = self.context.depgraph
+            rdeps = graph.rdeps[m.key]
+            text = (
+                f"名称：{m.name}\n"
+                f"版本：{m.version}\n"
+                f"摘要：{m.summary}\n\n"
+                f"依赖：{self._names(graph.deps[m.key])}\n"
+                f"被依赖：{self._names(rdeps) if rdeps else '无（可能是手动安装的，或是不再需要的程序包）'}\n"
             )
+            if m.key in graph.missing:
+                text += f"缺少依赖：{self._names(graph.missing[m.key])}\n"
+            closure = graph.removal_closure(m.key, self.context.kept_packages())
+            if len(closure) > 1:
+                text += f"卸载时可一并移除：{self._names(closure[1:])}\n"
+            self.win[0][1][0].text = text
         else:
             self.win[0][1][0].text = "双击程序包以查看信息"
 
@@ -576,95 +1402,361 @@ class EnvironmentManager(ApplicationWithContext):
         self.win[0][1][1][1].disabled = not m
 
     def lock_when_perform(self, lock: bool = True) -> None:
-        self.win[0][0][0].disabled = lock
+        self.performing = lock
+        self.win[0][0][1].disabled = lock
         self.win[0][1][2][0].disabled = lock
 
-    def restore_after_perform(self, popen, tmpfile) -> None:
-        try:
-            while popen.poll() is None:
-                pass
-        except Exception as e:
+    def restore_after_perform(self, _, e: Optional[BaseException]) -> None:
+        if e is not None:
             messagebox.showerror("错误", f"{e}", master=self.win.base)
-        finally:
-            # os.remove(tmpfile)
-            self.context.upddists()
-            self.lock_when_perform(False)
-            self.info_updator()
+        self.context.refresh_dists(self._restore_after_refresh)
+
+    def _restore_after_refresh(self) -> None:
+        self.lock_when_perform(False)
+        self.info_updator()
 
     def perform_upgrade(self) -> None:
         self.lock_when_perform(True)
         self.win[0][1][1][0].disabled = True
         self.win[0][1][1][1].disabled = True
 
-        p, tmp = molecules.perform_pip_install(
-            str(find_python(self.context.cwd_str)),
-            self.curpkg,
-            update=True,
-            index=self.context.tmp_index,
-            new_win=True
-        )
-
-        Thread(target=self.restore_after_perform, args=(p, tmp)).start()
+        p = self.context.spawn_pip("install", self.curpkg, "-U", index=True)
+        self.context.run_process(f"升级 {self.curpkg}", p, self.restore_after_perform, "pip install", packages=[self.curpkg])
 
     def perform_uninstall(self) -> None:
+        graph = self.context.depgraph
+        key = self.curpkg
+        rdeps = graph.rdeps.get(key, set())
+        if rdeps and not messagebox.askyesno(
+            "警告", f"以下程序包依赖 {key}，卸载后它们可能无法正常工作：\n{self._names(rdeps)}\n\n仍要卸载吗？",
+            master=self.win.base
+        ):
+            return
+        targets = [key]
+        closure = graph.removal_closure(key, self.context.kept_packages())
+        if len(closure) > 1:
+            ans = messagebox.askyesnocancel(
+                "提示", f"以下程序包只被 {key} 及其依赖需要，卸载后将不再被使用：\n{self._names(closure[1:])}\n\n是否一并卸载？",
+                master=self.win.base
+            )
+            if ans is None:
+                return
+            if ans:
+                targets = closure
+
         self.lock_when_perform(True)
         self.win[0][1][1][0].disabled = True
         self.win[0][1][1][1].disabled = True
 
-        p, tmp = molecules.perform_pip_command(
-            str(find_python(self.context.cwd_str)),
-            "uninstall", self.curpkg, new_win=True
+        p = self.context.spawn_pip("uninstall", "-y", *targets)
+        title = key if len(targets) == 1 else f"{key} 等 {len(targets)} 个程序包"
+        self.context.run_process(f"卸载 {title}", p, self.restore_after_perform, "pip uninstall", packages=targets)
+
+
+class OutdatedView(ApplicationWithContext):
+    COLUMNS = (("name", "名称", 200), ("current", "当前版本", 110), ("latest", "最新版本", 110))
+
+    def setup(self) -> None:
+        self.win.title = "NoneBot Desktop - 检查更新"
+        self.win.base.grab_set()
+        self.progress = StringVar(value="")
+        self.outdated: Dict[str, Outdated] = {}
+        self.checking = False
+        self.upgrading = False
+        # results of an earlier check are dropped
+        self.generation = 0
+        self.closed = False
+
+        self.win /= (
+            W(tk.LabelFrame, text="可更新的程序包", font=font10) * Packer(anchor="nw", fill="both", expand=True) / (
+                W(ttk.Treeview, columns=[c for c, _, _ in self.COLUMNS], show="headings", selectmode="extended", height=14) * Packer(side="left", fill="both", expand=True),
+                W(ttk.Scrollbar) * Packer(side="right", fill="y")
+            ),
+            W(tk.Label, textvariable=self.progress, font=font10, justify="left") * Packer(anchor="w", fill="x"),
+            W(tk.Frame) * Packer(anchor="sw", fill="x") / (
+                W(tk.Button, text="全选", font=font10, command=self.select_all) * Packer(side="left"),
+                W(tk.Button, text="重新检查", font=font10, command=lambda: self.check(refresh=True)) * Packer(side="left"),
+                W(tk.Button, text="升级所选", font=font10, command=self.upgrade_selected) * Packer(side="right"),
+            )
         )
 
-        Thread(target=self.restore_after_perform, args=(p, tmp)).start()
+        self.tree = cast(ttk.Treeview, self.win[0][0].base)
+        sl = cast(ttk.Scrollbar, self.win[0][1].base)
+        self.tree.config(yscrollcommand=sl.set)
+        sl.config(command=self.tree.yview)
+        for col, title, width in self.COLUMNS:
+            self.tree.heading(col, text=title)
+            self.tree.column(col, width=width, stretch=col == "name")
+        self.win.base.bind("<Destroy>", self._closed, add="+")
+        self.check()
+
+    def _closed(self, event: Event) -> None:
+        if event.widget is self.win.base:
+            self.closed = True
+
+    def update_buttons(self) -> None:
+        busy = self.checking or self.upgrading
+        self.win[2][1].disabled = busy
+        self.win[2][2].disabled = busy or not self.outdated
+
+    def check(self, refresh: bool = False) -> None:
+        if self.checking:
+            return
+        self.checking = True
+        self.generation += 1
+        self.update_buttons()
+        self.progress.set("正在检查更新……")
+        Thread(
+            target=self._check_worker,
+            args=(list(self.context.curdists), self.context.tmp_index, refresh, self.generation),
+            daemon=True
+        ).start()
+
+    def _check_worker(self, records: List[DistRecord], index: str, refresh: bool, gen: int) -> None:
+        # results are posted back to the Tk thread
+        def _progress(done: int, total: int) -> None:
+            self.context.post(partial(self.show_progress, gen, done, total), ("outdated", id(self)))
+
+        try:
+            with instrument.span("OutdatedChecker.check", dists=len(records), refresh=refresh):
+                found, errors = OutdatedChecker(index).check(records, refresh, _progress, lambda: self.closed)
+        except Exception as e:
+            self.context.post(partial(self.show_result, gen, [], {"": f"{type(e).__name__}: {e}"}))
+            return
+        self.context.post(partial(self.show_result, gen, found, errors))
+
+    def show_progress(self, gen: int, done: int, total: int) -> None:
+        if self.closed or gen != self.generation or not self.checking:
+            return
+        self.progress.set(f"正在检查更新…… {done}/{total}")
+
+    def show_result(self, gen: int, found: List[Outdated], errors: Dict[str, str]) -> None:
+        if self.closed or gen != self.generation:
+            return
+        self.checking = False
+        self.outdated = {o.key: o for o in found}
+        self.tree.delete(*self.tree.get_children())
+        for o in found:
+            self.tree.insert("", "end", iid=o.key, values=(o.name, o.current, o.latest))
+        text = f"共有 {len(found)} 个程序包可以更新。" if found else "所有程序包均为最新版本。"
+        if errors:
+            print(f"[OutdatedView] Failed to check: {errors}")
+            text += f"\n{len(errors)} 个程序包检查失败：{', '.join(sorted(k for k in errors if k))}"
+        self.progress.set(text)
+        self.update_buttons()
+
+    def select_all(self) -> None:
+        self.tree.selection_set(self.tree.get_children())
+
+    def upgrade_selected(self) -> None:
+        names = [self.outdated[k].name for k in self.tree.selection() if k in self.outdated]
+        if not names:
+            messagebox.showinfo("提示", "请先选择要升级的程序包。", master=self.win.base)
+            return
+        self.upgrading = True
+        self.update_buttons()
+        # one pip run resolves all upgrades together
+        p = self.context.spawn_pip("install", "-U", *names, index=True)
+        title = names[0] if len(names) == 1 else f"{names[0]} 等 {len(names)} 个程序包"
+        self.context.run_process(f"升级 {title}", p, self._upgraded, "pip install", packages=names)
+
+    def _upgraded(self, _, e: Optional[BaseException]) -> None:
+        if e is not None and not self.closed:
+            messagebox.showerror("错误", f"{e}", master=self.win.base)
+        self.context.refresh_dists(self._after_refresh)
+
+    def _after_refresh(self) -> None:
+        if self.closed:
+            return
+        self.upgrading = False
+        # upgraded packages have new versions, so only they miss the cache
+        self.check()
 
 
 class DotenvEditor(ApplicationWithContext):
+    PLACEHOLDER = "[请选择一个配置文件进行编辑]"
+
     def setup(self) -> None:
         self.win.title = "NoneBot Desktop - 配置文件编辑器"
         self.win.base.grab_set()
-        self.allenvs = find_env_file(self.context.cwd_str)
-        self.target = StringVar(value="[请选择一个配置文件进行编辑]")
-        self.curenv = DotEnv(self.target_name)
-        self.curopts: List[Tuple[StringVar, StringVar]] = []
+        self.allenvs = wing.find_env_file(self.context.cwd_str)
+        self.target = StringVar(value=self.PLACEHOLDER)
+        self.filtervar = StringVar()
+        self.statusvar = StringVar()
+        self.opened: Optional[str] = None
+        # rows by iid, `origin` holds the values in the file (`None` for
+        # new rows) and `rows` the edited ones (missing if deleted)
+        self.origin: Dict[str, Optional[Tuple[str, str]]] = {}
+        self.rows: Dict[str, Tuple[str, str]] = {}
+        self.order: List[str] = []
+        self.editor: Optional[tk.Entry] = None
+        self._serial = 0
 
         self.win /= (
-            W(tk.LabelFrame, text="可用配置文件", font=font10) * Packer(anchor="nw", fill="x", expand=True) / (
+            W(tk.LabelFrame, text="可用配置文件", font=font10) * Packer(anchor="nw", fill="x") / (
                 W(ttk.Combobox, font=font10, textvariable=self.target, value=self.allenvs, width=50) * Packer(fill="x", expand=True, side="left"),
                 W(tk.Button, text="新建", font=font10, command=self.create_env, state="disabled") * Packer(side="left")
             ),
-            W(tk.LabelFrame, text="配置项", font=font10) * Packer(anchor="nw", fill="both", expand=True),
-            W(tk.Frame) * Packer(anchor="sw", fill="x", expand=True) / (
+            W(tk.LabelFrame, text="配置项", font=font10) * Packer(anchor="nw", fill="both", expand=True) / (
+                W(tk.Frame) * Packer(fill="x") / (
+                    W(tk.Label, text="筛选：", font=font10) * Packer(side="left"),
+                    W(tk.Entry, textvariable=self.filtervar, font=mono10) * Packer(side="left", fill="x", expand=True),
+                ),
+                W(ttk.Treeview, columns=["key", "value"], show="headings", selectmode="extended", height=16) * Packer(side="left", fill="both", expand=True),
+                W(ttk.Scrollbar) * Packer(side="right", fill="y")
+            ),
+            W(tk.Frame) * Packer(anchor="sw", fill="x") / (
                 W(tk.Button, text="新建配置项", font=font10, command=self.new_option) * Packer(side="left"),
+                W(tk.Button, text="删除所选", font=font10, command=self.delete_selected) * Packer(side="left"),
+                W(tk.Label, textvariable=self.statusvar, font=font10) * Packer(side="left"),
                 W(tk.Button, text="保存", font=font10, command=self.save_env) * Packer(side="right"),
             )
         )
 
-        self.save_btn = cast(Widget[tk.Button], self.win[2][1])
+        self.save_btn = cast(Widget[tk.Button], self.win[2][3])
+        self.tree = cast(ttk.Treeview, self.win[1][1].base)
+        sl = cast(ttk.Scrollbar, self.win[1][2].base)
+        self.tree.config(yscrollcommand=sl.set)
+        sl.config(command=self.tree.yview)
+        self.tree.heading("key", text="名称")
+        self.tree.heading("value", text="值")
+        self.tree.column("key", width=200, stretch=False)
+        self.tree.column("value", width=400)
+        self.tree.tag_configure("dirty", foreground="#0050c0")
+        self.tree.bind("<Double-1>", self.begin_edit)
+        self.tree.bind("<Return>", self.begin_edit)
+        self.tree.bind("<Delete>", lambda _: self.delete_selected())
+        self.win.base.protocol("WM_DELETE_WINDOW", self.close)
 
         self.target.trace_add("write", self.envf_updator)
+        self.filtervar.trace_add("write", lambda *_: self.apply_filter())
         self.envf_updator()
 
     @property
     def target_name(self) -> str:
         return self.target.get()
 
+    @property
+    def dirty(self) -> bool:
+        return any(self.rows.get(iid) != self.origin[iid] for iid in self.origin)
+
+    def confirm_discard(self) -> bool:
+        return not self.dirty or messagebox.askyesno(
+            "提示", f"{self.opened} 有未保存的更改，确定要放弃吗？", master=self.win.base
+        )
+
+    def close(self) -> None:
+        if self.confirm_discard():
+            self.win.destroy()
+
     def envf_updator(self, *_) -> None:
-        invalid = self.target_name not in self.allenvs
-        self.win[2][0].disabled = invalid
-        self.save_btn.disabled = invalid
-        self.win[0][1].disabled = not invalid
+        name = self.target_name
+        if name == self.opened:
+            return
+        if self.opened is not None and not self.confirm_discard():
+            # set back without reloading
+            self.target.set(self.opened)
+            return
+        invalid = name not in self.allenvs
+        self.win[2][0].disabled = self.win[2][1].disabled = invalid
+        self.win[0][1].disabled = not invalid or name == self.PLACEHOLDER
+        self.opened = None if invalid else name
+        self.load([])
         if invalid:
             return
-        self.curenv = DotEnv(self.context.cwd_path / self.target_name)
-        self.curopts = [(StringVar(value=k), StringVar(value=v)) for k, v in self.curenv.dict().items() if v is not None]
-        self.win[1] /= (
-            W(tk.Frame) * Packer(fill="x", expand=True) / (
-                W(tk.Entry, textvariable=k, font=mono10) * Packer(side="left"),
-                W(tk.Label, text=" = ", font=mono10) * Packer(side="left"),
-                W(tk.Entry, textvariable=v, font=mono10) * Packer(fill="x", expand=True, side="left")
-            ) for k, v in self.curopts
-        )
+        with instrument.span("DotenvEditor.load", file=name):
+            envf = read_env_file(self.context.cwd_path / name)
+            self.load([] if envf is None else [
+                (k, e.value) for k, e in sorted(envf.entries.items(), key=lambda ke: ke[1].line)
+                if e.value is not None
+            ])
+
+    def load(self, items: List[Tuple[str, str]]) -> None:
+        self.cancel_edit()
+        self.tree.delete(*self.tree.get_children())
+        self.origin, self.rows, self.order = {}, {}, []
+        for item in items:
+            iid = self._new_iid()
+            self.origin[iid] = self.rows[iid] = item
+            self.order.append(iid)
+            self.tree.insert("", "end", iid=iid, values=item)
+        self.apply_filter()
+
+    def _new_iid(self) -> str:
+        self._serial += 1
+        return f"row{self._serial}"
+
+    def apply_filter(self) -> None:
+        # rows are detached rather than deleted, so filtering is cheap
+        text = self.filtervar.get().lower()
+        n = 0
+        for iid in self.order:
+            key, value = self.rows[iid]
+            if not text or text in key.lower() or text in value.lower():
+                self.tree.move(iid, "", n)
+                n += 1
+            else:
+                self.tree.detach(iid)
+        self.update_status()
+
+    def update_status(self) -> None:
+        changed = sum(self.rows.get(iid) != self.origin[iid] for iid in self.origin)
+        text = f"共 {len(self.rows)} 项"
+        if len(self.tree.get_children()) != len(self.rows):
+            text += f"，显示 {len(self.tree.get_children())} 项"
+        if changed:
+            text += f"，已修改 {changed} 项"
+        self.statusvar.set(text)
+        title = "NoneBot Desktop - 配置文件编辑器"
+        self.win.title = f"* {title}" if changed else title
+        self.save_btn.disabled = self.opened is None or not changed
+
+    def set_row(self, iid: str, key: str, value: str) -> None:
+        self.rows[iid] = key, value
+        self.tree.item(iid, values=(key, value), tags=("dirty",) if self.origin[iid] != (key, value) else ())
+        self.update_status()
+
+    def begin_edit(self, event: Event) -> None:
+        # an entry is placed over the cell being edited
+        tree = self.tree
+        if event.type == tk.EventType.KeyPress:
+            iid, col = tree.focus(), "#2"
+        else:
+            iid, col = tree.identify_row(event.y), tree.identify_column(event.x)
+        if iid and col in ("#1", "#2"):
+            self.edit_cell(iid, int(col[1:]) - 1)
+
+    def edit_cell(self, iid: str, col: int) -> None:
+        self.cancel_edit()
+        self.tree.see(iid)
+        self.tree.update_idletasks()
+        bbox = self.tree.bbox(iid, col)
+        if not bbox:
+            return
+        x, y, w, h = bbox
+        var = StringVar(value=self.rows[iid][col])
+        entry = self.editor = tk.Entry(self.tree, textvariable=var, font=mono10)
+        entry.place(x=x, y=y, width=w, height=h)
+        entry.select_range(0, "end")
+        entry.focus_set()
+
+        def _commit(_=None):
+            if self.editor is not entry:
+                return
+            row = list(self.rows[iid])
+            row[col] = var.get().strip() if col == 0 else var.get()
+            self.cancel_edit()
+            self.set_row(iid, *row)
+            self.tree.focus_set()
+
+        entry.bind("<Return>", _commit)
+        entry.bind("<FocusOut>", _commit)
+        entry.bind("<Escape>", lambda _: (self.cancel_edit(), self.tree.focus_set()))
+
+    def cancel_edit(self) -> None:
+        if self.editor is not None:
+            editor, self.editor = self.editor, None
+            editor.destroy()
 
     def create_env(self):
         self.allenvs.append(self.target_name)
@@ -672,60 +1764,106 @@ class DotenvEditor(ApplicationWithContext):
         self.envf_updator()
 
     def new_option(self) -> None:
-        k, v = StringVar(value="参数名"), StringVar(value="值")
-        self.curopts.append((k, v))
-        _row = self.win[1].add_widget(tk.Frame)
-        _row.pack(fill="x", expand=True)
-        _key = _row.add_widget(tk.Entry, textvariable=k, font=mono10)
-        _lbl = _row.add_widget(tk.Label, text=" = ", font=mono10)
-        _val = _row.add_widget(tk.Entry, textvariable=v, font=mono10)
-        _key.pack(side="left")
-        _lbl.pack(side="left")
-        _val.pack(fill="x", expand=True, side="left")
+        iid = self._new_iid()
+        self.origin[iid] = None
+        self.rows[iid] = ("", "")
+        self.order.append(iid)
+        self.tree.insert("", "end", iid=iid, values=("", ""), tags=("dirty",))
+        self.filtervar.set("")
+        self.apply_filter()
+        self.tree.selection_set(iid)
+        self.edit_cell(iid, 0)
+
+    def delete_selected(self) -> None:
+        self.cancel_edit()
+        for iid in self.tree.selection():
+            self.rows.pop(iid, None)
+            self.order.remove(iid)
+            self.tree.delete(iid)
+            if self.origin[iid] is None:
+                del self.origin[iid]
+        self.update_status()
+
+    def changes(self) -> Dict[str, Optional[str]]:
+        # removals first, so a renamed config can take a removed name
+        res: Dict[str, Optional[str]] = {}
+        for iid, orig in self.origin.items():
+            cur = self.rows.get(iid)
+            if orig is not None and cur != orig and (cur is None or cur[0] != orig[0] or not cur[1]):
+                res[orig[0]] = None
+        for iid, cur in self.rows.items():
+            # empty names or values remove configs
+            if cur != self.origin[iid] and cur[0] and cur[1]:
+                res[cur[0]] = cur[1]
+        return res
 
     def save_env(self):
+        self.cancel_edit()
+        if self.opened is None:
+            return
+        changes = self.changes()
         try:
-            with open(self.context.cwd_path / self.target_name, "w") as f:
-                f.writelines(f"{k}={v}\n" for k, v in ((_k.get(), _v.get()) for _k, _v in self.curopts) if k and v)
+            patch_env_file(self.context.cwd_path / self.opened, changes)
         except Exception as e:
             messagebox.showerror("错误", f"{e}", master=self.win.base)
             return
+        print(f"[DotenvEditor] Saved {len(changes)} changes to {self.opened}")
 
-        def _success():
+        def _reset():
             try:
-                self.save_btn.text = "已保存"
-                time.sleep(3)
                 self.save_btn.text = "保存"
             except TclError:
                 pass
 
+        # the file may have been changed by others, read it back
+        self.opened = None
         self.envf_updator()
-        Thread(target=_success).start()
+        self.save_btn.text = "已保存"
+        self.win.base.after(3000, _reset)
 
 
-class PluginStore(ApplicationWithContext):
+class PluginStore(BulkApplication):
     PAGESIZE = 8
-    sortmethods: Dict[str, Callable[[list], list]] = {
-        "发布时间（旧-新）": lambda x: x,
-        "发布时间（新-旧）": lambda x: list(reversed(x)),
-        "模块名（A-Z）": lambda x: sorted(x, key=lambda p: p["module_name"]),
+    PAGESIZES = (4, 8, 16, 32, 64)
+    LABEL_NCH = 40
+    LABEL_NCH_PX_FACTOR = 8
+    RELEVANCE = "相关度"
+    # full orders of plugins, `None` keeps relevance order of search results
+    sortmethods: Dict[str, Callable[["PluginStore"], Optional[List[int]]]] = {
+        RELEVANCE: lambda self: None,
+        "发布时间（旧-新）": lambda self: self.search_index.sort_order("publish"),
+        "发布时间（新-旧）": lambda self: self.search_index.sort_order("publish_reversed"),
+        "模块名（A-Z）": lambda self: self.search_index.sort_order("module_name"),
+        "作者（A-Z）": lambda self: self.search_index.sort_order("author"),
+        "官方插件优先": lambda self: self.search_index.sort_order("official"),
+        "已安装优先": lambda self: self.installed_first_order(),
     }
 
     def setup(self) -> None:
         self.context.check_pyproject_toml()
         self.win.title = "NoneBot Desktop - 插件商店"
         self.win.base.grab_set()
-        self.all_plugins = meta.raw_plugins
-        self.all_plugins_paged = self.cur_plugins_paged = list_paginate(self.all_plugins, self.PAGESIZE)
+        self.all_plugins = registry.raw_plugins
+        self.search_index = PluginSearchIndex.of(self.all_plugins)
+        self.pagesize = IntVar(value=self.PAGESIZE)
+        self.all_plugins_paged = self.cur_plugins_paged = wing.list_paginate(self.all_plugins, self.PAGESIZE)
         self.pageinfo_cpage = IntVar(value=1)
         self.pageinfo_mpage = len(self.cur_plugins_paged)
-        self.pluginvars_i = [StringVar(value="安装") for _ in range(self.PAGESIZE)]
-        self.pluginvars_e = [StringVar(value="启用") for _ in range(self.PAGESIZE)]
+        # card widgets are pooled and reused by slot across pages
+        self.cards: List[Widget[tk.LabelFrame]] = []
+        self.cardtags: List[List[Widget[tk.Label]]] = []
+        self.pluginvars_i: List[StringVar] = []
+        self.pluginvars_e: List[StringVar] = []
+        self.pluginvars_s: List[BooleanVar] = []
+        # selected plugins by project link, kept across pages and searches
+        self.selected: Dict[str, Dict[str, Any]] = {}
 
         self.searchvar = StringVar(value="")
-        self.search_timer = Timer(0.8, lambda: None)
+        self.search_worker = SearchWorker(self.search_index, self._on_search_result)
+        self.found: List[int] = list(range(len(self.all_plugins)))
+        self.found_ordered = self.found
 
-        self.sortvar = StringVar(value="发布时间（旧-新）")
+        self.sortvar = StringVar(value=self.RELEVANCE)
 
         self.win /= (
             W(tk.Frame) * Packer(anchor="nw", expand=True, fill="x") / (
@@ -735,10 +1873,16 @@ class PluginStore(ApplicationWithContext):
                 W(tk.LabelFrame, text="排序", font=font10) * Packer(anchor="nw", side="left") / (
                     W(ttk.Combobox, textvariable=self.sortvar, value=list(self.sortmethods.keys()), font=font10) * Packer(expand=True, fill="x"),
                 ),
+                W(tk.LabelFrame, text="每页数量", font=font10) * Packer(anchor="nw", side="left") / (
+                    W(ttk.Combobox, textvariable=self.pagesize, value=self.PAGESIZES, state="readonly", width=6, font=font10) * Packer(expand=True, fill="x"),
+                ),
+            ),
+            W(tk.LabelFrame, text=self._getrealpageinfo(), font=font10) * Packer(anchor="nw", expand=True, fill="both") / (
+                W(tk.Canvas, highlightthickness=0) * Packer(side="left", fill="both", expand=True),
+                W(ttk.Scrollbar) * Packer(side="right", fill="y")
             ),
-            W(tk.LabelFrame, text=self._getrealpageinfo(), font=font10) * Packer(anchor="nw", expand=True, fill="x"),
             W(tk.LabelFrame, text="自定义下载源", font=font10) * Packer(anchor="sw", fill="x", expand=True) / (
-                W(ttk.Combobox, textvariable=self.context.tmpindex, value=PYPI_MIRRORS, font=mono10) * Packer(side="left", fill="x", expand=True),
+                W(ttk.Combobox, textvariable=self.context.tmpindex, value=self.context.mirror_urls(), font=mono10) * Packer(side="left", fill="x", expand=True),
             ),
             W(tk.Frame) * Packer(anchor="sw", expand=True, fill="x") / (
                 W(tk.Button, text="首页", font=font10, command=lambda: self.gotopage(0)) * Packer(anchor="nw", expand=True, fill="x", side="left"),
@@ -746,22 +1890,64 @@ class PluginStore(ApplicationWithContext):
                 W(ttk.Combobox, textvariable=self.pageinfo_cpage, width=8, font=("Microsoft Yahei UI", 14)) * Packer(anchor="nw", side="left"),
                 W(tk.Button, text="下一页", font=font10, command=lambda: self.chpage(1)) * Packer(anchor="nw", expand=True, fill="x", side="left"),
                 W(tk.Button, text="尾页", font=font10, command=lambda: self.gotopage(-1)) * Packer(anchor="nw", expand=True, fill="x", side="left")
-            )
+            ),
+            self.bulk_bar()
         )
 
+        canvas = cast(tk.Canvas, self.win[1][0].base)
+        sl = cast(ttk.Scrollbar, self.win[1][1].base)
+        canvas.config(yscrollcommand=sl.set)
+        sl.config(command=canvas.yview)
+        self.cardbox = self.win[1][0].add_widget(tk.Frame)
+        canvas.create_window((0, 0), window=self.cardbox.base, anchor="nw")
+        maxheight = self.win.base.winfo_screenheight() * 3 // 5
+
+        @self.cardbox.on("<Configure>")
+        def fit_canvas(_):
+            canvas.config(
+                scrollregion=canvas.bbox("all"),
+                width=self.cardbox.base.winfo_reqwidth(),
+                height=min(self.cardbox.base.winfo_reqheight(), maxheight)
+            )
+
+        def scroll(event: Event):
+            canvas.yview_scroll(-1 if event.num == 4 or event.delta > 0 else 1, "units")
+
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.win.base.bind(seq, scroll, add=True)
+
         self.pageinfo_cpage.trace_add("write", self.changepageno)
-        self.sortvar.trace_add("write", self.do_search)
-        self.searchvar.trace_add("write", self.applysearch)
+        self.sortvar.trace_add("write", self.apply_sort)
+        self.pagesize.trace_add("write", self.repaginate)
+        self.searchvar.trace_add("write", self.do_search)
+
+        @self.win.on("<Destroy>", append=True)
+        def stop_search(event: Event):
+            if event.widget is self.win.base:
+                self.search_worker.stop()
 
         self.update_page()
         self.updpageinfo()
+        self.context.subscribe_dists(self.win.base, lambda _: self.updpluginvars())
+        self.context.subscribe_config(self.win.base, self.updpluginvars)
+        self.context.subscribe_registry(self.win.base, self.swap_registry)
+
+    def swap_registry(self, name: str):
+        # show refreshed plugins in place
+        if name != "plugins":
+            return
+        self.all_plugins = registry.raw_plugins
+        self.search_index = self.search_worker.index = PluginSearchIndex.of(self.all_plugins)
+        self.found = list(range(len(self.all_plugins)))
+        self.apply_sort()
+        self.do_search()
 
     def changepageno(self, *_):
         self.win[1].text = self._getrealpageinfo()
         self.update_page()
 
     def _pluginwidget(self, n: int):
-        return self.win[1][n][1]
+        return self.cards[n][1]
 
     def updpluginvars(self):
         try:
@@ -769,15 +1955,10 @@ class PluginStore(ApplicationWithContext):
         except TclError:
             return
         curpage = self.cur_plugins_paged[cpage - 1] if self.cur_plugins_paged else []
-        conf = get_toml_config(self.context.cwd_str)
-        if not (data := conf._get_data()):
-            raise RuntimeError("Config file not found!")
-        table: Dict[str, Any] = data.setdefault("tool", {}).setdefault("nonebot", {})
-        _enabled: List[str] = table.setdefault("plugins", [])
-        enabled = [a for a in _enabled]
+        enabled = self.context.config.require().plugins
 
         for n, d in enumerate(curpage):
-            installed_ = d["project_link"] in self.context.curdistnames
+            installed_ = self.context.is_installed(d["project_link"])
             enabled_ = d["module_name"] in enabled
             self.pluginvars_i[n].set("卸载" if installed_ else "安装")
             self.pluginvars_e[n].set("禁用" if enabled_ else "启用")
@@ -796,12 +1977,6 @@ class PluginStore(ApplicationWithContext):
         self.pageinfo_mpage = len(self.cur_plugins_paged)
         self.win[3][2].base["values"] = list(range(1, self.pageinfo_mpage + 1))
 
-    def plugin_context(self, pl):
-        return (
-            "{name} {project_link} {module_name} {author} ".format(**pl) +
-            " ".join(tag["label"] for tag in pl["tags"])
-        ).lower()
-
     def chpage(self, offset: int):
         if self.pageinfo_mpage:
             self.pageinfo_cpage.set((self.pageinfo_cpage.get() - 1 + offset) % self.pageinfo_mpage + 1)
@@ -814,39 +1989,95 @@ class PluginStore(ApplicationWithContext):
         else:
             self.pageinfo_cpage.set(0)
 
-    def update_page(self):
-        try:
-            cpage = self.pageinfo_cpage.get()
-        except TclError:
-            return
-        LABEL_NCH = 40
-        LABEL_NCH_PX_FACTOR = 8
-        plugins_display = self.cur_plugins_paged[cpage - 1] if self.cur_plugins_paged else []
-        self.win[1] /= (
-            (
-                W(tk.LabelFrame, text=self._getpluginextendedname(pl), fg="green" if pl["is_official"] else "black", font=font10) * Gridder(column=n & 1, row=n // 2, sticky="w") / (
+    def _ensure_cards(self, count: int) -> None:
+        while len(self.cards) < count:
+            n = len(self.cards)
+            self.pluginvars_i.append(StringVar(value="安装"))
+            self.pluginvars_e.append(StringVar(value="启用"))
+            self.pluginvars_s.append(BooleanVar(value=False))
+            self.cardbox.load_sub((
+                W(tk.LabelFrame, font=font10) * Gridder(column=n & 1, row=n // 2, sticky="w") / (
                     W(tk.Frame) * Packer(anchor="w", expand=True, fill="x", side="left") / (
-                        W(tk.Label, text=pl["desc"], font=font10, width=LABEL_NCH, height=4, wraplength=LABEL_NCH * LABEL_NCH_PX_FACTOR, justify="left") * Packer(anchor="w", expand=True, fill="x", padx=3, pady=3, side="top"),
-                        W(tk.Frame) * Packer(anchor="w", expand=True, fill="x", padx=3, pady=3, side="top") / (
-                            (W(tk.Label, text=tag["label"], bg=tag["color"], fg=rrggbb_bg2fg(tag["color"]), font=mono10) * Packer(anchor="w", padx=2, side="left"))
-                            for tag in pl["tags"]
-                        )
+                        W(tk.Label, font=font10, width=self.LABEL_NCH, height=4, wraplength=self.LABEL_NCH * self.LABEL_NCH_PX_FACTOR, justify="left") * Packer(anchor="w", expand=True, fill="x", padx=3, pady=3, side="top"),
+                        W(tk.Frame) * Packer(anchor="w", expand=True, fill="x", padx=3, pady=3, side="top")
                     ),
                     W(tk.Frame) * Packer(anchor="w", side="left") / (
-                        W(tk.Button, text="主页", font=font10, command=partial(system_open, pl["homepage"])) * Packer(anchor="w", expand=True, fill="x", side="top"),
+                        W(tk.Button, text="主页", font=font10, command=partial(self.open_homepage, n)) * Packer(anchor="w", expand=True, fill="x", side="top"),
                         W(tk.Button, textvariable=self.pluginvars_e[n], command=partial(self.perform_enable, n), font=font10) * Packer(anchor="w", expand=True, fill="x", side="top"),
                         W(tk.Button, textvariable=self.pluginvars_i[n], command=partial(self.perform_install, n), font=font10) * Packer(anchor="w", expand=True, fill="x", side="top"),
+                        W(tk.Checkbutton, text="选择", variable=self.pluginvars_s[n], command=partial(self.toggle_select, n), font=font10) * Packer(anchor="w", side="top"),
                     )
-                )
-            ) for n, pl in enumerate(plugins_display)
-        )
+                ),
+            ))
+            self.cards.append(self.cardbox[n])
+            self.cardtags.append([])
+
+    def _bind_tags(self, n: int, tags: List[Dict[str, str]]) -> None:
+        pool = self.cardtags[n]
+        while len(pool) < len(tags):
+            pool.append(self.cards[n][0][1].add_widget(tk.Label, font=mono10))
+        for lbl, tag in zip(pool, tags):
+            lbl.base.config(text=tag["label"], bg=tag["color"], fg=wing.rrggbb_bg2fg(tag["color"]))
+            lbl.pack(anchor="w", padx=2, side="left")
+        for lbl in pool[len(tags):]:
+            lbl.base.pack_forget()
+
+    def _curpage(self) -> List[Dict[str, Any]]:
+        cpage = self.pageinfo_cpage.get()
+        return self.cur_plugins_paged[cpage - 1] if self.cur_plugins_paged else []
+
+    @instrument.traced("PluginStore.update_page")
+    def update_page(self):
+        try:
+            plugins_display = self._curpage()
+        except TclError:
+            return
+        self._ensure_cards(len(plugins_display))
+        for n, card in enumerate(self.cards):
+            if n >= len(plugins_display):
+                card.base.grid_remove()
+                continue
+            pl = plugins_display[n]
+            card.base.config(text=self._getpluginextendedname(pl), fg="green" if pl["is_official"] else "black")
+            card[0][0].text = pl["desc"]
+            self.pluginvars_s[n].set(pl["project_link"] in self.selected)
+            self._bind_tags(n, pl["tags"])
+            card.base.grid()
+        cast(tk.Canvas, self.win[1][0].base).yview_moveto(0)
         self.updpluginvars()
 
+    def toggle_select(self, n: int):
+        try:
+            pl = self._curpage()[n]
+        except (TclError, IndexError):
+            return
+        if self.pluginvars_s[n].get():
+            self.selected[pl["project_link"]] = pl
+        else:
+            self.selected.pop(pl["project_link"], None)
+
+    def selected_ops(self, action: str) -> List[PendingOp]:
+        return [
+            PendingOp(action, "plugin", pl["name"], pl["project_link"], pl["module_name"])
+            for pl in self.selected.values()
+        ]
+
+    def clear_selection(self) -> None:
+        self.selected.clear()
+        for var in self.pluginvars_s:
+            var.set(False)
+
+    def open_homepage(self, n: int):
+        try:
+            wing.system_open(self._curpage()[n]["homepage"])
+        except (TclError, IndexError):
+            pass
+
     def _getpluginextendedname(self, plugin):
         return "{name} by {author}".format(**plugin)
     
     def _lock_search_and_page(self, lock: bool):
-        self.win[0][0][0].disabled = self.win[0][0][1].disabled = lock
+        self.win[0][0][0].disabled = self.win[0][1][0].disabled = self.win[0][2][0].disabled = lock
         for w in self.win[3]:
             w.disabled = lock
 
@@ -860,31 +2091,28 @@ class PluginStore(ApplicationWithContext):
 
         target = self.cur_plugins_paged[cpage - 1][n]
 
-        self.win[1][n][1][2].disabled = True
-        p, tmp = (
-            molecules.perform_pip_install(
-                str(find_python(self.context.cwd_str)),
-                target["project_link"],
-                index=self.context.tmp_index,
-                new_win=True
-            ) if self.pluginvars_i[n].get() == "安装" else
-            molecules.perform_pip_command(
-                str(find_python(self.context.cwd_str)),
-                "uninstall", target["project_link"],
-                new_win=True
-            )
+        self._pluginwidget(n)[2].disabled = True
+        install = self.pluginvars_i[n].get() == "安装"
+        p = (
+            self.context.spawn_pip("install", target["project_link"], index=True)
+            if install else
+            self.context.spawn_pip("uninstall", "-y", target["project_link"])
         )
 
-        def _restore():
-            if p:
-                while p.poll() is None:
-                    pass
-                # os.remove(tmp)
-                self.context.upddists()
-                self.updpluginvars()
-                self._lock_search_and_page(False)
+        def _restore(_, e: Optional[BaseException]):
+            if e is not None:
+                messagebox.showerror("错误", f"{e}", master=self.win.base)
+            self.context.refresh_dists(self._restore_after_install)
 
-        Thread(target=_restore).start()
+        action = "pip install" if install else "pip uninstall"
+        self.context.run_process(
+            f"{'安装' if install else '卸载'} {target['project_link']}", p, _restore, action,
+            packages=[target["project_link"]]
+        )
+
+    def _restore_after_install(self) -> None:
+        self.updpluginvars()
+        self._lock_search_and_page(False)
 
     def perform_enable(self, n: int):
         try:
@@ -892,38 +2120,691 @@ class PluginStore(ApplicationWithContext):
         except TclError:
             return
         target = self.cur_plugins_paged[cpage - 1][n]["module_name"]
-        conf = get_toml_config(self.context.cwd_str)
+        conf = self.context.config
         if self.pluginvars_e[n].get() == "禁用":
             conf.remove_plugin(target)
         else:
             conf.add_plugin(target)
+        self.context.config_changed()
 
         self.updpluginvars()
 
     def do_search(self, *_):
+        # ranked in background, older queries are abandoned
+        self.search_worker.submit(self.searchvar.get())
+
+    def _on_search_result(self, gen: int, found: List[int]):
+        self.context.post(partial(self._apply_search, gen, found), (id(self), "search"))
+
+    def _apply_search(self, gen: int, found: List[int]):
+        if gen != self.search_worker.generation:
+            return
+        self.found = found
+        self.apply_sort()
+
+    def apply_sort(self, *_):
         sortkey = self.sortvar.get()
         if sortkey not in self.sortmethods:
             return
 
-        kwd = self.searchvar.get().lower()
-        if not kwd:
-            self.cur_plugins_paged = list_paginate(
-                self.sortmethods[sortkey](self.all_plugins), self.PAGESIZE
+        order = self.sortmethods[sortkey](self)
+        self.found_ordered = self.found if order is None else self.search_index.order_by(self.found, order)
+        self.repaginate()
+
+    def repaginate(self, *_):
+        try:
+            pagesize = self.pagesize.get()
+        except TclError:
+            return
+        if pagesize not in self.PAGESIZES:
+            # a card is kept for every slot of the largest page seen
+            return
+        self.cur_plugins_paged = wing.list_paginate([self.all_plugins[n] for n in self.found_ordered], pagesize)
+        self.updpageinfo()
+        self.gotopage(0)
+
+    def installed_first_order(self) -> List[int]:
+        # stable partition of publish order, depends on current dists
+        installed = set(self.context.curdistnames)
+        order = self.search_index.sort_order("publish")
+        flags = [self.all_plugins[n]["project_link"] in installed for n in order]
+        return [n for n, f in zip(order, flags) if f] + [n for n, f in zip(order, flags) if not f]
+
+
+class OperationQueueView(ApplicationWithContext):
+    def setup(self) -> None:
+        self.win.title = "NoneBot Desktop - 待执行操作"
+        self.win.base.grab_set()
+        self.ops: List[PendingOp] = []
+        self.opsvar = StringVar()
+
+        self.win /= (
+            W(tk.LabelFrame, text="操作队列", font=font10) * Packer(anchor="nw", fill="both", expand=True) / (
+                W(tk.Listbox, listvariable=self.opsvar, selectmode="extended", font=mono10, width=60, height=12) * Packer(side="left", fill="both", expand=True),
+                W(ttk.Scrollbar) * Packer(side="right", fill="y")
+            ),
+            W(tk.Label, textvariable=self.context.opstatus, font=font10, justify="left") * Packer(anchor="w", fill="x"),
+            W(tk.Frame) * Packer(anchor="sw", fill="x", expand=True) / (
+                W(tk.Button, text="移除所选", font=font10, command=self.remove_selected) * Packer(side="left", fill="x", expand=True),
+                W(tk.Button, text="清空", font=font10, command=self.context.opqueue.clear) * Packer(side="left", fill="x", expand=True),
+                W(tk.Button, text="执行", font=font10, command=self.context.run_queue) * Packer(side="left", fill="x", expand=True),
             )
+        )
+
+        li = cast(tk.Listbox, self.win[0][0].base)
+        sl = cast(ttk.Scrollbar, self.win[0][1].base)
+        li.config(yscrollcommand=sl.set)
+        sl.config(command=li.yview)
+        self.updview()
+        self.context._subscribe(self.win.base, self.context.opqueue.listeners, self.updview)
+
+    def updview(self) -> None:
+        queue = self.context.opqueue
+        self.ops = list(queue)
+        self.win[0].base.config(text=f"操作队列 - {Path(queue.root).name}" if queue.root else "操作队列")  # type: ignore
+        self.opsvar.set([op.describe() for op in self.ops])  # type: ignore
+        self.win[2][0].disabled = self.win[2][1].disabled = queue.running or not self.ops
+        self.win[2][2].disabled = queue.running or not self.ops
+
+    def remove_selected(self) -> None:
+        li = cast(tk.Listbox, self.win[0][0].base)
+        self.context.opqueue.remove(*(self.ops[i] for i in li.curselection()))
+
+
+class OutputView(ApplicationWithContext):
+    SCROLLBACK = 5000
+
+    def setup(self) -> None:
+        self.win.title = "NoneBot Desktop - 运行输出"
+        self.run: Optional[ProcessRun] = None
+        self.seq = 0
+        self.labels: List[str] = []
+        self.runvar = StringVar()
+        self.follow = BooleanVar(value=True)
+        self.status = StringVar()
+        self.prev_grab: Optional[tk.Misc] = None
+
+        self.win /= (
+            W(tk.Frame) * Packer(anchor="nw", fill="x") / (
+                W(ttk.Combobox, textvariable=self.runvar, state="readonly", font=font10, width=50) * Packer(side="left", fill="x", expand=True),
+                W(tk.Checkbutton, text="自动滚动", variable=self.follow, font=font10) * Packer(side="left"),
+                W(tk.Button, text="清屏", font=font10, command=self.clear) * Packer(side="left"),
+                W(tk.Button, text="停止", font=font10, command=self.stop) * Packer(side="left"),
+            ),
+            W(tk.Frame) * Packer(anchor="nw", fill="both", expand=True) / (
+                W(tk.Text, font=mono10, width=100, height=30, state="disabled") * Packer(side="left", fill="both", expand=True),
+                W(ttk.Scrollbar) * Packer(side="right", fill="y")
+            ),
+            W(tk.Label, textvariable=self.status, font=font10, justify="left") * Packer(anchor="w", fill="x"),
+        )
+
+        self.text = cast(tk.Text, self.win[1][0].base)
+        sl = cast(ttk.Scrollbar, self.win[1][1].base)
+        self.text.config(yscrollcommand=sl.set)
+        sl.config(command=self.text.yview)
+        self.text.tag_configure("err", foreground="#c00000")
+        self.text.tag_configure("meta", foreground="#808080")
+        self.win[0][0].base.bind("<<ComboboxSelected>>", self.on_select)
+        self.context.output_view = self
+        self.context._subscribe(self.win.base, self.context.run_listeners, self.on_output)
+        self.win.base.bind("<Destroy>", self.on_destroy, add=True)
+
+    def show(self, run: Optional[ProcessRun]) -> None:
+        # stay usable above windows that grab input
+        cur = self.win.base.grab_current()
+        if cur is not None and cur is not self.win.base:
+            self.prev_grab = cur
+            self.win.base.grab_set()
+        self.win.base.lift()
+        if run is not self.run:
+            self.run = run
+            self.seq = 0
+            self.clear()
+        self.render()
+
+    def on_destroy(self, event: Event) -> None:
+        if event.widget is not self.win.base:
+            return
+        self.context.output_view = None
+        if self.prev_grab is not None and self.prev_grab.winfo_exists():
+            self.prev_grab.grab_set()
+
+    def on_select(self, _) -> None:
+        idx = cast(ttk.Combobox, self.win[0][0].base).current()
+        if 0 <= idx < len(self.context.runs):
+            self.show(self.context.runs[idx])
+
+    def on_output(self, run: ProcessRun) -> None:
+        if run is self.run:
+            self.render()
         else:
-            kwds = kwd.split()
-            self.cur_plugins_paged = list_paginate(
-                self.sortmethods[sortkey](
-                    [x for x in self.all_plugins if all(k in self.plugin_context(x) for k in kwds)]
-                ), self.PAGESIZE
+            self.update_labels()
+
+    def update_labels(self) -> None:
+        self.labels = [
+            f"{r.name}（{'运行中' if r.running else f'已退出，返回值 {r.returncode}'}）"
+            for r in self.context.runs
+        ]
+        self.win[0][0].base.config(values=self.labels)
+        if self.run in self.context.runs:
+            self.runvar.set(self.labels[self.context.runs.index(self.run)])
+        self.win[0][3].disabled = self.run is None or not self.run.running
+
+    def render(self) -> None:
+        # lines arrived within a frame are inserted together
+        self.update_labels()
+        if self.run is None:
+            self.status.set("没有运行过的进程")
+            return
+        lines, self.seq, dropped = self.run.buffer.since(self.seq)
+        text = self.text
+        text.config(state="normal")
+        if dropped:
+            text.insert("end", f"[已省略 {dropped} 行]\n", "meta")
+        for stream, group in groupby(lines, key=lambda line: line[0]):
+            text.insert("end", "".join(f"{t}\n" for _, t in group), stream)
+        excess = int(text.index("end-1c").split(".")[0]) - 1 - self.SCROLLBACK
+        if excess > 0:
+            text.delete("1.0", f"{excess + 1}.0")
+        text.config(state="disabled")
+        if self.follow.get():
+            text.see("end")
+        self.status.set(f"共输出 {self.run.buffer.total} 行，显示最近 {self.SCROLLBACK} 行")
+
+    def clear(self) -> None:
+        self.text.config(state="normal")
+        self.text.delete("1.0", "end")
+        self.text.config(state="disabled")
+
+    def stop(self) -> None:
+        if self.run is not None and self.run.running:
+            self.run.stop()
+
+
+class ProjectDashboard(ApplicationWithContext):
+    TICK = 1000
+    COLUMNS = (
+        ("name", "项目", 140), ("state", "状态", 80), ("pid", "PID", 70),
+        ("cpu", "CPU", 60), ("rss", "内存", 80), ("uptime", "运行时间", 90),
+        ("code", "返回值", 60), ("crashes", "崩溃", 50), ("restarts", "自动重启", 70),
+        ("policy", "重启策略", 90), ("root", "路径", 360)
+    )
+
+    def setup(self) -> None:
+        self.win.title = "NoneBot Desktop - 项目面板"
+        self.summary = StringVar()
+
+        self.win /= (
+            W(tk.LabelFrame, text="项目", font=font10) * Packer(anchor="nw", fill="both", expand=True) / (
+                W(ttk.Treeview, columns=[c for c, _, _ in self.COLUMNS], show="headings", selectmode="extended", height=12) * Packer(side="left", fill="both", expand=True),
+                W(ttk.Scrollbar) * Packer(side="right", fill="y")
+            ),
+            W(tk.Frame) * Packer(anchor="sw", fill="x") / (
+                W(tk.Button, text="添加项目", font=font10, command=self.add_project) * Packer(side="left"),
+                W(tk.Button, text="移除", font=font10, command=self.remove_selected) * Packer(side="left"),
+                W(tk.Button, text="设为当前项目", font=font10, command=self.open_selected) * Packer(side="left"),
+                W(tk.Button, text="重启策略", font=font10, command=lambda: self.each_selected(lambda b: RestartPolicyEditor(self.context.main.win.sub_window(), self.context, b))) * Packer(side="left"),
+                W(tk.Button, text="日志", font=font10, command=lambda: self.each_selected(lambda b: LogViewer(self.context.main.win.sub_window(), self.context, b))) * Packer(side="right"),
+                W(tk.Button, text="输出", font=font10, command=lambda: self.each_selected(lambda b: b.run is not None and self.context.show_output(b.run))) * Packer(side="right"),
+                W(tk.Button, text="重启", font=font10, command=lambda: self.each_selected(self.context.restart_bot)) * Packer(side="right"),
+                W(tk.Button, text="停止", font=font10, command=lambda: self.each_selected(self.context.stop_bot)) * Packer(side="right"),
+                W(tk.Button, text="启动", font=font10, command=lambda: self.each_selected(self.context.start_bot)) * Packer(side="right"),
+            ),
+            W(tk.Frame) * Packer(anchor="sw", fill="x") / (
+                W(tk.Label, textvariable=self.summary, font=font10) * Packer(side="left"),
+                W(tk.Button, text="全部停止", font=font10, command=lambda: [self.context.stop_bot(b) for b in self.context.bots]) * Packer(side="right"),
+                W(tk.Button, text="全部启动", font=font10, command=lambda: [self.context.start_bot(b) for b in self.context.bots]) * Packer(side="right"),
             )
-        self.updpageinfo()
-        self.gotopage(0)
+        )
 
-    def applysearch(self, *_):
-        self.search_timer.cancel()
-        self.search_timer = Timer(0.5, self.do_search)
-        self.search_timer.start()
+        self.tree = cast(ttk.Treeview, self.win[0][0].base)
+        sl = cast(ttk.Scrollbar, self.win[0][1].base)
+        self.tree.config(yscrollcommand=sl.set)
+        sl.config(command=self.tree.yview)
+        self.sortkey: Optional[str] = None
+        self.sortrev = False
+        for col, title, width in self.COLUMNS:
+            self.tree.heading(col, text=title, command=partial(self.sort_by, col))
+            self.tree.column(col, width=width, stretch=col == "root")
+        self.tree.bind("<Double-1>", lambda _: self.open_selected())
+        self.refresh()
+        self.context._subscribe(self.win.base, self.context.bots.listeners, self.refresh)
+        self.win.base.after(self.TICK, self.tick)
+
+    def tick(self) -> None:
+        # uptime changes without events
+        try:
+            self.refresh()
+            self.win.base.after(self.TICK, self.tick)
+        except TclError:
+            pass
+
+    @staticmethod
+    def _uptime(bot: BotInstance) -> str:
+        if bot.uptime is None:
+            return ""
+        secs = int(bot.uptime)
+        return f"{secs // 3600}:{secs // 60 % 60:02}:{secs % 60:02}"
+
+    def sort_by(self, col: str) -> None:
+        self.sortrev = self.sortkey == col and not self.sortrev
+        self.sortkey = col
+        self.refresh()
+
+    def _sort_value(self, bot: BotInstance) -> Any:
+        # numbers before texts, so empty cells go last
+        col = cast(str, self.sortkey)
+        last = bot.metrics.last if bot.running else None
+        value: Any = {
+            "state": bot.state, "pid": bot.pid, "cpu": last and last.cpu, "rss": last and last.rss,
+            "uptime": bot.uptime, "code": bot.returncode,
+            "crashes": self.context.crashstats.of(bot.root)["crashes"],
+            "restarts": self.context.crashstats.of(bot.root)["restarts"],
+            "policy": bot.policy.mode
+        }.get(col, getattr(bot, col, ""))
+        return (value is None, isinstance(value, str), value if value is not None else 0)
+
+    def refresh(self) -> None:
+        tree = self.tree
+        known = set(tree.get_children())
+        for bot in self.context.bots:
+            last = bot.metrics.last if bot.running else None
+            stats = self.context.crashstats.of(bot.root)
+            state = bots.STATE_NAMES[bot.state]
+            if bot.state == bots.BACKOFF:
+                state = f"{state} ({bot.retries})"
+            values = (
+                bot.name, state, bot.pid or "",
+                "" if last is None else MainApp.format_metric("cpu", last.cpu),
+                "" if last is None else MainApp.format_metric("rss", last.rss),
+                self._uptime(bot), "" if bot.returncode is None else bot.returncode,
+                stats["crashes"], stats["restarts"], RESTART_MODE_NAMES[bot.policy.mode], bot.root
+            )
+            if bot.root in known:
+                tree.item(bot.root, values=values)
+                known.discard(bot.root)
+            else:
+                tree.insert("", "end", iid=bot.root, values=values)
+        if known:
+            tree.delete(*known)
+        if self.sortkey is not None:
+            order = sorted(self.context.bots, key=self._sort_value, reverse=self.sortrev)
+            for n, bot in enumerate(order):
+                tree.move(bot.root, "", n)
+        self.summary.set(f"共 {len(self.context.bots)} 个项目，{len(self.context.bots.running)} 个正在运行")
+
+    def selected(self) -> List[BotInstance]:
+        return [b for b in (self.context.bots.get(iid) for iid in self.tree.selection()) if b is not None]
+
+    def each_selected(self, action: Callable[[BotInstance], Any]) -> None:
+        sel = self.selected()
+        if not sel:
+            messagebox.showinfo("提示", "请先在列表中选择项目。", master=self.win.base)
+            return
+        for bot in sel:
+            action(bot)
+
+    def add_project(self) -> None:
+        fp = filedialog.askdirectory(mustexist=True, parent=self.win.base, title="选择项目目录")
+        if not fp:
+            return
+        if not is_project_dir(fp):
+            messagebox.showerror("错误", "所选目录不是正确的项目目录。", master=self.win.base)
+            return
+        self.context.bots.add(fp)
+
+    def remove_selected(self) -> None:
+        for bot in self.selected():
+            if bot.active:
+                messagebox.showwarning("警告", f"{bot.name} 正在运行，请先停止。", master=self.win.base)
+                continue
+            self.context.bots.remove(bot.root)
+
+    def open_selected(self) -> None:
+        sel = self.selected()
+        if sel:
+            self.context.cwd_str = sel[0].root
+
+
+class RestartPolicyEditor(ApplicationWithContext):
+    FIELDS = (
+        ("max_retries", "最多连续重启次数（0 为不限）"),
+        ("backoff", "首次重启等待秒数（之后每次翻倍）"),
+        ("backoff_max", "最长等待秒数"),
+        ("reset_after", "运行多少秒后清零重启计数"),
+        ("health_interval", "健康检查间隔秒数"),
+        ("health_grace", "启动后多少秒开始检查"),
+        ("health_failures", "连续失败多少次后停止并按重启策略重启"),
+    )
+
+    def __init__(self, base, context: Context, bot: BotInstance) -> None:
+        self.bot = bot
+        super().__init__(base, context)
+
+    def setup(self) -> None:
+        self.win.title = f"NoneBot Desktop - 重启策略 - {self.bot.name}"
+        policy = self.bot.policy
+        self.modevar = StringVar(value=RESTART_MODE_NAMES[policy.mode])
+        self.health = BooleanVar(value=policy.health_check)
+        self.fieldvars = {k: StringVar(value=str(getattr(policy, k))) for k, _ in self.FIELDS}
+        self.statsvar = StringVar()
+
+        self.win /= (
+            W(tk.LabelFrame, text="自动重启", font=font10) * Packer(anchor="nw", fill="x") / (
+                W(tk.Label, text="重启方式", font=font10) * Gridder(sticky="w"),
+                W(ttk.Combobox, textvariable=self.modevar, value=[RESTART_MODE_NAMES[m] for m in RESTART_MODES], state="readonly", font=font10, width=16) * Gridder(row=0, column=1, sticky="w"),
+                W(tk.Checkbutton, text="检查 HTTP 端口（读取 HOST 与 PORT 配置）", variable=self.health, font=font10) * Gridder(row=1, columnspan=2, sticky="w"),
+                *(
+                    W(tk.Label, text=title, font=font10) * Gridder(row=n + 2, sticky="w")
+                    for n, (_, title) in enumerate(self.FIELDS)
+                ),
+                *(
+                    W(tk.Entry, textvariable=self.fieldvars[k], font=mono10, width=10) * Gridder(row=n + 2, column=1, sticky="w")
+                    for n, (k, _) in enumerate(self.FIELDS)
+                ),
+            ),
+            W(tk.LabelFrame, text="崩溃统计", font=font10) * Packer(anchor="nw", fill="x") / (
+                W(tk.Label, textvariable=self.statsvar, font=font10, justify="left") * Packer(anchor="w"),
+            ),
+            W(tk.Frame) * Packer(anchor="sw", fill="x") / (
+                W(tk.Button, text="保存", font=font10, command=self.save) * Packer(side="right"),
+                W(tk.Button, text="重置统计", font=font10, command=self.reset_stats) * Packer(side="left"),
+            )
+        )
+        self.update_stats()
+
+    def update_stats(self) -> None:
+        stats = self.context.crashstats
+        st = stats.of(self.bot.root)
+        last = st.get("last_crash")
+        lines = [
+            f"启动 {st['starts']} 次，崩溃 {st['crashes']} 次，自动重启 {st['restarts']} 次，健康检查失败 {st['unhealthy']} 次",
+            f"最近一小时崩溃 {stats.crashes_within(self.bot.root, 3600)} 次",
+        ]
+        if last is not None:
+            lines.append(f"上次崩溃：{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(last))}，返回值 {st.get('last_code')}")
+        self.statsvar.set("\n".join(lines))
+
+    def reset_stats(self) -> None:
+        self.context.crashstats.stats.pop(self.bot.root, None)
+        self.context.crashstats.save()
+        self.update_stats()
+        self.context.bots.notify()
+
+    def save(self) -> None:
+        mode = next(m for m in RESTART_MODES if RESTART_MODE_NAMES[m] == self.modevar.get())
+        try:
+            policy = RestartPolicy(mode=mode, health_check=self.health.get(), **{
+                k: type(getattr(RestartPolicy(), k))(self.fieldvars[k].get()) for k, _ in self.FIELDS
+            })
+        except ValueError:
+            messagebox.showerror("错误", "请输入正确的数值。", master=self.win.base)
+            return
+        if min(getattr(policy, k) for k, _ in self.FIELDS) < 0 or policy.health_interval <= 0 or policy.health_failures < 1:
+            messagebox.showerror("错误", "请输入正确的数值。", master=self.win.base)
+            return
+        self.context.bots.set_policy(self.bot, policy)
+        self.context.watch_health(self.bot)
+        self.win.destroy()
+
+
+class WheelStoreView(ApplicationWithContext):
+    def setup(self) -> None:
+        self.win.title = "NoneBot Desktop - 共享 wheel 缓存"
+        self.win.base.grab_set()
+        self.store = WheelStore.default()
+        settings = self.store.settings
+        self.enabled = BooleanVar(value=settings.enabled)
+        self.capvar = StringVar(value=str(settings.max_bytes >> 20))
+        self.statsvar = StringVar()
+
+        self.win /= (
+            W(tk.LabelFrame, text="设置", font=font10) * Packer(anchor="nw", fill="x") / (
+                W(tk.Checkbutton, text="安装程序包时使用共享缓存", variable=self.enabled, font=font10) * Gridder(columnspan=2, sticky="w"),
+                W(tk.Label, text="容量上限（MiB）", font=font10) * Gridder(row=1, sticky="w"),
+                W(tk.Entry, textvariable=self.capvar, font=mono10, width=10) * Gridder(row=1, column=1, sticky="w"),
+            ),
+            W(tk.LabelFrame, text="统计", font=font10) * Packer(anchor="nw", fill="both", expand=True) / (
+                W(tk.Label, textvariable=self.statsvar, font=font10, justify="left") * Packer(anchor="w"),
+            ),
+            W(tk.Frame) * Packer(anchor="sw", fill="x") / (
+                W(tk.Button, text="保存", font=font10, command=self.save) * Packer(side="right"),
+                W(tk.Button, text="刷新", font=font10, command=self.update_stats) * Packer(side="left"),
+                W(tk.Button, text="打开文件夹", font=font10, command=lambda: wing.system_open(self.store.links)) * Packer(side="left"),
+                W(tk.Button, text="清空缓存", font=font10, command=self.clear) * Packer(side="left"),
+            )
+        )
+        self.update_stats()
+
+    @staticmethod
+    def _mib(n: int) -> str:
+        return f"{n / (1 << 20):.1f} MiB"
+
+    def update_stats(self) -> None:
+        st = self.store.stats()
+        used = st.hits + st.misses
+        self.statsvar.set("\n".join((
+            f"wheel 文件 {st.files} 个，共 {self._mib(st.size)}（去重后 {st.blobs} 份内容）",
+            f"命中 {st.hits} 次，未命中 {st.misses} 次" + (f"，命中率 {st.hits / used:.0%}" if used else ""),
+            f"节省下载 {self._mib(st.saved)}",
+            f"已淘汰 {st.evicted} 个文件",
+            f"位置：{self.store.root}",
+        )))
+
+    def _in_background(self, func: Callable[[], Any]) -> None:
+        # the store may be locked by a running install
+        def _work():
+            try:
+                func()
+            except OSError as e:
+                print(f"[WheelStoreView] {e!r}")
+            self.context.post(self._done)
+
+        Thread(target=_work, daemon=True).start()
+
+    def _done(self) -> None:
+        try:
+            self.update_stats()
+        except TclError:
+            pass
+
+    def clear(self) -> None:
+        if messagebox.askyesno("提示", "确定要删除共享缓存中的所有 wheel 文件吗？", master=self.win.base):
+            self._in_background(self.store.clear)
+
+    def save(self) -> None:
+        try:
+            cap = int(self.capvar.get())
+        except ValueError:
+            cap = 0
+        if cap <= 0:
+            messagebox.showerror("错误", "请输入正确的数值。", master=self.win.base)
+            return
+        self.store.settings = StoreSettings(self.enabled.get(), cap << 20)
+        self._in_background(self.store.evict)
+
+
+class LogViewer(ApplicationWithContext):
+    ALL_MODULES = "[全部]"
+    SEARCH_DELAY = 300
+    LEVEL_COLORS = {
+        "TRACE": "#a0a0a0", "DEBUG": "#808080", "SUCCESS": "#008000",
+        "WARNING": "#c07000", "ERROR": "#c00000", "CRITICAL": "#ffffff"
+    }
+
+    def __init__(self, base, context: Context, bot: Optional[BotInstance] = None) -> None:
+        self.bot = bot or context.current_bot
+        super().__init__(base, context)
+
+    def setup(self) -> None:
+        if self.bot is None or self.bot.logstore is None:
+            messagebox.showinfo("提示", "项目尚未在本程序中启动过，没有可以查看的日志。", master=self.context.main.win.base)
+            self.win.destroy()
+            return
+        self.store = self.bot.logstore
+        self.win.title = f"NoneBot Desktop - 日志 - {self.bot.name}"
+        self.found: List[int] = []  # absolute ids of shown lines
+        self.scanned = 0
+        self.top = 0
+        self.rows = 30
+        self.flt = LogFilter()
+        self.highlight: Optional[re.Pattern] = None
+        self.filtering = False
+        self._search_after: Optional[str] = None
+        self.levelvar = StringVar(value=LEVELS[0])
+        self.modulevar = StringVar(value=self.ALL_MODULES)
+        self.patternvar = StringVar()
+        self.follow = BooleanVar(value=True)
+        self.status = StringVar()
+        self.worker = FilterWorker(self.store, self._on_filtered)
+
+        self.win /= (
+            W(tk.Frame) * Packer(anchor="nw", fill="x") / (
+                W(tk.Label, text="最低等级：", font=font10) * Packer(side="left"),
+                W(ttk.Combobox, textvariable=self.levelvar, value=LEVELS, state="readonly", font=font10, width=10) * Packer(side="left"),
+                W(tk.Label, text="模块：", font=font10) * Packer(side="left"),
+                W(ttk.Combobox, textvariable=self.modulevar, font=font10, width=30) * Packer(side="left"),
+                W(tk.Label, text="正则搜索：", font=font10) * Packer(side="left"),
+                W(tk.Entry, textvariable=self.patternvar, font=mono10) * Packer(side="left", fill="x", expand=True),
+                W(tk.Checkbutton, text="跟随最新", variable=self.follow, font=font10, command=self.render) * Packer(side="left"),
+            ),
+            W(tk.Frame) * Packer(anchor="nw", fill="both", expand=True) / (
+                W(tk.Text, font=mono10, width=120, height=self.rows, wrap="none", state="disabled") * Packer(side="left", fill="both", expand=True),
+                W(ttk.Scrollbar) * Packer(side="right", fill="y")
+            ),
+            W(ttk.Scrollbar, orient="horizontal") * Packer(fill="x"),
+            W(tk.Label, textvariable=self.status, font=font10, justify="left") * Packer(anchor="w", fill="x"),
+        )
+
+        # only visible rows are put into the text widget, scrolling moves
+        # the window over `found`
+        self.text = cast(tk.Text, self.win[1][0].base)
+        self.sb = cast(ttk.Scrollbar, self.win[1][1].base)
+        self.sb.config(command=self.yview)
+        hsb = cast(ttk.Scrollbar, self.win[2].base)
+        self.text.config(xscrollcommand=hsb.set)
+        hsb.config(command=self.text.xview)
+        for level, color in self.LEVEL_COLORS.items():
+            self.text.tag_configure(level, foreground=color)
+        self.text.tag_configure("CRITICAL", background="#c00000")
+        self.text.tag_configure("match", background="#ffe080")
+        self.linespace = tkfont.Font(font=self.text.cget("font")).metrics("linespace")
+        cast(ttk.Combobox, self.win[0][3].base).config(postcommand=self.update_modules)
+
+        def scroll(event: Event):
+            self.yview("scroll", -3 if event.num == 4 or event.delta > 0 else 3, "units")
+            return "break"
+
+        for seq in ("<MouseWheel>", "<Button-4>", "<Button-5>"):
+            self.text.bind(seq, scroll)
+
+        @self.win[1][0].on("<Configure>")
+        def fit_rows(event: Event):
+            rows = max(1, event.height // self.linespace)
+            if rows != self.rows:
+                self.rows = rows
+                self.render()
+
+        @self.win.on("<Destroy>", append=True)
+        def stop_filter(event: Event):
+            if event.widget is self.win.base:
+                self.worker.stop()
+
+        self.levelvar.trace_add("write", self.refilter)
+        self.modulevar.trace_add("write", self.search_later)
+        self.patternvar.trace_add("write", self.search_later)
+        self.context._subscribe(self.win.base, self.context.run_listeners, lambda _: self.tail())
+        self.refilter()
+
+    def update_modules(self) -> None:
+        cast(ttk.Combobox, self.win[0][3].base).config(value=[self.ALL_MODULES, *self.store.module_list()])
+
+    def search_later(self, *_) -> None:
+        # wait for typing to pause before scanning the whole log
+        if self._search_after is not None:
+            self.win.base.after_cancel(self._search_after)
+        self._search_after = self.win.base.after(self.SEARCH_DELAY, self.refilter)
+
+    def refilter(self, *_) -> None:
+        self._search_after = None
+        module = self.modulevar.get().strip()
+        flt = LogFilter(
+            LEVEL_NO.get(self.levelvar.get(), 0),
+            "" if module == self.ALL_MODULES else module,
+            self.patternvar.get()
+        )
+        try:
+            flt.compile()
+            self.highlight = re.compile(flt.pattern, re.IGNORECASE) if flt.pattern else None
+        except re.error as e:
+            self.status.set(f"正则表达式错误：{e}")
+            return
+        self.flt = flt
+        self.filtering = True
+        self.status.set("正在筛选……")
+        self.worker.submit(flt)
+
+    def _on_filtered(self, gen: int, found: List[int], end: int) -> None:
+        self.context.post(partial(self._apply_filter, gen, found, end), (id(self), "filter"))
+
+    def _apply_filter(self, gen: int, found: List[int], end: int) -> None:
+        if gen != self.worker.generation:
+            return
+        self.found, self.scanned, self.filtering = found, end, False
+        self._extend()
+        self.render()
+
+    def tail(self) -> None:
+        if self.bot.logstore is not self.store and self.bot.logstore is not None:
+            # the bot is restarted
+            self.worker.stop()
+            self.store = self.bot.logstore
+            self.worker = FilterWorker(self.store, self._on_filtered)
+            self.found, self.scanned, self.top = [], 0, 0
+            self.refilter()
+        if self.filtering or len(self.store) == self.scanned:
+            return
+        self._extend()
+        self.render()
+
+    def _extend(self) -> None:
+        # new lines are matched incrementally
+        self.found.extend(self.store.match_tail(self.flt, self.scanned))
+        self.scanned = len(self.store)
+        if self.found and self.found[0] < self.store.base:
+            dropped = bisect_left(self.found, self.store.base)
+            del self.found[:dropped]
+            self.top = max(0, self.top - dropped)
+
+    def yview(self, *args) -> None:
+        if args[0] == "moveto":
+            self.top = int(float(args[1]) * len(self.found))
+        elif args[0] == "scroll":
+            self.top += int(args[1]) * (self.rows if args[2] == "pages" else 1)
+        self.follow.set(self.top + self.rows >= len(self.found))
+        self.render()
+
+    def render(self) -> None:
+        total = len(self.found)
+        if self.follow.get():
+            self.top = total - self.rows
+        self.top = max(0, min(self.top, total - self.rows))
+        lines = self.store.lines(self.found[self.top:self.top + self.rows])
+        text = self.text
+        text.config(state="normal")
+        text.delete("1.0", "end")
+        for n, (level, line) in enumerate(lines, 1):
+            text.insert("end", f"{line}\n", LEVELS[level])
+            if self.highlight is not None:
+                for m in self.highlight.finditer(line):
+                    text.tag_add("match", f"{n}.{m.start()}", f"{n}.{m.end()}")
+        text.config(state="disabled")
+        if total:
+            self.sb.set(self.top / total, (self.top + len(lines)) / total)
+        else:
+            self.sb.set(0, 1)
+        if not self.filtering:
+            self.status.set(f"匹配 {total} 行，共 {len(self.store) - self.store.base} 行")
 
 
 class AppHelp(Application):
@@ -942,12 +2823,20 @@ class AppHelp(Application):
     PYPI_INDEX_NOTICE = (
         "[自定义下载源]可以选择从不同的镜像站下载需要的程序包，一般可以加快下载速度。\n"
         "注意：[https://pypi.org/simple] 是官方的下载源，更新及时但下载速度慢。\n"
-        "注意：无法保证使用时镜像源是否已同步最新的程序包，如果下载失败请更换不同的下载源。"
+        "注意：无法保证使用时镜像源是否已同步最新的程序包，如果下载失败请更换不同的下载源。\n"
+        "提示：程序启动后会在后台测试各个镜像站的速度，并自动选用最快的可用下载源，列表中的下载源也按速度排列。"
+        "如果自动选用的下载源在安装时无法连接，会换用下一个下载源重试。手动填写的下载源不会被替换。\n"
+        "提示：点击 [高级]菜单 -> [下载源测速] 可以重新测速并查看结果。"
     )
     BLOCK_NOTICE = (
         "提示：通常情况下未安装的模块对应板块无法控制“[启用]”状态，已启用的模块对应板块无法控制“[安装]/[卸载]”状态。\n"
         "提示：现在可以正常禁用已启用但未安装的模块了。"
     )
+    BULK_NOTICE = (
+        "提示：勾选板块中的[选择]后，可以通过[批量操作]栏将所选项加入[待执行操作]队列。"
+        "执行队列时，所有安装合并为一次 pip 安装，所有卸载合并为一次 pip 卸载，所有启用/禁用合并为一次配置写入，"
+        "进度显示在[批量操作]栏和[待执行操作]窗口中。"
+    )
     HOMEPAGE_T = (
         "欢迎使用 NoneBot Desktop 应用程序。\n\n"
         "本程序旨在减少使用 NoneBot2 时命令行的使用。\n\n"
@@ -971,6 +2860,10 @@ class AppHelp(Application):
         "[预留配置用于开发插件]选项，然后将这些插件正确放入 `src/plugins` 下。\n\n"
         "[创建虚拟环境]可以有效避免因系统 Python 环境混乱造成的一系列问题，建议开启。\n\n"
         f"{PYPI_INDEX_NOTICE}\n\n"
+        "创建时项目文件与虚拟环境会同时生成，[创建进度]一栏显示各阶段的状态和用时。"
+        "依赖会先尝试从本机的缓存安装，缺少的部分才会从下载源下载并存入缓存，所以再次创建项目时会快很多。\n"
+        "这个缓存由所有项目共享，相同的文件只保存一份，超出容量上限时会删除最久未使用的文件。"
+        "在 [高级]菜单 -> [共享 wheel 缓存] 中可以查看命中次数和节省的下载量，调整容量上限，或让其他安装与更新操作也使用这个缓存。\n\n"
         "创建完成后会自动进入新创建的项目目录。"
     )
     OPENRUN_T = (
@@ -979,9 +2872,18 @@ class AppHelp(Application):
         "如果项目目录正确，主界面的[启动]按钮等功能将全部可用。\n"
         "提示：本程序只支持识别有 `pyproject.toml` 或 `bot.py` 的目录作为项目目录。\n\n"
         "正确打开项目目录后，点击 主界面上的[启动] 或 [项目]菜单 -> [启动项目] 来运行项目。\n"
-        "提示：项目会在一个新的命令行窗口中运行，Windows 上仅支持使用 <cmd.exe>，Linux 上会自动从 "
-        "<gnome-terminal>, <konsole>, <xfce4-terminal>, <xterm>, <st> 中查找可用的终端模拟器。\n"
-        "提示：运行结束后窗口不会直接关闭，因此不必担心无法查看程序输出。"
+        "提示：项目的输出会显示在[运行输出]窗口中，也可以通过 [项目]菜单 -> [运行输出] 打开，"
+        "其中的[停止]按钮可以结束项目。安装、卸载程序包时 pip 的输出同样显示在这里。\n"
+        "提示：每个进程只保留最近的输出，关闭本程序时正在运行的项目也会被结束。\n\n"
+        "[项目]菜单 -> [项目面板] 列出了所有启动过或手动添加的项目及其运行状态，可以同时启动、停止、重启多个项目，"
+        "主界面的[启动]按钮在当前项目运行时会变为[停止]。\n"
+        "提示：在[项目面板]中选择项目后点击[重启策略]，可以设置项目退出或崩溃后是否自动重启，"
+        "连续重启的等待时间会逐次翻倍；还可以定期检查项目配置的 HOST 和 PORT 是否有响应，连续失败时自动重启。"
+        "面板中会显示每个项目的崩溃和自动重启次数，点击表头可以排序。\n"
+        "提示：在 Linux 上，主界面下方会显示当前项目（包括其子进程）的 CPU、内存、线程数和打开的文件数的变化曲线，"
+        "CPU 占用持续过高或内存持续增长时会在曲线下方给出提醒。\n\n"
+        "[项目]菜单 -> [查看日志] 可以查看当前项目最近一次启动的全部日志，并按最低等级、模块（插件）筛选，"
+        "或使用正则表达式搜索。较早的日志会暂存到临时文件中，本程序退出时自动删除。"
     )
     EDITENV_T = (
         "本页介绍了如何使用本程序编辑项目的配置文件。\n\n"
@@ -989,13 +2891,12 @@ class AppHelp(Application):
         "注意：部分插件并不使用这些配置文件，实际使用时请先查看相关插件文档。\n\n"
         "在主界面点击 [配置]菜单 -> [配置文件编辑器] 进入配置文件编辑页面。\n\n"
         "在[可用配置文件]一栏的[下拉框]中选择需要编辑的配置文件，选择后将自动打开该文件。\n\n"
-        "[配置项]一栏列出了当前选中的配置文件中所有的配置项（注释在读取和保存时会被忽略）。\n"
-        "每个配置项等号左侧是该配置项的名称（不区分大小写），等号右侧是该配置项的字面值。\n"
+        "[配置项]一栏列出了当前选中的配置文件中所有的配置项，在[筛选]框中输入文字可以只显示名称或值包含该文字的配置项。\n"
+        "每个配置项左侧是该配置项的名称（不区分大小写），右侧是该配置项的值，双击或按回车即可直接修改，修改过的配置项会以蓝色显示。\n"
         "如果要添加一个新的配置项，点击下方的[新建配置项]按钮，然后自行填写新配置项的名称和值即可。\n"
-        "本程序在保存时会自动移除空的配置项，因此如果要删除某个配置项，只需要将其名称或字面值清空即可。\n"
-        "编辑完成后，点击[保存]按钮将新的配置写入文件。\n"
-        "注意：只有在点击[保存]按钮时更改才会被写入到文件，直接关闭窗口或切换至其他配置文件均会丢失当前更改，"
-        "本程序*不会*试图通过任何提示阻止这种行为。"
+        "选中配置项后点击[删除所选]或按 Delete 键可以删除配置项，将名称或值清空也会在保存时删除该配置项。\n"
+        "编辑完成后，点击[保存]按钮将更改写入文件。保存时只会改写被修改的配置项所在的行，文件中的注释和顺序都会保留。\n"
+        "注意：只有在点击[保存]按钮时更改才会被写入到文件，切换至其他配置文件或关闭窗口时，如果有未保存的更改会先询问是否放弃。"
     )
     DRVMGR_T = (
         "本页介绍了如何使用本程序管理项目使用的驱动器。\n\n"
@@ -1004,6 +2905,7 @@ class AppHelp(Application):
         "该页面上列出了可用的驱动器，驱动器名称位于每个板块的左上角，板块中间的内容是驱动器介绍。\n"
         "板块下方有控制启用的按钮（左）和控制安装的按钮（右）。\n"
         f"{BLOCK_NOTICE}\n\n"
+        f"{BULK_NOTICE}\n\n"
         f"{DRIVERS_NOTICE}\n\n"
         f"{PYPI_INDEX_NOTICE}"
     )
@@ -1013,6 +2915,7 @@ class AppHelp(Application):
         "该页面上列出了可用的适配器，适配器名称位于每个板块的左上角，板块中间的内容是适配器介绍。\n"
         "板块下方有控制启用的按钮（左）和控制安装的按钮（右）。\n"
         f"{BLOCK_NOTICE}\n\n"
+        f"{BULK_NOTICE}\n\n"
         f"{ADAPTERS_NOTICE}\n\n"
         f"{PYPI_INDEX_NOTICE}"
         ""
@@ -1021,7 +2924,12 @@ class AppHelp(Application):
         "本页介绍了如何使用本程序管理项目使用的包环境（通常是本项目的虚拟环境）\n\n"
         "在主界面点击 [配置]菜单 -> [管理环境] 进入环境管理页面。\n\n"
         "页面左侧列表显示了当前环境安装的所有包，*双击*某个包即可查看这个包的信息或管理这个包。\n"
-        "界面下方有[更新]和[卸载]按钮，点击即可进行相应操作。\n\n"
+        "界面下方有[更新]和[卸载]按钮，点击即可进行相应操作。\n"
+        "包的信息中会列出它依赖的包和依赖它的包，列表中蓝色的包没有被其他包依赖，通常是手动安装的或是已经不再需要的。\n"
+        "卸载时如果有其他包依赖这个包，会先给出提醒；如果它的某些依赖不再被其他包需要，可以选择一并卸载。\n\n"
+        "点击[检查更新]会同时向下载源查询所有包的最新版本，并列出可以更新的包。"
+        "查询结果会缓存一小时，点击[重新检查]可忽略缓存。"
+        "选中若干个包（或点击[全选]）后点击[升级所选]，即可在一次 pip 运行中全部升级。\n\n"
         f"{PYPI_INDEX_NOTICE}"
     )
     BUILTINPLG_T = (
@@ -1035,13 +2943,16 @@ class AppHelp(Application):
         "页面上方有[搜索]栏和[排序]选项控制显示的内容。"
         "可以在[搜索框]输入关键词（以空格分割）筛选想要的插件，"
         "也可以指定插件的显示顺序。\n"
-        "提示：搜索内容不区分大小写。\n\n"
+        "提示：搜索内容不区分大小写，并且可以容忍少量拼写错误。\n"
+        "提示：按[相关度]排序时，模块名或名称以关键词开头、标签与关键词一致的插件和官方插件会优先显示。\n\n"
         "页面中间展示了符合搜索条件的插件，一个插件使用一个板块。\n"
         "板块左上角显示了插件的名称和作者，如果标为绿色则此插件为官方插件。\n"
         "板块内部有插件的简介和标签（如果有）。\n"
         "板块右侧有[主页]、[启用/禁用]和[安装/卸载]三个按钮。主页按钮用于前往项目主页，其余略（\n"
         f"{BLOCK_NOTICE}\n\n"
-        "页面下方提供了几个翻页跳页的功能。\n\n"
+        f"{BULK_NOTICE}\n\n"
+        "页面下方提供了几个翻页跳页的功能。\n"
+        "提示：可以在[每页数量]中调整每页显示的插件数量，超出窗口的部分可以滚动查看。\n\n"
         f"{PYPI_INDEX_NOTICE}"
     )
 
@@ -1083,18 +2994,10 @@ class AppAbout(Application):
         self.win.title = "NoneBot Desktop - 关于"
         self.win /= (
             W(tk.Label, text=self.text, font=font10, justify="left", wraplength=480) * Packer(padx=10, pady=10),
-            W(tk.Button, text="前往项目主页", font=font10, command=lambda: system_open(self.url)) * Packer(fill="x", expand=True)
+            W(tk.Button, text="前往项目主页", font=font10, command=lambda: wing.system_open(self.url)) * Packer(fill="x", expand=True)
         )
 
 
-t3 = time.perf_counter()
-print(f"[GUI] Init Sub Functions: {t3 - t2:.3f}s")
-
-
-t4 = time.perf_counter()
-print(f"[GUI] Main UI Ready: {t4 - t3:.3f}s")
-print(f"[GUI] Total: {t4 - t1:.3f}s")
-
 
 def start_window():
     MainApp(tk.Tk()).run()
\ No newline at end of file
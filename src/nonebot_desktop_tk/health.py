@@ -0,0 +1,94 @@
+import http.client
+from threading import Condition, Thread
+import time
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+
+# resolves `(host, port)` of a bot, called in the checker thread
+Resolver = Callable[[], Tuple[str, int]]
+
+
+def probe(host: str, port: int, timeout: float = 3.0) -> Optional[str]:
+    """
+    Check whether an HTTP server answers. Any response, even an error
+    status, means the server is alive.
+
+    - host: `str`           - host of the server, wildcard addresses are
+                              probed through loopback.
+    - port: `int`           - port of the server.
+    - timeout: `float`      - seconds to wait.
+
+    - return: `Optional[str]`   - `None` if alive, or the error.
+    """
+    if host in ("", "0.0.0.0"):
+        host = "127.0.0.1"
+    elif host == "::":
+        host = "::1"
+    conn = http.client.HTTPConnection(host, port, timeout=timeout)
+    try:
+        conn.request("GET", "/", headers={"User-Agent": "nonebot-desktop-health"})
+        conn.getresponse().read(0)
+    except (OSError, http.client.HTTPException) as e:
+        return f"{type(e).__name__}: {e}"
+    finally:
+        conn.close()
+    return None
+
+
+class HealthChecker:
+    """
+    Probe the HTTP ports of watched bots on a background thread.
+
+    Each target is probed every `interval` seconds after a grace period
+    from being watched. Results are reported for every probe, so the
+    caller decides how many failures in a row are fatal.
+    """
+    def __init__(self, on_result: Callable[[Hashable, Optional[str]], Any], timeout: float = 3.0) -> None:
+        """
+        - on_result: `(Hashable, Optional[str]) -> Any`
+                                - called in the checker thread with the key
+                                  and the error, `None` if alive.
+        - timeout: `float`      - seconds to wait for each probe.
+        """
+        self.on_result = on_result
+        self.timeout = timeout
+        # key -> (resolver, interval, next probe time)
+        self._targets: Dict[Hashable, Tuple[Resolver, float, float]] = {}
+        self._cond = Condition()
+        self._thread: Optional[Thread] = None
+
+    def watch(self, key: Hashable, resolver: Resolver, interval: float, grace: float) -> None:
+        with self._cond:
+            self._targets[key] = resolver, interval, time.monotonic() + grace
+            if self._thread is None:
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def unwatch(self, key: Hashable) -> None:
+        with self._cond:
+            self._targets.pop(key, None)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._targets:
+                    self._cond.wait()
+                now = time.monotonic()
+                key, (resolver, interval, due) = min(self._targets.items(), key=lambda kv: kv[1][2])
+                if due > now:
+                    self._cond.wait(due - now)
+                    continue
+                self._targets[key] = resolver, interval, now + interval
+            try:
+                host, port = resolver()
+                err = probe(host, port, self.timeout)
+            except Exception as e:
+                err = f"{type(e).__name__}: {e}"
+            with self._cond:
+                # the bot may be stopped while probing
+                if key not in self._targets:
+                    continue
+            self.on_result(key, err)
@@ -0,0 +1,221 @@
+import atexit
+from collections import Counter
+from functools import wraps
+import json
+import os
+from pathlib import Path
+import threading
+import time
+from typing import IO, Any, Callable, Dict, List, Optional, TypeVar, Union
+
+from nonebot_desktop_tk.storage import user_cache_dir
+
+TRACE_ENV = "NBDESKTOP_TRACE"
+ROTATE_BYTES = 8 * 1024 * 1024
+ROTATE_KEEP = 3
+COUNTER_INTERVAL = 0.5
+FLUSH_EVERY = 256
+
+F = TypeVar("F", bound=Callable[..., Any])
+
+
+def _us(t: float) -> int:
+    return int(t * 1_000_000)
+
+
+class Tracer:
+    """Collects trace events and writes them in batches."""
+    def __init__(self, path: Union[str, Path]) -> None:
+        self.path = Path(path)
+        self.chrome = self.path.suffix == ".json"
+        self.pid = os.getpid()
+        self.counters: Dict[str, Counter] = {}
+        self._counters_at: Dict[str, float] = {}
+        self._buf: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+        self._file: Optional[IO[str]] = None
+        self._open()
+
+    def _open(self) -> None:
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        if self.chrome:
+            # the trace viewer accepts an unterminated array
+            self._file = open(self.path, "w", encoding="utf-8")
+            self._file.write("[\n")
+        else:
+            self._file = open(self.path, "a", encoding="utf-8")
+
+    def _rotate(self) -> None:
+        assert self._file is not None
+        self._file.close()
+        for n in range(ROTATE_KEEP - 1, 0, -1):
+            src = self.path.with_name(f"{self.path.name}.{n}")
+            if src.exists():
+                os.replace(src, self.path.with_name(f"{self.path.name}.{n + 1}"))
+        os.replace(self.path, self.path.with_name(f"{self.path.name}.1"))
+        self._open()
+
+    def emit(self, event: Dict[str, Any]) -> None:
+        event["pid"] = self.pid
+        event.setdefault("tid", threading.get_ident())
+        with self._lock:
+            self._buf.append(event)
+            if len(self._buf) >= FLUSH_EVERY:
+                self._flush()
+
+    def _flush(self) -> None:
+        if self._file is None or not self._buf:
+            return
+        sep = ",\n" if self.chrome else "\n"
+        self._file.write("".join(json.dumps(e, ensure_ascii=False) + sep for e in self._buf))
+        self._file.flush()
+        self._buf.clear()
+        if not self.chrome and self._file.tell() > ROTATE_BYTES:
+            self._rotate()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def complete(self, name: str, start: float, end: float, args: Optional[Dict[str, Any]] = None) -> None:
+        ev: Dict[str, Any] = {"name": name, "ph": "X", "ts": _us(start), "dur": _us(end - start)}
+        if args:
+            ev["args"] = args
+        self.emit(ev)
+
+    def count(self, name: str, key: str, delta: int) -> None:
+        with self._lock:
+            c = self.counters.setdefault(name, Counter())
+            c[key] += delta
+        now = time.perf_counter()
+        if now - self._counters_at.get(name, 0.0) >= COUNTER_INTERVAL:
+            self._counters_at[name] = now
+            self.emit_counter(name, now)
+
+    def emit_counter(self, name: str, now: float) -> None:
+        with self._lock:
+            args = dict(self.counters.get(name, {}))
+        self.emit({"name": name, "ph": "C", "ts": _us(now), "args": args})
+
+    def close(self) -> None:
+        now = time.perf_counter()
+        for name in list(self.counters):
+            self.emit_counter(name, now)
+        with self._lock:
+            self._flush()
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+_tracer: Optional[Tracer] = None
+
+
+class _NullSpan:
+    def __enter__(self) -> None:
+        return None
+
+    def __exit__(self, *_) -> None:
+        return None
+
+
+_NULL_SPAN = _NullSpan()
+
+
+class _Span:
+    def __init__(self, tracer: Tracer, name: str, args: Dict[str, Any]) -> None:
+        self.tracer = tracer
+        self.name = name
+        self.args = args
+
+    def __enter__(self) -> None:
+        self.start = time.perf_counter()
+
+    def __exit__(self, exc_type, *_) -> None:
+        if exc_type is not None:
+            self.args["error"] = exc_type.__name__
+        self.tracer.complete(self.name, self.start, time.perf_counter(), self.args)
+
+
+def enable(path: Union[str, Path, None] = None) -> Tracer:
+    """
+    Start tracing. Called for `--trace FILE` on the command line, or when
+    `NBDESKTOP_TRACE` is set to a file path (or `1`).
+
+    Until then, `span` returns a shared no-op context manager and `count`
+    returns immediately.
+
+    - path: `Union[str, Path, None]`    - trace file, `.json` for Chrome trace
+                                          format (for `chrome://tracing` or
+                                          Perfetto), rotating JSON lines
+                                          otherwise. A file in the cache
+                                          directory by default.
+
+    - return: `Tracer`
+    """
+    global _tracer
+    if _tracer is None:
+        if path is None or str(path) == "1":
+            path = user_cache_dir("traces") / f"trace-{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}.jsonl"
+        _tracer = Tracer(path)
+        _count_widgets()
+        atexit.register(_tracer.close)
+        print(f"[instrument] Tracing to {_tracer.path}")
+    return _tracer
+
+
+def enabled() -> bool:
+    return _tracer is not None
+
+
+def span(name: str, **args: Any) -> Any:
+    """
+    Time a block as a span.
+
+    - name: `str`   - name of the span.
+    - **args: `Any` - JSON-serializable details of the span.
+    """
+    if _tracer is None:
+        return _NULL_SPAN
+    return _Span(_tracer, name, args)
+
+
+def traced(name: str) -> Callable[[F], F]:
+    """Decorator timing each call of a function as a span."""
+    def deco(func: F) -> F:
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            if _tracer is None:
+                return func(*args, **kwargs)
+            with _Span(_tracer, name, {}):
+                return func(*args, **kwargs)
+        return wrapper  # type: ignore
+    return deco
+
+
+def complete(name: str, start: float, end: Optional[float] = None, **args: Any) -> None:
+    """Record a span measured elsewhere, with `time.perf_counter()` values."""
+    if _tracer is not None:
+        _tracer.complete(name, start, time.perf_counter() if end is None else end, args)
+
+
+def count(name: str, key: str = "value", delta: int = 1) -> None:
+    """Increase a counter, recorded at most every `COUNTER_INTERVAL` seconds."""
+    if _tracer is not None:
+        _tracer.count(name, key, delta)
+
+
+def _count_widgets() -> None:
+    # every tkinter (and ttk) widget goes through `BaseWidget._setup`
+    import tkinter
+    setup = tkinter.BaseWidget._setup
+
+    def _setup(self, master, cnf):
+        count("widgets", type(self).__name__)
+        return setup(self, master, cnf)
+
+    tkinter.BaseWidget._setup = _setup  # type: ignore
+
+
+if os.environ.get(TRACE_ENV):
+    enable(os.environ[TRACE_ENV])
@@ -0,0 +1,57 @@
+from importlib import import_module
+from threading import Lock, Thread
+from types import ModuleType
+from typing import Any, Optional
+
+_import_lock = Lock()
+
+
+class LazyModule:
+    """
+    A module imported on first attribute access.
+
+    Heavy dependencies are kept out of the startup path this way, and can
+    be imported ahead of use by `prefetch`.
+    """
+    def __init__(self, name: str) -> None:
+        self._name = name
+        self._module: Optional[ModuleType] = None
+
+    def load(self) -> ModuleType:
+        """Import the module (only once) and return it."""
+        if self._module is None:
+            # a lock avoids conflicts with a prefetching thread
+            with _import_lock:
+                if self._module is None:
+                    self._module = import_module(self._name)
+        return self._module
+
+    @property
+    def loaded(self) -> bool:
+        return self._module is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        return f"<LazyModule {self._name!r} ({'loaded' if self.loaded else 'not loaded'})>"
+
+
+def prefetch(*modules: LazyModule) -> Thread:
+    """
+    Import lazy modules one by one in a background thread.
+
+    - *modules: `LazyModule`    - modules to be imported.
+
+    - return: `Thread`          - the (started) importing thread.
+    """
+    def _work():
+        for mod in modules:
+            try:
+                mod.load()
+            except Exception as e:
+                print(f"[prefetch] Cannot import {mod._name}: {e!r}")
+
+    th = Thread(target=_work, daemon=True)
+    th.start()
+    return th
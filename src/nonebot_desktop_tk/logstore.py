@@ -0,0 +1,311 @@
+from array import array
+from bisect import bisect_right
+import mmap
+import re
+import tempfile
+from threading import Condition, Lock, Thread
+from typing import IO, Any, Callable, Dict, List, NamedTuple, Optional, Pattern, Tuple
+
+LEVELS = ("TRACE", "DEBUG", "INFO", "SUCCESS", "WARNING", "ERROR", "CRITICAL")
+LEVEL_NO = {name: n for n, name in enumerate(LEVELS)}
+
+# default format of nonebot's loguru handler, e.g.
+# `08-14 12:00:00 [INFO] nonebot | Running NoneBot...`
+LOG_LINE = re.compile(r"^\d\d-\d\d \d\d:\d\d:\d\d \[(?P<level>[A-Z]+)\] (?P<module>[\w.]+) \| ")
+
+
+class LogFilter(NamedTuple):
+    """Lines shown by the log viewer."""
+    min_level: int = 0
+    module: str = ""
+    pattern: str = ""
+
+    def compile(self) -> Optional[Pattern[bytes]]:
+        """Compile `pattern` for searching UTF-8 text, raises `re.error`."""
+        if not self.pattern:
+            return None
+        return re.compile(self.pattern.encode("utf-8"), re.IGNORECASE | re.MULTILINE)
+
+
+class LogSnapshot(NamedTuple):
+    base: int
+    levels: "array[int]"
+    modules: "array[int]"
+    offsets: "array[int]"
+    spilled: Optional[mmap.mmap]
+    spill_size: int
+    hot: List[str]
+    module_names: List[str]
+
+
+class LogStore:
+    """
+    Indexed lines of a bot's log.
+
+    Each line is parsed once for its loguru level and module; lines without
+    a prefix (such as tracebacks) take those of the line before. Levels and
+    modules are kept in compact arrays for fast filtering.
+
+    The newest lines are kept in memory. Every `SEGMENT` lines are encoded
+    and appended to an anonymous temp file, which is read back through
+    `mmap`, so memory stays bounded. Line ids are absolute; beyond
+    `max_lines`, the oldest half is dropped and the ids before `base` are
+    gone.
+    """
+    SEGMENT = 4096
+
+    def __init__(self, max_lines: int = 1000000) -> None:
+        self.max_lines = max_lines
+        self.base = 0
+        self.levels = array("B")
+        self.modules = array("I")
+        self.offsets = array("Q")  # start of spilled lines in `spill`
+        self.hot: List[str] = []
+        self.module_names: List[str] = [""]
+        self.module_ids: Dict[str, int] = {"": 0}
+        self.spill: IO[bytes] = tempfile.TemporaryFile(prefix="nbdesktop-log-")
+        self.spill_size = 0
+        self._map: Optional[mmap.mmap] = None
+        self._level = LEVEL_NO["INFO"]
+        self._module = 0
+        self.closed = False
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return self.base + len(self.levels)
+
+    def append(self, stream: str, text: str) -> None:
+        """Add a line, thread-safe. Fits the sinks of `ProcessRun`."""
+        with self._lock:
+            if self.closed:
+                return
+            m = LOG_LINE.match(text)
+            if m is not None:
+                self._level = LEVEL_NO.get(m["level"], self._level)
+                self._module = self._module_id(m["module"])
+            elif stream == "meta":
+                self._level, self._module = LEVEL_NO["INFO"], 0
+            self.levels.append(self._level)
+            self.modules.append(self._module)
+            self.hot.append(text)
+            if len(self.hot) >= self.SEGMENT:
+                self._spill()
+            if len(self.levels) > self.max_lines:
+                self._compact()
+
+    def _module_id(self, name: str) -> int:
+        mid = self.module_ids.get(name)
+        if mid is None:
+            mid = self.module_ids[name] = len(self.module_names)
+            self.module_names.append(name)
+        return mid
+
+    def _spill(self) -> None:
+        # caller holds the lock
+        chunks = []
+        pos = self.spill_size
+        for text in self.hot:
+            data = text.encode("utf-8", "replace") + b"\n"
+            self.offsets.append(pos)
+            chunks.append(data)
+            pos += len(data)
+        self.spill.seek(0, 2)
+        self.spill.write(b"".join(chunks))
+        self.spill.flush()
+        self.spill_size = pos
+        self.hot = []
+
+    def _mapped(self) -> Optional[mmap.mmap]:
+        # caller holds the lock; remapped when the file has grown
+        if self.spill_size and (self._map is None or len(self._map) < self.spill_size):
+            self._map = mmap.mmap(self.spill.fileno(), self.spill_size, access=mmap.ACCESS_READ)
+        return self._map
+
+    def _compact(self) -> None:
+        # caller holds the lock; snapshots keep the old map alive
+        drop = min(len(self.offsets), len(self.levels) // 2)
+        if not drop:
+            return
+        cut = self.offsets[drop] if drop < len(self.offsets) else self.spill_size
+        spill: IO[bytes] = tempfile.TemporaryFile(prefix="nbdesktop-log-")
+        self.spill.seek(cut)
+        while chunk := self.spill.read(1 << 20):
+            spill.write(chunk)
+        spill.flush()
+        self.spill.close()
+        self.spill, self._map = spill, None
+        self.spill_size -= cut
+        self.offsets = array("Q", (o - cut for o in self.offsets[drop:]))
+        self.levels = self.levels[drop:]
+        self.modules = self.modules[drop:]
+        self.base += drop
+
+    def _view(self) -> LogSnapshot:
+        # caller holds the lock
+        return LogSnapshot(
+            self.base, self.levels, self.modules, self.offsets, self._mapped(),
+            self.spill_size, self.hot, self.module_names
+        )
+
+    def snapshot(self) -> LogSnapshot:
+        """Copy the index for reading in other threads."""
+        with self._lock:
+            v = self._view()
+            return v._replace(
+                levels=array("B", v.levels), modules=array("I", v.modules),
+                offsets=array("Q", v.offsets), hot=list(v.hot),
+                module_names=list(v.module_names)
+            )
+
+    def match_tail(self, flt: LogFilter, start: int) -> List[int]:
+        """Find lines matching a filter from `start`, for new lines only."""
+        with self._lock:
+            return match(self._view(), flt, start) or []
+
+    def lines(self, ids: List[int]) -> List[Tuple[int, str]]:
+        """Get `(level, text)` of lines by absolute ids, dropped lines are skipped."""
+        res: List[Tuple[int, str]] = []
+        with self._lock:
+            if self.closed:
+                return res
+            spilled = len(self.offsets)
+            m = self._mapped()
+            for lid in ids:
+                i = lid - self.base
+                if i < 0 or i >= len(self.levels):
+                    continue
+                if i < spilled:
+                    assert m is not None
+                    end = self.offsets[i + 1] if i + 1 < spilled else self.spill_size
+                    text = m[self.offsets[i]:end - 1].decode("utf-8", "replace")
+                else:
+                    text = self.hot[i - spilled]
+                res.append((self.levels[i], text))
+        return res
+
+    def module_list(self) -> List[str]:
+        with self._lock:
+            return sorted(self.module_names[1:])
+
+    def close(self) -> None:
+        with self._lock:
+            self.closed = True
+            self._map = None
+            self.spill.close()
+
+
+def match(
+    snap: LogSnapshot, flt: LogFilter, start: int = 0,
+    cancelled: Callable[[], bool] = lambda: False
+) -> Optional[List[int]]:
+    """
+    Find lines matching a filter in a snapshot.
+
+    Spilled lines are searched by running the pattern over the mapped file
+    at once, then mapping hits to lines by their offsets.
+
+    - snap: `LogSnapshot`           - from `LogStore.snapshot`.
+    - flt: `LogFilter`              - the filter.
+    - start: `int`                  - the first absolute line id to check.
+    - cancelled: `() -> bool`       - checked between segments.
+
+    - return: `Optional[List[int]]` - absolute ids of matching lines, or
+                                      `None` if cancelled.
+    """
+    pattern = flt.compile()
+    mods = None
+    if flt.module:
+        mods = {
+            n for n, name in enumerate(snap.module_names)
+            if name == flt.module or name.startswith(f"{flt.module}.")
+        }
+
+    def wanted(i: int) -> bool:
+        return snap.levels[i] >= flt.min_level and (mods is None or snap.modules[i] in mods)
+
+    res: List[int] = []
+    first = max(start - snap.base, 0)
+    spilled = len(snap.offsets)
+    if first < spilled:
+        if pattern is None:
+            for seg in range(first, spilled, LogStore.SEGMENT):
+                if cancelled():
+                    return None
+                res.extend(snap.base + i for i in range(seg, min(seg + LogStore.SEGMENT, spilled)) if wanted(i))
+        else:
+            assert snap.spilled is not None
+            pos, stop = snap.offsets[first], snap.spill_size
+            checked = 0
+            while (hit := pattern.search(snap.spilled, pos, stop)) is not None:
+                i = bisect_right(snap.offsets, hit.start()) - 1
+                if wanted(i):
+                    res.append(snap.base + i)
+                # continue from the next line
+                pos = snap.offsets[i + 1] if i + 1 < spilled else stop
+                checked += 1
+                if not checked % LogStore.SEGMENT and cancelled():
+                    return None
+    for n, text in enumerate(snap.hot):
+        i = spilled + n
+        if i >= first and wanted(i) and (
+            pattern is None or pattern.search(text.encode("utf-8", "replace")) is not None
+        ):
+            res.append(snap.base + i)
+    return res
+
+
+class FilterWorker:
+    """
+    Filter a `LogStore` on a background thread.
+
+    Only the latest submitted filter is computed; a running computation is
+    abandoned as soon as a newer filter is submitted.
+    """
+    def __init__(self, store: LogStore, on_result: Callable[[int, List[int], int], Any]) -> None:
+        """
+        - store: `LogStore`                         - the log to be filtered.
+        - on_result: `(int, List[int], int) -> Any` - called in the worker
+                                                      thread with generation,
+                                                      result, and the id
+                                                      after the last checked
+                                                      line.
+        """
+        self.store = store
+        self.on_result = on_result
+        self.generation = 0
+        self._job: Optional[Tuple[int, LogFilter]] = None
+        self._stopped = False
+        self._cond = Condition()
+        Thread(target=self._run, daemon=True).start()
+
+    def submit(self, flt: LogFilter) -> int:
+        """Submit a filter, returning its generation."""
+        with self._cond:
+            self.generation += 1
+            self._job = (self.generation, flt)
+            self._cond.notify()
+            return self.generation
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self.generation += 1
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._job is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                gen, flt = self._job  # type: ignore
+                self._job = None
+            try:
+                snap = self.store.snapshot()
+                res = match(snap, flt, 0, lambda: self.generation != gen)
+            except Exception as e:
+                print(f"[FilterWorker] Failed: {e!r}")
+                continue
+            if res is not None and self.generation == gen:
+                self.on_result(gen, res, snap.base + len(snap.levels))
@@ -0,0 +1,157 @@
+from concurrent.futures import ThreadPoolExecutor
+import http.client
+import math
+from pathlib import Path
+import re
+from threading import Lock
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional, Union
+from urllib.parse import urljoin, urlsplit
+
+from nonebot_desktop_tk.storage import dump_json, load_json, user_cache_dir
+
+# a page every mirror has, fetched like pip fetches project pages
+PROBE_PROJECT = "nonebot2"
+USER_AGENT = "nonebot-desktop-mirrors"
+# bytes of a typical download, which weighs throughput against latency
+REFERENCE_SIZE = 1 << 20
+MAX_REDIRECTS = 3
+
+# pip output meaning the index could not be reached, rather than the
+# packages being unavailable
+NETWORK_ERROR = re.compile(
+    r"NewConnectionError|ConnectTimeoutError|ReadTimeoutError|Read timed out|ProxyError|SSLError"
+    r"|Max retries exceeded|Could not fetch URL|connection broken|Connection reset"
+    r"|Temporary failure in name resolution|Name or service not known|HTTP error 5\d\d",
+    re.IGNORECASE
+)
+
+
+class MirrorStat(NamedTuple):
+    url: str
+    latency: Optional[float]  # seconds to the response headers
+    throughput: Optional[float]  # bytes per second of the body
+    error: Optional[str]
+    time: float
+
+    @property
+    def healthy(self) -> bool:
+        return self.error is None and self.latency is not None
+
+    @property
+    def score(self) -> float:
+        """Estimated seconds to fetch a page and a typical download, lower is better."""
+        if not self.healthy:
+            return math.inf
+        return (self.latency or 0.0) + REFERENCE_SIZE / max(self.throughput or 0.0, 1.0)
+
+
+def _key(url: str) -> str:
+    return url.rstrip("/")
+
+
+def probe_mirror(url: str, timeout: float = 5.0, project: str = PROBE_PROJECT) -> MirrorStat:
+    """
+    Measure a simple index by fetching the page of a project.
+
+    - url: `str`            - the index, like `https://pypi.org/simple`.
+    - timeout: `float`      - seconds to wait for connecting and each read.
+    - project: `str`        - the project page to be fetched.
+
+    - return: `MirrorStat`  - latency and throughput, or the error.
+    """
+    target = urljoin(_key(url) + "/", f"{project}/")
+    start = time.perf_counter()
+    try:
+        for _ in range(MAX_REDIRECTS + 1):
+            u = urlsplit(target)
+            cls = http.client.HTTPSConnection if u.scheme == "https" else http.client.HTTPConnection
+            conn = cls(u.netloc, timeout=timeout)
+            try:
+                conn.request("GET", u.path + (f"?{u.query}" if u.query else ""), headers={"User-Agent": USER_AGENT})
+                resp = conn.getresponse()
+                first = time.perf_counter()
+                body = resp.read()
+                end = time.perf_counter()
+            finally:
+                conn.close()
+            location = resp.getheader("Location")
+            if resp.status in (301, 302, 303, 307, 308) and location:
+                target = urljoin(target, location)
+                continue
+            break
+    except (OSError, http.client.HTTPException) as e:
+        return MirrorStat(url, None, None, f"{type(e).__name__}: {e}", time.time())
+    if resp.status != 200:
+        return MirrorStat(url, None, None, f"HTTP {resp.status}", time.time())
+    # small pages may arrive in one read, so the time is bounded below
+    return MirrorStat(url, first - start, len(body) / max(end - first, 1e-3), None, time.time())
+
+
+def probe_all(urls: Iterable[str], timeout: float = 5.0) -> List[MirrorStat]:
+    """Probe mirrors at the same time, each in its own thread."""
+    urls = list(urls)
+    if not urls:
+        return []
+    with ThreadPoolExecutor(len(urls)) as pool:
+        return list(pool.map(lambda u: probe_mirror(u, timeout), urls))
+
+
+class MirrorRanking:
+    """
+    Mirrors ranked by their latest probes, kept on disk between runs.
+
+    A mirror failing a pip run is marked unhealthy until it is probed
+    again, so the next best one is used instead.
+    """
+    def __init__(self, file: Union[str, Path, None] = None) -> None:
+        self.file = Path(file) if file is not None else user_cache_dir() / "mirrors.json"
+        self.stats: Dict[str, MirrorStat] = {}
+        self.lock = Lock()
+        data = load_json(self.file, [])
+        if isinstance(data, list):
+            for item in data:
+                try:
+                    stat = MirrorStat(**item)
+                except TypeError:
+                    continue
+                self.stats[_key(stat.url)] = stat
+
+    def save(self) -> None:
+        with self.lock:
+            data = [s._asdict() for s in self.stats.values()]
+        try:
+            dump_json(self.file, data)
+        except OSError as e:
+            print(f"[MirrorRanking] Cannot save ranking: {e!r}")
+
+    def update(self, stats: Iterable[MirrorStat]) -> None:
+        with self.lock:
+            for s in stats:
+                self.stats[_key(s.url)] = s
+        self.save()
+
+    def fail(self, url: str, error: str) -> None:
+        with self.lock:
+            old = self.stats.get(_key(url))
+            self.stats[_key(url)] = MirrorStat(url, None, None, error, old.time if old else 0.0)
+        self.save()
+
+    def stale(self, urls: Iterable[str], ttl: float) -> bool:
+        """Whether any of the mirrors was not probed in `ttl` seconds."""
+        now = time.time()
+        with self.lock:
+            return any(
+                (s := self.stats.get(_key(u))) is None or now - s.time > ttl
+                for u in urls
+            )
+
+    def ranked(self) -> List[MirrorStat]:
+        """Healthy mirrors from the fastest, then the others."""
+        with self.lock:
+            stats = list(self.stats.values())
+        return sorted(stats, key=lambda s: (s.score, s.url))
+
+    def best(self) -> Optional[str]:
+        ranked = self.ranked()
+        return ranked[0].url if ranked and ranked[0].healthy else None
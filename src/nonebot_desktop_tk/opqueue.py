@@ -0,0 +1,108 @@
+from typing import Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+# actions on packages, and on the config of a project
+PACKAGE_ACTIONS = ("install", "uninstall")
+CONFIG_ACTIONS = ("enable", "disable")
+OPPOSITE = {"install": "uninstall", "uninstall": "install", "enable": "disable", "disable": "enable"}
+ACTION_NAMES = {"install": "安装", "uninstall": "卸载", "enable": "启用", "disable": "禁用"}
+KIND_NAMES = {"plugin": "插件", "adapter": "适配器", "driver": "驱动器"}
+
+
+class PendingOp(NamedTuple):
+    """An operation waiting in `OperationQueue`."""
+    action: str
+    kind: str
+    name: str
+    package: str
+    module: str
+
+    @property
+    def key(self) -> Tuple[str, str, str]:
+        # an operation replaces the opposite one on the same target
+        if self.action in PACKAGE_ACTIONS:
+            return "package", self.kind, self.package
+        return "config", self.kind, self.module
+
+    def describe(self) -> str:
+        return f"{ACTION_NAMES[self.action]}{KIND_NAMES[self.kind]} {self.name}"
+
+
+class Plan(NamedTuple):
+    """Operations merged for execution."""
+    root: str
+    uninstalls: List[str]
+    installs: List[str]
+    config: List[PendingOp]
+
+    @property
+    def steps(self) -> int:
+        return bool(self.config) + bool(self.uninstalls) + bool(self.installs)
+
+
+class OperationQueue:
+    """
+    Pending operations on plugins, adapters and drivers of a project.
+
+    Queued installs are merged into a single `pip install`, uninstalls into
+    a single `pip uninstall`, and enable/disable edits into a single write
+    of the config.
+
+    All queued operations belong to the project at `root`; they are dropped
+    when operations of another project are queued.
+    """
+    def __init__(self) -> None:
+        self.ops: Dict[Tuple[str, str, str], PendingOp] = {}
+        self.root: Optional[str] = None
+        self.running = False
+        self.listeners: List[Callable[[], Any]] = []
+
+    def __len__(self) -> int:
+        return len(self.ops)
+
+    def __iter__(self):
+        return iter(list(self.ops.values()))
+
+    def notify(self) -> None:
+        for listener in list(self.listeners):
+            listener()
+
+    def set_root(self, root: str) -> None:
+        """Switch to a project, dropping operations queued for another one."""
+        if root != self.root:
+            self.root = root
+            if self.ops:
+                self.clear()
+
+    def add(self, root: str, *ops: PendingOp) -> None:
+        """Queue operations on a project, replacing opposite ones on the same targets."""
+        self.set_root(root)
+        for op in ops:
+            old = self.ops.get(op.key)
+            if old is not None and old.action == OPPOSITE[op.action]:
+                # they cancel each other
+                del self.ops[op.key]
+            else:
+                self.ops[op.key] = op
+        self.notify()
+
+    def remove(self, *ops: PendingOp) -> None:
+        for op in ops:
+            self.ops.pop(op.key, None)
+        self.notify()
+
+    def clear(self) -> None:
+        self.ops.clear()
+        self.notify()
+
+    def take_plan(self) -> Plan:
+        """Merge and dequeue all operations."""
+        assert self.root is not None
+        ops = list(self.ops.values())
+        self.ops.clear()
+        self.notify()
+        return Plan(
+            self.root,
+            [op.package for op in ops if op.action == "uninstall"],
+            [op.package for op in ops if op.action == "install"],
+            [op for op in ops if op.action in CONFIG_ACTIONS],
+        )
@@ -0,0 +1,296 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from hashlib import sha1
+from html.parser import HTMLParser
+import http.client
+import json
+import platform
+import re
+from threading import Lock, local
+import time
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+from urllib.parse import urljoin, urlsplit
+
+from nonebot_desktop_tk.depgraph import normalize
+from nonebot_desktop_tk.distindex import DistRecord
+from nonebot_desktop_tk.storage import dump_json, load_json, user_cache_dir
+
+DEFAULT_INDEX = "https://pypi.org/simple/"
+ACCEPT = "application/vnd.pypi.simple.v1+json, text/html;q=0.1"
+USER_AGENT = "nonebot-desktop-outdated"
+
+ARCHIVE = re.compile(r"\.(?:whl|tar\.gz|tar\.bz2|zip)$", re.IGNORECASE)
+# a whole PEP 440 version, with its pre-release and development segments
+# captured; local labels like `+cpu` are not pre-releases
+PEP440 = re.compile(
+    r"v?(?:\d+!)?\d+(?:\.\d+)*"
+    r"(?P<pre>[-_.]?(?:a|b|c|rc|alpha|beta|pre|preview)[-_.]?\d*)?"
+    r"(?:-\d+|[-_.]?(?:post|rev|r)[-_.]?\d*)?"
+    r"(?P<dev>[-_.]?dev[-_.]?\d*)?"
+    r"(?:\+[a-z0-9]+(?:[-_.][a-z0-9]+)*)?",
+    re.IGNORECASE
+)
+
+
+class Outdated(NamedTuple):
+    key: str
+    name: str
+    current: str
+    latest: str
+
+
+class IndexFile(NamedTuple):
+    filename: str
+    yanked: bool
+    requires_python: Optional[str]
+
+
+@lru_cache(maxsize=4096)
+def _version_key(version: str) -> Any:
+    try:
+        from packaging.version import Version
+        return (1, Version(version))
+    except Exception:
+        # not PEP 440, compared by its numbers
+        return (0, tuple(int(n) for n in re.findall(r"\d+", version)))
+
+
+def is_prerelease(version: str) -> bool:
+    m = PEP440.fullmatch(version.strip())
+    return m is not None and bool(m["pre"] or m["dev"])
+
+
+def newer(latest: str, current: str) -> bool:
+    a, b = _version_key(latest), _version_key(current)
+    return a[0] == b[0] and a > b
+
+
+@lru_cache(maxsize=256)
+def _python_ok(spec: Optional[str]) -> bool:
+    if not spec:
+        return True
+    try:
+        from packaging.specifiers import SpecifierSet
+        return platform.python_version() in SpecifierSet(spec)
+    except Exception:
+        return True
+
+
+def file_version(filename: str, name: str) -> Optional[str]:
+    """Get the version from a wheel or sdist file name of a project."""
+    if ARCHIVE.search(filename) is None:
+        return None
+    stem = ARCHIVE.sub("", filename)
+    if filename.lower().endswith(".whl"):
+        parts = stem.split("-")
+        return parts[1] if len(parts) >= 5 else None
+    # sdists are `{name}-{version}`, and the name may contain `-`
+    head, sep, version = stem.rpartition("-")
+    if not sep or normalize(head) != name:
+        return None
+    return version
+
+
+def latest_version(files: Iterable[IndexFile], name: str, current: str = "") -> Optional[str]:
+    """
+    Pick the newest installable version from the files of a project.
+
+    Yanked files and files for other Python versions are skipped.
+    Pre-releases are considered only if `current` is one.
+    """
+    pre = is_prerelease(current)
+    best: Optional[str] = None
+    for f in files:
+        if f.yanked or not _python_ok(f.requires_python):
+            continue
+        version = file_version(f.filename, name)
+        if version is None or (not pre and is_prerelease(version)):
+            continue
+        if best is None or newer(version, best):
+            best = version
+    return best
+
+
+class _Anchors(HTMLParser):
+    def __init__(self) -> None:
+        super().__init__()
+        self.files: List[IndexFile] = []
+
+    def handle_starttag(self, tag: str, attrs: List[Tuple[str, Optional[str]]]) -> None:
+        if tag != "a":
+            return
+        a = dict(attrs)
+        href = a.get("href") or ""
+        filename = urlsplit(href).path.rpartition("/")[2]
+        self.files.append(IndexFile(filename, "data-yanked" in a, a.get("data-requires-python")))
+
+
+def parse_project_page(body: bytes, content_type: str) -> List[IndexFile]:
+    """Parse a project page of a simple index, in JSON (PEP 691) or HTML."""
+    if "json" in content_type:
+        data = json.loads(body)
+        return [
+            IndexFile(f["filename"], bool(f.get("yanked")), f.get("requires-python"))
+            for f in data.get("files", ())
+        ]
+    parser = _Anchors()
+    parser.feed(body.decode("utf-8", "replace"))
+    return parser.files
+
+
+class IndexClient:
+    """
+    Fetch project pages of a simple index.
+
+    Each thread keeps its own keep-alive connection to every host, so a
+    pool of threads reuses a pool of connections.
+    """
+    MAX_REDIRECTS = 5
+
+    def __init__(self, index: str = "", timeout: float = 10.0) -> None:
+        self.index = (index or DEFAULT_INDEX).rstrip("/") + "/"
+        self.timeout = timeout
+        self._local = local()
+
+    def _conn(self, scheme: str, netloc: str) -> http.client.HTTPConnection:
+        conns: Dict[Tuple[str, str], http.client.HTTPConnection] = self._local.__dict__.setdefault("conns", {})
+        conn = conns.get((scheme, netloc))
+        if conn is None:
+            cls = http.client.HTTPSConnection if scheme == "https" else http.client.HTTPConnection
+            conn = conns[(scheme, netloc)] = cls(netloc, timeout=self.timeout)
+        return conn
+
+    def _get(self, url: str) -> Tuple[int, str, bytes, str]:
+        u = urlsplit(url)
+        conn = self._conn(u.scheme, u.netloc)
+        path = u.path + (f"?{u.query}" if u.query else "")
+        headers = {"Accept": ACCEPT, "User-Agent": USER_AGENT}
+        for retry in (True, False):
+            try:
+                conn.request("GET", path, headers=headers)
+                resp = conn.getresponse()
+                body = resp.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # the server may have closed an idle connection
+                conn.close()
+                if not retry:
+                    raise
+        return resp.status, resp.getheader("Content-Type", ""), body, resp.getheader("Location", "")
+
+    def project_files(self, name: str) -> Optional[List[IndexFile]]:
+        """
+        - name: `str`                       - normalized project name.
+
+        - return: `Optional[List[IndexFile]]`
+                                            - files of the project, or
+                                              `None` if it is not on the
+                                              index.
+        """
+        url = urljoin(self.index, f"{name}/")
+        for _ in range(self.MAX_REDIRECTS):
+            status, ctype, body, location = self._get(url)
+            if status in (301, 302, 303, 307, 308) and location:
+                url = urljoin(url, location)
+                continue
+            if status == 404:
+                return None
+            if status != 200:
+                raise OSError(f"HTTP {status} from {url}")
+            return parse_project_page(body, ctype)
+        raise OSError(f"Too many redirects from {url}")
+
+
+class OutdatedChecker:
+    """
+    Find installed distributions with newer versions on an index.
+
+    Projects are queried concurrently by a thread pool. Latest versions are
+    cached on disk per index, and reused for `ttl` seconds.
+    """
+    def __init__(self, index: str = "", ttl: float = 3600.0, workers: int = 8) -> None:
+        self.client = IndexClient(index)
+        self.ttl = ttl
+        self.workers = workers
+        self.cachefile = user_cache_dir("outdated") / f"{sha1(self.client.index.encode()).hexdigest()}.json"
+        # normalized name -> (current version, latest version or "", time)
+        self.cache: Dict[str, Tuple[str, str, float]] = {}
+        data = load_json(self.cachefile, {})
+        if isinstance(data, dict):
+            self.cache = {k: tuple(v) for k, v in data.items()}  # type: ignore
+        self._lock = Lock()
+
+    def _save(self) -> None:
+        try:
+            dump_json(self.cachefile, self.cache)
+        except OSError as e:
+            print(f"[OutdatedChecker] Cannot save cache: {e!r}")
+
+    def cached(self, name: str, current: str) -> Optional[str]:
+        """Get a fresh cached latest version ("" if unknown), or `None`."""
+        entry = self.cache.get(name)
+        if entry is None or entry[0] != current or time.time() - entry[2] > self.ttl:
+            return None
+        return entry[1]
+
+    def _query(self, name: str, current: str) -> str:
+        files = self.client.project_files(name)
+        latest = (files and latest_version(files, name, current)) or ""
+        with self._lock:
+            self.cache[name] = (current, latest, time.time())
+        return latest
+
+    def check(
+        self, records: Iterable[DistRecord], refresh: bool = False,
+        on_progress: Callable[[int, int], Any] = lambda *_: None,
+        cancelled: Callable[[], bool] = lambda: False
+    ) -> Tuple[List[Outdated], Dict[str, str]]:
+        """
+        Check installed distributions, blocking until all are checked.
+
+        - records: `Iterable[DistRecord]`   - installed distributions.
+        - refresh: `bool`                   - ignore the cache.
+        - on_progress: `(int, int) -> Any`  - called with done and total
+                                              counts in worker threads.
+        - cancelled: `() -> bool`           - checked before each query.
+
+        - return: `(List[Outdated], Dict[str, str])`
+                                            - outdated distributions by
+                                              name, and errors by keys.
+        """
+        recs = {r.key: r for r in records}
+        latest: Dict[str, str] = {}
+        todo: List[DistRecord] = []
+        for key, rec in recs.items():
+            hit = None if refresh else self.cached(normalize(rec.name), rec.version)
+            if hit is None:
+                todo.append(rec)
+            else:
+                latest[key] = hit
+        total, done = len(recs), len(latest)
+        errors: Dict[str, str] = {}
+        counter = Lock()
+        on_progress(done, total)
+
+        def _one(rec: DistRecord) -> None:
+            nonlocal done
+            if cancelled():
+                return
+            try:
+                latest[rec.key] = self._query(normalize(rec.name), rec.version)
+            except Exception as e:
+                errors[rec.key] = f"{type(e).__name__}: {e}"
+            with counter:
+                done += 1
+                n = done
+            on_progress(n, total)
+
+        if todo:
+            with ThreadPoolExecutor(min(self.workers, len(todo))) as pool:
+                list(pool.map(_one, todo))
+            self._save()
+        res = [
+            Outdated(key, recs[key].name, recs[key].version, v)
+            for key, v in latest.items() if v and newer(v, recs[key].version)
+        ]
+        return sorted(res, key=lambda o: o.key), errors
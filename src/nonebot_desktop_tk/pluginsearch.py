@@ -0,0 +1,338 @@
+import re
+from threading import Condition, Lock, Thread
+import time
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from nonebot_desktop_tk import instrument
+
+Plugin = Dict[str, Any]
+
+TOKEN_SEP = re.compile(r"[\s_\-./:]+")
+MODULE_PREFIX = "nonebot_plugin_"
+CANCEL_CHECK_EVERY = 256
+
+# scores of ranking
+SCORE_SUBSTRING = 10
+SCORE_FUZZY = 4
+SCORE_MODULE_PREFIX = 30
+SCORE_NAME_PREFIX = 20
+SCORE_TAG_EXACT = 25
+SCORE_OFFICIAL = 15
+
+# keys of precomputed sort orders, ties are kept in publish order
+ORDER_KEYS: Dict[str, Callable[[Plugin], Any]] = {
+    "module_name": lambda pl: pl["module_name"],
+    "author": lambda pl: pl["author"].lower(),
+    "official": lambda pl: not pl.get("is_official"),
+}
+
+
+def plugin_text(pl: Plugin) -> str:
+    """Get the lower-cased text searched for a plugin."""
+    return (
+        "{name} {project_link} {module_name} {author} ".format(**pl) +
+        " ".join(tag["label"] for tag in pl["tags"])
+    ).lower()
+
+
+def _grams(s: str) -> Set[str]:
+    # trigrams, or the string itself if it is shorter
+    if len(s) < 3:
+        return {s}
+    return {s[i:i + 3] for i in range(len(s) - 2)}
+
+
+def _index_grams(s: str) -> Set[str]:
+    # all 1-, 2- and 3-grams, so that short keywords are indexed too
+    return {s[i:i + n] for n in (1, 2, 3) for i in range(len(s) - n + 1)}
+
+
+def max_typos(kwd: str) -> int:
+    """Get the edit distance tolerated for a keyword."""
+    if len(kwd) < 4:
+        return 0
+    return 1 if len(kwd) < 8 else 2
+
+
+def edit_distance(a: str, b: str, maxd: int) -> int:
+    """
+    Edit distance (with adjacent transpositions) between two strings,
+    bounded by `maxd`.
+
+    - return: `int` - the distance, or `maxd + 1` if it exceeds `maxd`.
+    """
+    if abs(len(a) - len(b)) > maxd:
+        return maxd + 1
+    pprev: List[int] = []
+    prev = list(range(len(b) + 1))
+    for i, ca in enumerate(a, 1):
+        cur = [i]
+        for j, cb in enumerate(b, 1):
+            d = min(prev[j] + 1, cur[j - 1] + 1, prev[j - 1] + (ca != cb))
+            if i > 1 and j > 1 and ca == b[j - 2] and a[i - 2] == cb:
+                d = min(d, pprev[j - 2] + 1)
+            cur.append(d)
+        if min(cur) > maxd:
+            return maxd + 1
+        pprev, prev = prev, cur
+    return min(prev[-1], maxd + 1)
+
+
+class PluginSearchIndex:
+    """
+    N-gram inverted index over a snapshot of the plugin registry.
+
+    A query matches a plugin when every whitespace-separated keyword is a
+    substring of `plugin_text(plugin)`. Candidates are looked up by the
+    trigrams of keywords (or by short keywords themselves) and then verified.
+    A query extending the previous one only narrows the previous result.
+
+    `rank` extends the exact result with typo-tolerant matches and orders
+    all matches by relevance.
+
+    An index is shared by all windows showing the snapshot, and used from
+    their search workers at once, so its caches are changed under a lock.
+    """
+    _instances: Dict[int, "PluginSearchIndex"] = {}
+    _instances_lock = Lock()
+
+    def __init__(self, plugins: List[Plugin]) -> None:
+        self.plugins = plugins
+        self.texts = [plugin_text(pl) for pl in plugins]
+        self.postings: Dict[str, List[int]] = {}
+        for n, text in enumerate(self.texts):
+            for tg in _index_grams(text):
+                self.postings.setdefault(tg, []).append(n)
+        self._last: Optional[Tuple[str, List[int]]] = None
+        self.modules = [pl["module_name"].lower() for pl in plugins]
+        self.names = [pl["name"].lower() for pl in plugins]
+        self.tags = [{tag["label"].lower() for tag in pl["tags"]} for pl in plugins]
+        self.official = [bool(pl.get("is_official")) for pl in plugins]
+        vocab: Dict[str, List[int]] = {}
+        for n, text in enumerate(self.texts):
+            for tok in set(TOKEN_SEP.split(text)):
+                if tok:
+                    vocab.setdefault(tok, []).append(n)
+        # tokens grouped by length: [(token, charset, plugin indices)]
+        self.vocab: Dict[int, List[Tuple[str, Set[str], List[int]]]] = {}
+        for tok, ids in vocab.items():
+            self.vocab.setdefault(len(tok), []).append((tok, set(tok), ids))
+        self._hits_cache: Dict[str, Set[int]] = {}
+        self._orders: Dict[str, List[int]] = {}
+        self._lock = Lock()
+
+    @classmethod
+    def of(cls, plugins: List[Plugin]) -> "PluginSearchIndex":
+        """Get the index of a registry snapshot, building it only once."""
+        with cls._instances_lock:
+            idx = cls._instances.get(id(plugins))
+            if idx is None or idx.plugins is not plugins:
+                # older snapshots are no longer used
+                cls._instances.clear()
+                idx = cls._instances[id(plugins)] = cls(plugins)
+            return idx
+
+    def _candidates(self, kwds: List[str]) -> List[int]:
+        cands: Optional[Set[int]] = None
+        for k in kwds:
+            for tg in sorted(_grams(k), key=lambda t: len(self.postings.get(t, ()))):
+                p = self.postings.get(tg)
+                if not p:
+                    return []
+                cands = set(p) if cands is None else cands.intersection(p)
+                if not cands:
+                    return []
+        return list(range(len(self.texts))) if cands is None else sorted(cands)
+
+    def search(self, query: str) -> List[int]:
+        """
+        Search plugins.
+
+        - query: `str`          - keywords separated by whitespaces.
+
+        - return: `List[int]`   - indices of matched plugins, in registry order.
+        """
+        q = query.lower()
+        kwds = q.split()
+        with self._lock:
+            last = self._last
+            if not kwds:
+                self._last = None
+        if not kwds:
+            return list(range(len(self.texts)))
+        if last is not None and q.startswith(last[0]):
+            # every old keyword is a substring of a new keyword, so the
+            # result can only shrink, and unchanged keywords need no check
+            res = last[1]
+            oldkwds = set(last[0].split())
+            kwds = [k for k in kwds if k not in oldkwds]
+        else:
+            res = self._candidates(kwds)
+        texts = self.texts
+        for k in kwds:
+            res = [n for n in res if k in texts[n]]
+        with self._lock:
+            self._last = (q, res)
+        return res
+
+    def sort_order(self, key: str) -> List[int]:
+        """
+        Get a precomputed order of all plugins.
+
+        - key: `str`            - `"publish"`, `"publish_reversed"` or a key
+                                  of `ORDER_KEYS`.
+
+        - return: `List[int]`   - plugin indices in that order.
+        """
+        with self._lock:
+            order = self._orders.get(key)
+        if order is None:
+            if key == "publish":
+                order = list(range(len(self.plugins)))
+            elif key == "publish_reversed":
+                order = list(range(len(self.plugins) - 1, -1, -1))
+            else:
+                kf = ORDER_KEYS[key]
+                order = sorted(range(len(self.plugins)), key=lambda n: kf(self.plugins[n]))
+            with self._lock:
+                order = self._orders.setdefault(key, order)
+        return order
+
+    def order_by(self, found: List[int], order: List[int]) -> List[int]:
+        """
+        Order a subset of plugins by a full order, without sorting.
+
+        - found: `List[int]`    - plugin indices in any order.
+        - order: `List[int]`    - all plugin indices in the wanted order.
+
+        - return: `List[int]`   - `found` in the wanted order.
+        """
+        if len(found) == len(order):
+            return order
+        mask = bytearray(len(order))
+        for n in found:
+            mask[n] = 1
+        return [n for n in order if mask[n]]
+
+    def _keyword_hits(self, kwd: str, cancelled: Callable[[], bool]) -> Optional[Set[int]]:
+        # plugins containing the keyword, or a token close to it
+        with self._lock:
+            cached = self._hits_cache.get(kwd)
+        if cached is not None:
+            return cached
+        texts = self.texts
+        hits = {n for n in self._candidates([kwd]) if kwd in texts[n]}
+        maxd = max_typos(kwd)
+        kset = set(kwd)
+        for ln in range(len(kwd) - maxd, len(kwd) + maxd + 1) if maxd else ():
+            if cancelled():
+                return None
+            for tok, tset, ids in self.vocab.get(ln, ()):
+                # each edit changes the charset by at most 2 characters
+                if len(kset ^ tset) <= 2 * maxd and edit_distance(kwd, tok, maxd) <= maxd:
+                    hits.update(ids)
+        with self._lock:
+            if len(self._hits_cache) > 1024:
+                self._hits_cache.clear()
+            self._hits_cache[kwd] = hits
+        return hits
+
+    def score(self, n: int, kwds: List[str]) -> int:
+        """Relevance score of a matched plugin."""
+        text, module, name, tags = self.texts[n], self.modules[n], self.names[n], self.tags[n]
+        short = module[len(MODULE_PREFIX):] if module.startswith(MODULE_PREFIX) else module
+        sc = SCORE_OFFICIAL if self.official[n] else 0
+        for k in kwds:
+            sc += SCORE_SUBSTRING if k in text else SCORE_FUZZY
+            if module.startswith(k) or short.startswith(k):
+                sc += SCORE_MODULE_PREFIX
+            if name.startswith(k):
+                sc += SCORE_NAME_PREFIX
+            if k in tags:
+                sc += SCORE_TAG_EXACT
+        return sc
+
+    def rank(self, query: str, cancelled: Callable[[], bool] = lambda: False) -> Optional[List[int]]:
+        """
+        Search plugins tolerating typos, and rank them by relevance.
+
+        - query: `str`                      - keywords separated by whitespaces.
+        - cancelled: `() -> bool`           - polled during computation, the
+                                              ranking is abandoned once it
+                                              returns `True`.
+
+        - return: `Optional[List[int]]`     - indices of matched plugins, most
+                                              relevant first, or `None` if
+                                              cancelled.
+        """
+        kwds = query.lower().split()
+        found = self.search(query)
+        if not kwds:
+            return found
+        if any(max_typos(k) for k in kwds):
+            matched: Optional[Set[int]] = None
+            for k in kwds:
+                hits = self._keyword_hits(k, cancelled)
+                if hits is None:
+                    return None
+                matched = hits if matched is None else matched & hits
+            found = sorted(matched or ())
+        scored: List[Tuple[int, int]] = []
+        for m, n in enumerate(found):
+            if m % CANCEL_CHECK_EVERY == 0 and cancelled():
+                return None
+            scored.append((-self.score(n, kwds), n))
+        scored.sort()
+        return [n for _, n in scored]
+
+
+class SearchWorker:
+    """
+    Rank queries on a background thread.
+
+    Only the latest submitted query is computed; a running computation is
+    abandoned as soon as a newer query is submitted.
+    """
+    def __init__(self, index: PluginSearchIndex, on_result: Callable[[int, List[int]], Any]) -> None:
+        """
+        - index: `PluginSearchIndex`            - the index to be searched.
+        - on_result: `(int, List[int]) -> Any`  - called in the worker thread
+                                                  with generation and result.
+        """
+        self.index = index
+        self.on_result = on_result
+        self.generation = 0
+        self._job: Optional[Tuple[int, str]] = None
+        self._stopped = False
+        self._cond = Condition()
+        Thread(target=self._run, daemon=True).start()
+
+    def submit(self, query: str) -> int:
+        """Submit a query, returning its generation."""
+        with self._cond:
+            self.generation += 1
+            self._job = (self.generation, query)
+            self._cond.notify()
+            return self.generation
+
+    def stop(self) -> None:
+        with self._cond:
+            self._stopped = True
+            self.generation += 1
+            self._cond.notify()
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while self._job is None and not self._stopped:
+                    self._cond.wait()
+                if self._stopped:
+                    return
+                gen, query = self._job  # type: ignore
+                self._job = None
+            start = time.perf_counter()
+            res = self.index.rank(query, lambda: self.generation != gen)
+            # cancelled rankings are recorded without a result
+            instrument.complete("PluginSearchIndex.rank", start, query=query, found=None if res is None else len(res))
+            if res is not None and self.generation == gen:
+                self.on_result(gen, res)
@@ -0,0 +1,205 @@
+from collections import deque
+from functools import partial
+from itertools import islice
+import locale
+import os
+import re
+import signal
+import subprocess
+import sys
+from threading import Lock, Thread
+import time
+from typing import IO, Any, Callable, Deque, List, Optional, Sequence, Tuple, Union
+
+WINDOWS = sys.platform.startswith("win")
+
+MAX_LINE = 4096
+ANSI_ESCAPE = re.compile(r"\x1b\[[0-9;?]*[ -/]*[@-~]")
+
+# (stream, text), stream is "out", "err" or "meta"
+Line = Tuple[str, str]
+
+
+def _decode(data: bytes) -> str:
+    try:
+        text = data.decode("utf-8")
+    except UnicodeDecodeError:
+        text = data.decode(locale.getpreferredencoding(False), "replace")
+    return ANSI_ESCAPE.sub("", text.rstrip("\r\n"))
+
+
+class OutputBuffer:
+    """
+    Bounded ring buffer of output lines.
+
+    Lines are numbered by a growing sequence, so a reader remembers the
+    sequence it has read up to and fetches only newer lines. The oldest
+    lines are dropped when the buffer is full, so memory stays flat however
+    much a process prints.
+    """
+    def __init__(self, maxlen: int = 5000) -> None:
+        self.lines: Deque[Line] = deque(maxlen=maxlen)
+        self.total = 0
+        self.dirty = False
+        self._lock = Lock()
+
+    def append(self, stream: str, text: str) -> bool:
+        """
+        Add a line, thread-safe.
+
+        - return: `bool`    - whether the buffer was read since the last
+                              append, i.e. readers need to be notified.
+        """
+        with self._lock:
+            self.lines.append((stream, text))
+            self.total += 1
+            notify, self.dirty = not self.dirty, True
+        return notify
+
+    def acknowledge(self) -> None:
+        """Mark the buffer as read, so the next append notifies again."""
+        with self._lock:
+            self.dirty = False
+
+    def since(self, seq: int) -> Tuple[List[Line], int, int]:
+        """
+        Get lines after a sequence.
+
+        - seq: `int`        - number of lines already read.
+
+        - return: `(List[Line], int, int)`
+                            - new lines, the sequence to read from next
+                              time, and the number of lines dropped before
+                              they could be read.
+        """
+        with self._lock:
+            first = self.total - len(self.lines)
+            start = max(seq, first)
+            return list(islice(self.lines, start - first, None)), self.total, start - seq
+
+    def clear(self) -> None:
+        with self._lock:
+            self.lines.clear()
+
+
+def spawn(args: Sequence[str], cwd: Union[str, os.PathLike, None] = None) -> "subprocess.Popen[bytes]":
+    """
+    Start a process with its stdout and stderr piped.
+
+    The process runs in a new process group without a console window, and
+    Python processes in it write unbuffered UTF-8 output.
+
+    - args: `Sequence[str]`             - command line.
+    - cwd: `Union[str, PathLike, None]` - work directory.
+
+    - return: `Popen[bytes]`            - the process.
+    """
+    env = dict(os.environ, PYTHONUNBUFFERED="1", PYTHONIOENCODING="utf-8")
+    kwargs: Any = {}
+    if WINDOWS:
+        kwargs["creationflags"] = subprocess.CREATE_NO_WINDOW | subprocess.CREATE_NEW_PROCESS_GROUP
+    else:
+        kwargs["start_new_session"] = True
+    return subprocess.Popen(
+        list(args), cwd=cwd, env=env,
+        stdin=subprocess.DEVNULL, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+        **kwargs
+    )
+
+
+def terminate_tree(proc: "subprocess.Popen[bytes]", force: bool = False) -> None:
+    """
+    Terminate a process together with the processes it started.
+
+    - proc: `Popen[bytes]`  - the process.
+    - force: `bool`         - kill instead of asking them to exit.
+    """
+    if proc.poll() is not None:
+        return
+    try:
+        if WINDOWS:
+            subprocess.run(
+                ["taskkill", "/F", "/T", "/PID", str(proc.pid)],
+                stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL,
+                creationflags=subprocess.CREATE_NO_WINDOW
+            )
+        elif os.getpgid(proc.pid) == proc.pid:
+            os.killpg(proc.pid, signal.SIGKILL if force else signal.SIGTERM)
+        elif force:
+            proc.kill()
+        else:
+            proc.terminate()
+    except OSError:
+        pass
+
+
+class ProcessRun:
+    """
+    Output of a process, read by daemon threads into an `OutputBuffer`.
+
+    Whichever of stdout and stderr are pipes are read line by line. When
+    both reach EOF, an exit line with the return code is appended.
+    """
+    def __init__(
+        self, name: str, proc: "subprocess.Popen[bytes]",
+        on_output: Optional[Callable[["ProcessRun"], Any]] = None, maxlen: int = 5000,
+        sinks: Sequence[Callable[[str, str], Any]] = ()
+    ) -> None:
+        """
+        - name: `str`                           - shown in the output view.
+        - proc: `Popen[bytes]`                  - the process.
+        - on_output: `Optional[(ProcessRun) -> Any]`
+                                                - called in reader threads
+                                                  when unread output arrives.
+        - maxlen: `int`                         - lines kept in the buffer.
+        - sinks: `Sequence[(str, str) -> Any]`  - also called in reader
+                                                  threads with every
+                                                  `(stream, text)`.
+        """
+        self.name = name
+        self.proc = proc
+        self.on_output = on_output
+        self.sinks = list(sinks)
+        self.buffer = OutputBuffer(maxlen)
+        self.started = time.time()
+        self.returncode: Optional[int] = None
+        self._lock = Lock()
+        pipes = [(s, p) for s, p in (("out", proc.stdout), ("err", proc.stderr)) if p is not None]
+        self._readers = len(pipes)
+        for stream, pipe in pipes:
+            Thread(target=self._read, args=(stream, pipe), daemon=True).start()
+        if not pipes:
+            Thread(target=self._finish, daemon=True).start()
+
+    @property
+    def running(self) -> bool:
+        return self.returncode is None
+
+    def _emit(self, stream: str, text: str) -> None:
+        for sink in self.sinks:
+            sink(stream, text)
+        if self.buffer.append(stream, text) and self.on_output is not None:
+            self.on_output(self)
+
+    def _read(self, stream: str, pipe: IO[bytes]) -> None:
+        try:
+            # bounded reads, a line without newline does not grow forever
+            for data in iter(partial(pipe.readline, MAX_LINE), b""):
+                self._emit(stream, _decode(data))
+        except (OSError, ValueError):
+            pass
+        finally:
+            pipe.close()
+            with self._lock:
+                self._readers -= 1
+                last = not self._readers
+            if last:
+                self._finish()
+
+    def _finish(self) -> None:
+        code = self.proc.wait()
+        self.returncode = code
+        self._emit("meta", f"[进程已退出，返回值 {code}]")
+
+    def stop(self, force: bool = False) -> None:
+        terminate_tree(self.proc, force)
@@ -0,0 +1,178 @@
+from pathlib import Path
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Set, Tuple, Union
+
+from nonebot_desktop_tk import instrument
+from nonebot_desktop_tk.storage import atomic_write
+
+if TYPE_CHECKING:
+    from tomlkit import TOMLDocument
+
+# (operation, key, value), replayed if the file is changed by others
+Op = Tuple[str, str, Any]
+
+
+def _stamp(fp: Path) -> Optional[Tuple[int, int]]:
+    try:
+        st = fp.stat()
+    except OSError:
+        return None
+    return st.st_mtime_ns, st.st_size
+
+
+class ProjectConfig:
+    """
+    `[tool.nonebot]` of a project's `pyproject.toml`, parsed once and kept
+    in memory.
+
+    The file is parsed again only when its mtime or size changes. Enabled
+    plugins, builtin plugins and adapters are kept as sets for O(1) queries.
+    Mutations are applied in memory and written back atomically by `flush`,
+    so a burst of toggles costs a single write.
+    """
+    _instances: Dict[str, "ProjectConfig"] = {}
+    _instances_lock = Lock()
+
+    def __init__(self, root: Union[str, Path], encoding: str = "utf-8") -> None:
+        self.file = Path(root) / "pyproject.toml"
+        self.encoding = encoding
+        self.lock = Lock()
+        self.doc: Optional["TOMLDocument"] = None
+        self.stamp: Optional[Tuple[int, int]] = None
+        self.pending: List[Op] = []
+        self.plugins: Set[str] = set()
+        self.builtin_plugins: Set[str] = set()
+        self.adapters: Set[str] = set()
+        # requirements declared in `[project]` or `[tool.poetry]`
+        self.dependencies: List[str] = []
+
+    @classmethod
+    def of(cls, root: Union[str, Path]) -> "ProjectConfig":
+        """Get the shared config of a project."""
+        key = str(Path(root).resolve())
+        with cls._instances_lock:
+            if key not in cls._instances:
+                cls._instances[key] = cls(key)
+            return cls._instances[key]
+
+    @classmethod
+    def flush_all(cls) -> None:
+        """Write back all configs with pending changes."""
+        with cls._instances_lock:
+            confs = list(cls._instances.values())
+        for conf in confs:
+            conf.flush()
+
+    def _parse(self) -> None:
+        import tomlkit
+        with instrument.span("ProjectConfig.parse", file=str(self.file)):
+            stamp = _stamp(self.file)
+            self.doc = None if stamp is None else tomlkit.parse(self.file.read_text(encoding=self.encoding))
+            self.stamp = stamp
+            for op in self.pending:
+                self._apply(op)
+            self._index()
+
+    def _table(self) -> Dict[str, Any]:
+        assert self.doc is not None
+        return self.doc.setdefault("tool", {}).setdefault("nonebot", {})
+
+    def _index(self) -> None:
+        table = self._table() if self.doc is not None else {}
+        self.plugins = set(table.get("plugins", ()))
+        self.builtin_plugins = set(table.get("builtin_plugins", ()))
+        self.adapters = {a["module_name"] for a in table.get("adapters", ())}
+        doc: Dict[str, Any] = self.doc if self.doc is not None else {}
+        deps = [str(d) for d in doc.get("project", {}).get("dependencies", ())]
+        deps += [str(k) for k in doc.get("tool", {}).get("poetry", {}).get("dependencies", {}) if k != "python"]
+        self.dependencies = deps
+
+    def _apply(self, op: Op) -> None:
+        import tomlkit
+        action, key, value = op
+        if self.doc is None:
+            return
+        items: List[Any] = self._table().setdefault(key, [])
+        if key == "adapters":
+            idx = next((i for i, a in enumerate(items) if a["module_name"] == value["module_name"]), None)
+            if action == "add" and idx is None:
+                t = tomlkit.inline_table()
+                t.update(value)
+                items.append(t)
+            elif action == "remove" and idx is not None:
+                del items[idx]
+        elif action == "add" and value not in items:
+            items.append(value)
+        elif action == "remove" and value in items:
+            items.remove(value)
+
+    def _refresh(self) -> None:
+        # caller holds the lock
+        if self.doc is None or _stamp(self.file) != self.stamp:
+            self._parse()
+
+    @property
+    def exists(self) -> bool:
+        with self.lock:
+            self._refresh()
+            return self.doc is not None
+
+    def require(self) -> "ProjectConfig":
+        """Bring the model up to date, raising if there is no config file."""
+        if not self.exists:
+            raise RuntimeError("Config file not found!")
+        return self
+
+    def _mutate(self, action: str, key: str, value: Any) -> None:
+        with self.lock:
+            self._refresh()
+            if self.doc is None:
+                raise RuntimeError("Config file not found!")
+            op = (action, key, value)
+            self.pending.append(op)
+            self._apply(op)
+            self._index()
+
+    def add_plugin(self, plugin: str) -> None:
+        self._mutate("add", "plugins", plugin)
+
+    def remove_plugin(self, plugin: str) -> None:
+        self._mutate("remove", "plugins", plugin)
+
+    def add_builtin_plugin(self, plugin: str) -> None:
+        self._mutate("add", "builtin_plugins", plugin)
+
+    def remove_builtin_plugin(self, plugin: str) -> None:
+        self._mutate("remove", "builtin_plugins", plugin)
+
+    def add_adapter(self, adapter: Dict[str, str]) -> None:
+        """
+        - adapter: `Dict[str, str]` - `name` and `module_name` of an adapter.
+        """
+        self._mutate("add", "adapters", dict(adapter))
+
+    def remove_adapter(self, adapter: Dict[str, str]) -> None:
+        self._mutate("remove", "adapters", dict(adapter))
+
+    @property
+    def dirty(self) -> bool:
+        return bool(self.pending)
+
+    def flush(self) -> None:
+        """Write pending changes back atomically, merged with changes by others."""
+        import tomlkit
+        with self.lock:
+            if not self.pending:
+                return
+            if _stamp(self.file) != self.stamp:
+                # edited elsewhere, replay our changes on the new content
+                self._parse()
+            if self.doc is None:
+                print(f"[ProjectConfig] {self.file} disappeared, dropping {len(self.pending)} changes")
+                self.pending.clear()
+                return
+            with instrument.span("ProjectConfig.flush", file=str(self.file), ops=len(self.pending)):
+                atomic_write(self.file, tomlkit.dumps(self.doc), self.encoding)
+            self.pending.clear()
+            self.stamp = _stamp(self.file)
+            print(f"[ProjectConfig] Saved {self.file}")
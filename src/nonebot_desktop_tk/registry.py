@@ -0,0 +1,225 @@
+import gzip
+import json
+import os
+from threading import Lock, Thread
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterable, List, Optional, Set, Tuple
+
+from nonebot_desktop_tk.storage import atomic_write, user_cache_dir
+
+if TYPE_CHECKING:
+    from nb_cli.config import Adapter, Driver
+
+SNAPSHOT_VERSION = 1
+REGISTRY_NAMES = ("drivers", "adapters", "plugins")
+REGISTRY_URL_ENV = "NBDESKTOP_REGISTRY_URL"
+"""Environment variable overriding registry url, like `http://127.0.0.1:8000/{name}.json`."""
+
+READY = "ready"
+LOADING = "loading"
+FAILED = "failed"
+
+
+def registry_urls(name: str) -> List[str]:
+    """Get urls of a registry, the same as `nb_cli` uses."""
+    if override := os.environ.get(REGISTRY_URL_ENV):
+        return [override.format(name=name)]
+    return [
+        f"https://v2.nonebot.dev/{name}.json",
+        f"https://raw.fastgit.org/nonebot/nonebot2/master/website/static/{name}.json",
+        f"https://cdn.jsdelivr.net/gh/nonebot/nonebot2/website/static/{name}.json",
+    ]
+
+
+class RegistrySnapshot:
+    """
+    A registry (`drivers`, `adapters` or `plugins`) persisted as gzipped
+    JSON, refreshed with `If-None-Match` / `If-Modified-Since`.
+    """
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.path = user_cache_dir("registry") / f"{name}.json.gz"
+        self.lock = Lock()
+        self.data: Optional[List[Dict[str, Any]]] = None
+        self.url: Optional[str] = None
+        self.etag: Optional[str] = None
+        self.last_modified: Optional[str] = None
+        self.fetched_at = 0.0
+        self._loaded = False
+
+    def load(self) -> Optional[List[Dict[str, Any]]]:
+        """Load the snapshot from disk (only once)."""
+        with self.lock:
+            if not self._loaded:
+                self._loaded = True
+                try:
+                    with gzip.open(self.path, "rt", encoding="utf-8") as f:
+                        snap = json.load(f)
+                    if snap.get("version") == SNAPSHOT_VERSION:
+                        self.data = snap["data"]
+                        self.url = snap.get("url")
+                        self.etag = snap.get("etag")
+                        self.last_modified = snap.get("last_modified")
+                        self.fetched_at = snap.get("fetched_at", 0.0)
+                except (OSError, ValueError, KeyError):
+                    pass
+            return self.data
+
+    def _save(self) -> None:
+        snap = {
+            "version": SNAPSHOT_VERSION,
+            "url": self.url,
+            "etag": self.etag,
+            "last_modified": self.last_modified,
+            "fetched_at": self.fetched_at,
+            "data": self.data,
+        }
+        raw = json.dumps(snap, ensure_ascii=False, separators=(",", ":")).encode("utf-8")
+        try:
+            atomic_write(self.path, gzip.compress(raw))
+        except OSError as e:
+            print(f"[RegistrySnapshot] Cannot save {self.name}: {e!r}")
+
+    def refresh(self, timeout: float = 10.0) -> bool:
+        """
+        Fetch the registry if it has changed.
+
+        - timeout: `float`  - timeout for each request.
+
+        - return: `bool`    - whether the data has changed.
+        """
+        import httpx
+        self.load()
+        urls = registry_urls(self.name)
+        if self.url in urls:
+            # validators are only meaningful for the url issuing them
+            urls.remove(self.url)  # type: ignore
+            urls.insert(0, self.url)  # type: ignore
+        exceptions: List[Exception] = []
+        for url in urls:
+            headers: Dict[str, str] = {}
+            if url == self.url and self.data is not None:
+                if self.etag:
+                    headers["If-None-Match"] = self.etag
+                if self.last_modified:
+                    headers["If-Modified-Since"] = self.last_modified
+            try:
+                resp = httpx.get(url, headers=headers, timeout=timeout, follow_redirects=True)
+                if resp.status_code == 304:
+                    with self.lock:
+                        self.fetched_at = time.time()
+                        self._save()
+                    return False
+                resp.raise_for_status()
+                data = resp.json()
+                if not isinstance(data, list):
+                    raise ValueError(f"unexpected registry data from {url}")
+            except Exception as e:
+                exceptions.append(e)
+                continue
+            with self.lock:
+                changed = data != self.data
+                self.data = data
+                self.url = url
+                self.etag = resp.headers.get("ETag")
+                self.last_modified = resp.headers.get("Last-Modified")
+                self.fetched_at = time.time()
+                self._save()
+            return changed
+        raise Exception(f"Failed to refresh {self.name}", exceptions)
+
+
+class Registry:
+    """
+    Registries used by the GUI, loaded lazily from local snapshots.
+
+    Stale snapshots are served immediately; `refresh_in_background` fetches
+    changes and reports changed registries, and failed first fetches, to
+    listeners. Nothing here blocks on the network.
+    """
+    def __init__(self) -> None:
+        self.snapshots = {name: RegistrySnapshot(name) for name in REGISTRY_NAMES}
+        self.listeners: List[Callable[[str], Any]] = []
+        self.errors: Dict[str, str] = {}
+        self._models: Dict[str, Tuple[int, List[Any]]] = {}
+        self._refreshing: Set[str] = set()
+        self._lock = Lock()
+
+    def status(self, name: str) -> str:
+        """`READY` if data is available, otherwise `LOADING` or `FAILED`."""
+        if self.snapshots[name].load() is not None:
+            return READY
+        with self._lock:
+            if name in self._refreshing:
+                return LOADING
+        return FAILED if name in self.errors else LOADING
+
+    def get(self, name: str) -> List[Dict[str, Any]]:
+        """
+        Get a registry. Without a snapshot, it is fetched in background and
+        an empty list is returned until listeners are told.
+        """
+        snap = self.snapshots[name]
+        if snap.load() is None:
+            self.refresh_in_background((name,))
+        return snap.data or []
+
+    def _get_models(self, name: str, model: Callable[[Dict[str, Any]], Any]) -> List[Any]:
+        data = self.get(name)
+        if not data:
+            return []
+        cached = self._models.get(name)
+        if cached is None or cached[0] != id(data):
+            cached = self._models[name] = (id(data), [model(item) for item in data])
+        return cached[1]
+
+    @property
+    def drivers(self) -> List["Driver"]:
+        from nonebot_desktop_wing import lazylib
+        return self._get_models("drivers", lazylib.nb_cli.config.Driver.parse_obj)
+
+    @property
+    def adapters(self) -> List["Adapter"]:
+        from nonebot_desktop_wing import lazylib
+        return self._get_models("adapters", lazylib.nb_cli.config.Adapter.parse_obj)
+
+    @property
+    def raw_plugins(self) -> List[Dict[str, Any]]:
+        return self.get("plugins")
+
+    def refresh_in_background(self, names: Iterable[str] = REGISTRY_NAMES) -> Optional[Thread]:
+        """Fetch registries in a thread, skipping those being fetched already."""
+        with self._lock:
+            todo = [name for name in names if name not in self._refreshing]
+            self._refreshing.update(todo)
+        if not todo:
+            return None
+
+        def _work():
+            for name in todo:
+                snap = self.snapshots[name]
+                try:
+                    changed = snap.refresh()
+                except Exception as e:
+                    print(f"[Registry] Refresh {name} failed: {e!r}")
+                    # the last url tried tells most
+                    causes = e.args[1] if len(e.args) > 1 and isinstance(e.args[1], list) else [e]
+                    self.errors[name] = f"{type(causes[-1]).__name__}: {causes[-1]}" if causes else repr(e)
+                    # windows waiting for the first fetch show the failure
+                    changed = snap.data is None
+                else:
+                    self.errors.pop(name, None)
+                    print(f"[Registry] Refreshed {name}, changed: {changed}")
+                finally:
+                    with self._lock:
+                        self._refreshing.discard(name)
+                if changed:
+                    for listener in list(self.listeners):
+                        listener(name)
+
+        th = Thread(target=_work, daemon=True)
+        th.start()
+        return th
+
+
+registry = Registry()
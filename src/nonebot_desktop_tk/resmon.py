@@ -0,0 +1,200 @@
+from collections import deque
+import os
+from pathlib import Path
+from threading import Condition, Thread
+import time
+from typing import Any, Callable, Deque, Dict, Hashable, List, NamedTuple, Optional, Tuple
+
+PROC = Path("/proc")
+SUPPORTED = PROC.is_dir()
+CLK_TCK = os.sysconf("SC_CLK_TCK") if SUPPORTED else 100
+PAGE_SIZE = os.sysconf("SC_PAGE_SIZE") if SUPPORTED else 4096
+
+METRICS = ("cpu", "rss", "threads", "fds")
+
+
+class Sample(NamedTuple):
+    """Resources used by a process tree at a moment."""
+    time: float
+    cpu: float  # cores, 1.0 for a fully used core
+    rss: int  # bytes
+    threads: int
+    fds: int
+    procs: int
+
+
+def _children(pid: int) -> List[int]:
+    res: List[int] = []
+    try:
+        for task in (PROC / str(pid) / "task").iterdir():
+            res.extend(int(c) for c in (task / "children").read_text().split())
+    except OSError:
+        pass
+    return res
+
+
+def _stat(pid: int) -> Optional[Tuple[int, int, int]]:
+    # (cpu ticks, threads, rss pages)
+    try:
+        raw = (PROC / str(pid) / "stat").read_text()
+    except OSError:
+        return None
+    # the command name may contain spaces and parentheses
+    fields = raw[raw.rfind(")") + 2:].split()
+    return int(fields[11]) + int(fields[12]), int(fields[17]), int(fields[21])
+
+
+def _fds(pid: int) -> int:
+    try:
+        return len(os.listdir(PROC / str(pid) / "fd"))
+    except OSError:
+        return 0
+
+
+def read_tree(pid: int) -> Optional[Tuple[int, int, int, int, int]]:
+    """
+    Read `/proc` for a process and all its descendants.
+
+    - pid: `int`    - the root process.
+
+    - return: `Optional[(int, int, int, int, int)]`
+                    - cpu ticks, threads, rss bytes, open fds and process
+                      count, or `None` if the root process is gone.
+    """
+    ticks = threads = rss = fds = procs = 0
+    stack = [pid]
+    while stack:
+        p = stack.pop()
+        st = _stat(p)
+        if st is None:
+            if p == pid:
+                return None
+            continue
+        ticks += st[0]
+        threads += st[1]
+        rss += st[2] * PAGE_SIZE
+        fds += _fds(p)
+        procs += 1
+        stack.extend(_children(p))
+    return ticks, threads, rss, fds, procs
+
+
+class Metrics:
+    """Fixed-size history of samples of a process tree."""
+    def __init__(self, size: int = 60) -> None:
+        self.series: Dict[str, Deque[float]] = {m: deque(maxlen=size) for m in METRICS}
+        self.last: Optional[Sample] = None
+
+    def add(self, sample: Sample) -> None:
+        self.last = sample
+        for m in METRICS:
+            self.series[m].append(getattr(sample, m))
+
+
+class AlertRules(NamedTuple):
+    """
+    Thresholds checked on every sample.
+
+    - cpu: `float`              - cores regarded as pegged.
+    - cpu_samples: `int`        - consecutive pegged samples to alert.
+    - rss_growth: `float`       - growth ratio over a full history to
+                                  alert, so growth at startup is ignored.
+    - rss_min_growth: `int`     - bytes, smaller growths are ignored.
+    """
+    cpu: float = 0.9
+    cpu_samples: int = 5
+    rss_growth: float = 1.5
+    rss_min_growth: int = 64 << 20
+
+
+def check_alerts(metrics: Metrics, rules: AlertRules) -> List[Tuple[str, str]]:
+    """Get `(kind, message)` of thresholds exceeded by the latest samples."""
+    res: List[Tuple[str, str]] = []
+    cpu = list(metrics.series["cpu"])[-rules.cpu_samples:]
+    if len(cpu) == rules.cpu_samples and min(cpu) >= rules.cpu:
+        res.append(("cpu", f"CPU 占用持续高于 {rules.cpu:.0%}"))
+    rss = metrics.series["rss"]
+    if len(rss) == rss.maxlen:
+        low, cur = min(rss), rss[-1]
+        if cur >= low * rules.rss_growth and cur - low >= rules.rss_min_growth:
+            res.append(("rss", f"内存占用从 {low / (1 << 20):.0f} MiB 增长到 {cur / (1 << 20):.0f} MiB"))
+    return res
+
+
+class ResourceMonitor:
+    """
+    Sample resources of watched process trees on a background thread.
+
+    The thread sleeps while nothing is watched. Its own CPU time is
+    measured; the interval is doubled (up to `max_interval`) whenever
+    sampling costs more than `budget` of one core.
+    """
+    def __init__(
+        self, on_samples: Callable[[Dict[Hashable, Optional[Sample]]], Any],
+        interval: float = 2.0, max_interval: float = 30.0, budget: float = 0.01
+    ) -> None:
+        """
+        - on_samples: `(Dict[Hashable, Optional[Sample]]) -> Any`
+                                    - called in the worker thread with new
+                                      samples by keys, `None` for a tree
+                                      whose root is gone.
+        - interval: `float`         - seconds between samples.
+        - max_interval: `float`     - upper bound of backed off interval.
+        - budget: `float`           - allowed share of one core.
+        """
+        self.on_samples = on_samples
+        self.interval = interval
+        self.max_interval = max_interval
+        self.budget = budget
+        self.overhead = 0.0
+        self._targets: Dict[Hashable, int] = {}
+        self._prev: Dict[Hashable, Tuple[float, int]] = {}
+        self._cond = Condition()
+        self._thread: Optional[Thread] = None
+
+    def watch(self, key: Hashable, pid: int) -> None:
+        if not SUPPORTED:
+            return
+        with self._cond:
+            self._targets[key] = pid
+            self._prev.pop(key, None)
+            if self._thread is None:
+                self._thread = Thread(target=self._run, daemon=True)
+                self._thread.start()
+            self._cond.notify()
+
+    def unwatch(self, key: Hashable) -> None:
+        with self._cond:
+            self._targets.pop(key, None)
+            self._prev.pop(key, None)
+
+    def _run(self) -> None:
+        while True:
+            with self._cond:
+                while not self._targets:
+                    self._cond.wait()
+                targets = dict(self._targets)
+            cost_start = time.thread_time()
+            samples = {key: self._sample(key, pid) for key, pid in targets.items()}
+            cost = time.thread_time() - cost_start
+            self.overhead = cost / self.interval
+            if self.overhead > self.budget and self.interval < self.max_interval:
+                self.interval = min(self.interval * 2, self.max_interval)
+                print(f"[ResourceMonitor] Sampling costs {cost * 1000:.1f}ms, interval set to {self.interval}s")
+            self.on_samples(samples)
+            with self._cond:
+                self._cond.wait(self.interval)
+
+    def _sample(self, key: Hashable, pid: int) -> Optional[Sample]:
+        now = time.monotonic()
+        tree = read_tree(pid)
+        if tree is None:
+            return None
+        ticks, threads, rss, fds, procs = tree
+        prev = self._prev.get(key)
+        self._prev[key] = now, ticks
+        cpu = 0.0
+        if prev is not None and now > prev[0]:
+            # ticks of exited children are lost, never go negative
+            cpu = max(ticks - prev[1], 0) / CLK_TCK / (now - prev[0])
+        return Sample(time.time(), cpu, rss, threads, fds, procs)
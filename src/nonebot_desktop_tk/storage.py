@@ -0,0 +1,88 @@
+import json
+import os
+from pathlib import Path
+import sys
+from tempfile import mkstemp
+from typing import Any, Union
+
+APPNAME = "nonebot-desktop"
+
+
+def user_cache_dir(*sub: str) -> Path:
+    """
+    Get (and create) a directory for caches of this application.
+
+    - *sub: `str`       - sub directories to be joined.
+
+    - return: `Path`    - the directory.
+    """
+    if sys.platform.startswith("win"):
+        base = Path(os.environ.get("LOCALAPPDATA") or Path.home() / "AppData" / "Local") / APPNAME / "Cache"
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Caches" / APPNAME
+    else:
+        base = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache") / APPNAME
+    p = base.joinpath(*sub)
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+def user_data_dir(*sub: str) -> Path:
+    """
+    Get (and create) a directory for data of this application, which should
+    not be removed like caches.
+
+    - *sub: `str`       - sub directories to be joined.
+
+    - return: `Path`    - the directory.
+    """
+    if sys.platform.startswith("win"):
+        base = Path(os.environ.get("APPDATA") or Path.home() / "AppData" / "Roaming") / APPNAME
+    elif sys.platform == "darwin":
+        base = Path.home() / "Library" / "Application Support" / APPNAME
+    else:
+        base = Path(os.environ.get("XDG_DATA_HOME") or Path.home() / ".local" / "share") / APPNAME
+    p = base.joinpath(*sub)
+    p.mkdir(parents=True, exist_ok=True)
+    return p
+
+
+def atomic_write(fp: Union[str, Path], data: Union[str, bytes], encoding: str = "utf-8") -> None:
+    """
+    Write a file atomically, by writing a temp file and renaming it. The
+    mode of an existing file is kept.
+
+    - fp: `Union[str, Path]`        - target file.
+    - data: `Union[str, bytes]`     - content to be written.
+    - encoding: `str`               - encoding used if `data` is `str`.
+    """
+    pfp = Path(fp)
+    fd, tmp = mkstemp(prefix=f".{pfp.name}.", suffix=".tmp", dir=pfp.parent)
+    try:
+        with open(fd, "wb") as f:
+            f.write(data.encode(encoding) if isinstance(data, str) else data)
+        try:
+            os.chmod(tmp, pfp.stat().st_mode & 0o7777)
+        except FileNotFoundError:
+            pass
+        os.replace(tmp, pfp)
+    except BaseException:
+        try:
+            os.remove(tmp)
+        except OSError:
+            pass
+        raise
+
+
+def load_json(fp: Union[str, Path], default: Any = None) -> Any:
+    """Load a JSON file, returning `default` if it is missing or broken."""
+    try:
+        with open(fp, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return default
+
+
+def dump_json(fp: Union[str, Path], obj: Any) -> None:
+    """Dump an object to a JSON file atomically."""
+    atomic_write(fp, json.dumps(obj, ensure_ascii=False, separators=(",", ":")))
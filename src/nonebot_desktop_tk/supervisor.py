@@ -0,0 +1,73 @@
+from functools import partial
+from subprocess import Popen
+from threading import Lock, Thread
+import time
+from typing import Any, Callable, Dict, Optional
+
+from nonebot_desktop_tk import instrument
+from nonebot_desktop_tk.procrunner import terminate_tree
+from nonebot_desktop_tk.uiqueue import UIQueue
+
+ExitCallback = Callable[[Optional[int], Optional[BaseException]], Any]
+
+
+class ProcessSupervisor:
+    """
+    Own processes spawned by the GUI and report their exits to Tk.
+
+    Each process is waited on by a blocking `wait()` in a daemon thread, so
+    no CPU time is spent while it is alive. Exit events are dispatched on
+    the Tk main loop through the shared `UIQueue`.
+    """
+    def __init__(self, uiqueue: UIQueue) -> None:
+        """
+        - uiqueue: `UIQueue`    - queue for dispatching exit events.
+        """
+        self.uiqueue = uiqueue
+        self.procs: Dict[int, Popen] = {}
+        self._lock = Lock()
+
+    def watch(self, proc: Popen, callback: ExitCallback, name: str = "process", **args: Any) -> Popen:
+        """
+        Take ownership of a process.
+
+        - proc: `Popen`                 - the process to be supervised.
+        - callback: `ExitCallback`      - called in Tk main loop with
+                                          `(returncode, exception)` when the
+                                          process exits.
+        - name: `str`                   - span name of its lifetime in traces.
+        - **args: `Any`                 - details of the span.
+
+        - return: `Popen`               - the same process.
+        """
+        with self._lock:
+            self.procs[proc.pid] = proc
+        start = time.perf_counter()
+        Thread(target=self._wait, args=(proc, callback, name, start, args), daemon=True).start()
+        return proc
+
+    def _wait(
+        self, proc: Popen, callback: ExitCallback,
+        name: str, start: float, args: Dict[str, Any]
+    ) -> None:
+        code: Optional[int] = None
+        exc: Optional[BaseException] = None
+        try:
+            code = proc.wait()
+        except BaseException as e:
+            exc = e
+        finally:
+            with self._lock:
+                self.procs.pop(proc.pid, None)
+            instrument.complete(name, start, returncode=code, **args)
+            self.uiqueue.post(partial(callback, code, exc))
+
+    @property
+    def running(self) -> bool:
+        return bool(self.procs)
+
+    def terminate_all(self) -> None:
+        with self._lock:
+            procs = list(self.procs.values())
+        for p in procs:
+            terminate_tree(p)
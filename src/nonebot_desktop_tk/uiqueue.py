@@ -0,0 +1,63 @@
+from collections import deque
+import tkinter as tk
+from typing import Any, Callable, Deque, Dict, Hashable, Optional, Tuple
+
+
+class UIQueue:
+    """
+    Marshal callables from worker threads to the Tk main thread.
+
+    `post` only appends to a `deque`, which is atomic and needs no lock.
+    The queue is drained by a periodic `after()` tick, so updates posted
+    within one frame are applied together; updates posted with the same key
+    in one frame are coalesced and only the latest one is applied.
+    """
+    def __init__(self, root: tk.Misc, interval: int = 16) -> None:
+        """
+        - root: `tk.Misc`   - any widget used for scheduling `after()`.
+        - interval: `int`   - frame interval in milliseconds.
+        """
+        self.root = root
+        self.interval = interval
+        self._queue: Deque[Tuple[Optional[Hashable], Callable[[], Any]]] = deque()
+        self._tick_id: Optional[str] = None
+        self._tick()
+
+    def post(self, func: Callable[[], Any], key: Optional[Hashable] = None) -> None:
+        """
+        Schedule a callable to be called in the Tk main thread.
+
+        - func: `() -> Any`             - the callable.
+        - key: `Optional[Hashable]`     - coalescing key, callables posted
+                                          with the same key in one frame are
+                                          replaced by the latest one.
+        """
+        self._queue.append((key, func))
+
+    def _tick(self) -> None:
+        self.drain()
+        try:
+            self._tick_id = self.root.after(self.interval, self._tick)
+        except (tk.TclError, RuntimeError):
+            # root is destroyed.
+            self._tick_id = None
+
+    def drain(self) -> None:
+        """Apply all pending updates now. Must be called in Tk main thread."""
+        batch: Dict[Hashable, Callable[[], Any]] = {}
+        for _ in range(len(self._queue)):
+            key, func = self._queue.popleft()
+            batch[object() if key is None else key] = func
+        for func in batch.values():
+            try:
+                func()
+            except tk.TclError:
+                # widget has been destroyed before the update is applied.
+                pass
+            except Exception as e:
+                print(f"[UIQueue] Update failed: {e!r}")
+
+    def stop(self) -> None:
+        if self._tick_id is not None:
+            self.root.after_cancel(self._tick_id)
+            self._tick_id = None
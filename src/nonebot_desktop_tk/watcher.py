@@ -0,0 +1,172 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+from threading import Event, Lock, Thread
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from nonebot_desktop_tk.distindex import (
+    META_SUFFIXES, DistDelta, DistIndex, DistRecord, diff_records, find_site_packages
+)
+
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_ONLYDIR = 0x01000000
+WATCH_MASK = IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+EVENT_HEADER = struct.Struct("iIII")
+
+_libc: Optional[ctypes.CDLL] = None
+
+
+def _get_libc() -> Optional[ctypes.CDLL]:
+    global _libc
+    if _libc is None and sys.platform.startswith("linux"):
+        try:
+            libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+            libc.inotify_init1
+            libc.inotify_add_watch
+        except (OSError, AttributeError):
+            return None
+        _libc = libc
+    return _libc
+
+
+class SitePackagesWatcher:
+    """
+    Watch `site-packages` of a project venv and report distribution changes.
+
+    Uses inotify on Linux and falls back to polling directory mtimes
+    elsewhere. Changes are collected until the directory is quiet for
+    `settle` seconds, then the `DistIndex` is updated incrementally and
+    the delta is passed to `on_delta` in the watcher thread.
+    """
+    def __init__(
+        self, index: DistIndex, on_delta: Callable[[DistDelta], Any],
+        settle: float = 1.0, poll_interval: float = 3.0
+    ) -> None:
+        """
+        - index: `DistIndex`                    - index of the project venv.
+        - on_delta: `(DistDelta) -> Any`        - called with non-empty deltas.
+        - settle: `float`                       - quiet period in seconds.
+        - poll_interval: `float`                - interval of polling fallback.
+        """
+        self.index = index
+        self.on_delta = on_delta
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.known: Dict[str, DistRecord] = {}
+        self._stop = Event()
+        # the wakeup pipe is closed by the watcher thread when it ends, and
+        # only written or closed under the lock, so a reused fd is never hit
+        self._pipe_lock = Lock()
+        self._wakeup: Optional[Tuple[int, int]] = os.pipe()
+        self._thread: Optional[Thread] = None
+
+    def start(self) -> "SitePackagesWatcher":
+        self._thread = Thread(target=self._run, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._pipe_lock:
+            if self._wakeup is not None:
+                try:
+                    os.write(self._wakeup[1], b"\0")
+                except OSError:
+                    pass
+        if self._thread is None:
+            self._close_pipe()
+
+    def _close_pipe(self) -> None:
+        with self._pipe_lock:
+            if self._wakeup is not None:
+                for fd in self._wakeup:
+                    os.close(fd)
+                self._wakeup = None
+
+    def _emit(self) -> None:
+        records: List[DistRecord] = self.index.scan()
+        delta = diff_records(self.known.values(), records)
+        self.known = {r.key: r for r in records}
+        if delta and not self._stop.is_set():
+            self.on_delta(delta)
+
+    def _run(self) -> None:
+        self.known = {r.key: r for r in self.index.scan()}
+        try:
+            libc = _get_libc()
+            if libc is None or not self._run_inotify(libc):
+                self._run_polling()
+        finally:
+            self._close_pipe()
+
+    def _run_inotify(self, libc: ctypes.CDLL) -> bool:
+        # kept open until this thread closes it
+        assert self._wakeup is not None
+        wakeup = self._wakeup[0]
+        fd = libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if fd < 0:
+            return False
+        try:
+            watched = 0
+            for sp in find_site_packages(self.index.root):
+                if libc.inotify_add_watch(fd, os.fsencode(sp), WATCH_MASK) >= 0:
+                    watched += 1
+            if not watched:
+                return False
+            print(f"[SitePackagesWatcher] Watching {self.index.root} with inotify")
+            deadline: Optional[float] = None
+            while not self._stop.is_set():
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                ready, _, _ = select.select([fd, wakeup], [], [], timeout)
+                if wakeup in ready:
+                    break
+                if fd in ready and self._relevant(os.read(fd, 65536)):
+                    deadline = time.monotonic() + self.settle
+                elif deadline is not None and time.monotonic() >= deadline:
+                    deadline = None
+                    self._emit()
+            return True
+        finally:
+            os.close(fd)
+
+    @staticmethod
+    def _relevant(data: bytes) -> bool:
+        pos = 0
+        while pos + EVENT_HEADER.size <= len(data):
+            _, mask, _, namelen = EVENT_HEADER.unpack_from(data, pos)
+            pos += EVENT_HEADER.size
+            name = data[pos:pos + namelen].rstrip(b"\0").decode(errors="replace")
+            pos += namelen
+            if mask & IN_Q_OVERFLOW or name.endswith(META_SUFFIXES):
+                return True
+        return False
+
+    def _mtimes(self) -> Dict[str, int]:
+        res: Dict[str, int] = {}
+        for sp in find_site_packages(self.index.root):
+            try:
+                res[str(sp)] = sp.stat().st_mtime_ns
+            except OSError:
+                pass
+        return res
+
+    def _run_polling(self) -> None:
+        print(f"[SitePackagesWatcher] Watching {self.index.root} by polling")
+        last = self._mtimes()
+        pending = False
+        while not self._stop.wait(self.settle if pending else self.poll_interval):
+            cur = self._mtimes()
+            if cur != last:
+                last = cur
+                pending = True
+            elif pending:
+                pending = False
+                self._emit()
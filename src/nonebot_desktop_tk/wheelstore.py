@@ -0,0 +1,377 @@
+from contextlib import contextmanager
+from hashlib import sha256
+import os
+from pathlib import Path
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Any, Dict, Iterator, List, NamedTuple, Optional, Sequence, Tuple
+from urllib.parse import unquote, urlsplit
+
+from nonebot_desktop_tk.storage import dump_json, load_json, user_cache_dir, user_data_dir
+
+# a lock older than this was left by a killed process
+STALE_LOCK = 120.0
+LOCK_TIMEOUT = 60.0
+# wheels pinned by a run longer ago than this were left by a killed process
+STALE_PIN = 3600.0
+UPGRADE_FLAGS = ("-U", "--upgrade")
+# pip options taking a value as the next argument
+VALUE_OPTIONS = frozenset((
+    "-i", "--index-url", "--extra-index-url", "-f", "--find-links", "--trusted-host",
+    "--proxy", "--timeout", "--retries", "--cert", "--client-cert", "-c", "--constraint", "-r", "--requirement"
+))
+# options whose requirements are part of the resolution already
+REQUIREMENT_OPTIONS = frozenset(("-c", "--constraint", "-r", "--requirement"))
+
+
+class StoreSettings(NamedTuple):
+    """
+    - enabled: `bool`       - whether pip installs of projects go through
+                              the store; new projects always use it.
+    - max_bytes: `int`      - size cap, least recently used wheels are
+                              evicted beyond it.
+    """
+    enabled: bool = False
+    max_bytes: int = 2 << 30
+
+    @classmethod
+    def load(cls, data: Any) -> "StoreSettings":
+        if not isinstance(data, dict):
+            return cls()
+        try:
+            return cls(**{k: type(getattr(cls(), k))(v) for k, v in data.items() if k in cls._fields})
+        except (TypeError, ValueError):
+            return cls()
+
+
+class StoreStats(NamedTuple):
+    files: int
+    blobs: int
+    size: int  # bytes of distinct contents
+    hits: int
+    misses: int
+    saved: int  # bytes not downloaded thanks to hits
+    evicted: int
+
+
+def split_options(args: Sequence[str]) -> Tuple[List[str], List[str]]:
+    """Split arguments of `pip install` into options and requirements."""
+    options: List[str] = []
+    reqs: List[str] = []
+    it = iter(args)
+    for a in it:
+        if not a.startswith("-"):
+            reqs.append(a)
+        elif a in REQUIREMENT_OPTIONS:
+            next(it, None)
+        elif a in VALUE_OPTIONS:
+            options += [a, next(it, "")]
+        elif a.split("=", 1)[0] not in REQUIREMENT_OPTIONS:
+            options.append(a)
+    return options, reqs
+
+
+def file_digest(fp: Path) -> str:
+    h = sha256()
+    with open(fp, "rb") as f:
+        while chunk := f.read(1 << 20):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def self_command() -> List[str]:
+    """Command running this application, also when it is frozen."""
+    if getattr(sys, "frozen", False):
+        return [sys.executable]
+    return [sys.executable, "-m", "nonebot_desktop_tk"]
+
+
+def runner_command(mode: str, pyexec: str, args: Sequence[str]) -> List[str]:
+    """
+    Command running pip of a project through the store, in a process of
+    this application.
+
+    - mode: `str`               - `fetch` only fills the store, `install`
+                                  also installs from it.
+    - pyexec: `str`             - Python of the project, so wheels match
+                                  its platform.
+    - args: `Sequence[str]`     - arguments of `pip install`.
+
+    - return: `List[str]`       - the command.
+    """
+    return [*self_command(), "--wheel-store", mode, pyexec, *args]
+
+
+class WheelStore:
+    """
+    Wheels shared by all projects, kept once by content.
+
+    Contents are stored under `blobs/` by their SHA-256, and linked into
+    `wheels/` by file name for `pip --find-links`. The index records the
+    last use of every file, the least recently used ones are evicted when
+    the store grows beyond the cap. Several processes may use the store at
+    once, so changes are made under a lock file.
+    """
+    _default: Optional["WheelStore"] = None
+
+    def __init__(self, root: Path, settings_file: Path) -> None:
+        self.root = root
+        self.blobs = root / "blobs"
+        self.links = root / "wheels"
+        self.indexfile = root / "index.json"
+        self.lockfile = root / ".lock"
+        self.settings_file = settings_file
+        self.blobs.mkdir(parents=True, exist_ok=True)
+        self.links.mkdir(parents=True, exist_ok=True)
+
+    @classmethod
+    def default(cls) -> "WheelStore":
+        if cls._default is None:
+            cls._default = cls(user_cache_dir("wheelstore"), user_data_dir() / "wheelstore.json")
+        return cls._default
+
+    @property
+    def settings(self) -> StoreSettings:
+        return StoreSettings.load(load_json(self.settings_file, {}))
+
+    @settings.setter
+    def settings(self, value: StoreSettings) -> None:
+        dump_json(self.settings_file, value._asdict())
+
+    @contextmanager
+    def _locked(self) -> Iterator[None]:
+        deadline = time.monotonic() + LOCK_TIMEOUT
+        while True:
+            try:
+                os.close(os.open(self.lockfile, os.O_CREAT | os.O_EXCL | os.O_WRONLY))
+                break
+            except FileExistsError:
+                try:
+                    if time.time() - self.lockfile.stat().st_mtime > STALE_LOCK:
+                        self.lockfile.unlink()
+                        continue
+                except OSError:
+                    continue
+                if time.monotonic() > deadline:
+                    raise TimeoutError(f"Wheel store is locked: {self.lockfile}")
+                time.sleep(0.05)
+        try:
+            yield
+        finally:
+            try:
+                self.lockfile.unlink()
+            except OSError:
+                pass
+
+    def _load(self) -> Dict[str, Any]:
+        data = load_json(self.indexfile, {})
+        if not isinstance(data, dict):
+            data = {}
+        data.setdefault("files", {})
+        # run -> {"digests": [...], "time": ...}, never evicted while pinned
+        data.setdefault("pins", {})
+        for k in ("hits", "misses", "saved", "evicted"):
+            data.setdefault(k, 0)
+        return data
+
+    def _blob(self, digest: str) -> Path:
+        return self.blobs / digest[:2] / digest
+
+    def _link(self, blob: Path, name: str) -> None:
+        link = self.links / name
+        tmp = self.links / f".{name}.tmp"
+        try:
+            os.link(blob, tmp)
+        except OSError:
+            # file systems without hard links get a copy
+            shutil.copyfile(blob, tmp)
+        os.replace(tmp, link)
+
+    def ingest(self, incoming: Path, pin: Optional[str] = None) -> Tuple[int, int, int]:
+        """
+        Move wheels fetched by pip into the store. Wheels which were already
+        stored count as hits, as pip took them from the store.
+
+        - incoming: `Path`          - directory given to `pip wheel`.
+        - pin: `Optional[str]`      - a name of the run, which keeps its
+                                      wheels from eviction until `unpin`.
+
+        - return: `(int, int, int)` - hits, misses and bytes saved.
+        """
+        hits = misses = saved = 0
+        now = time.time()
+        with self._locked():
+            data = self._load()
+            files: Dict[str, Dict[str, Any]] = data["files"]
+            digests: List[str] = []
+            for fp in sorted(incoming.glob("*.whl")):
+                digest = file_digest(fp)
+                digests.append(digest)
+                size = fp.stat().st_size
+                entry = files.get(fp.name)
+                if entry is not None and entry["sha256"] == digest and (self.links / fp.name).is_file():
+                    hits += 1
+                    saved += size
+                    entry["used"] = now
+                    continue
+                misses += 1
+                blob = self._blob(digest)
+                if not blob.is_file():
+                    blob.parent.mkdir(exist_ok=True)
+                    shutil.move(str(fp), str(blob))
+                self._link(blob, fp.name)
+                files[fp.name] = {"sha256": digest, "size": size, "used": now}
+            data["hits"] += hits
+            data["misses"] += misses
+            data["saved"] += saved
+            if pin is not None:
+                data["pins"][pin] = {"digests": digests, "time": now}
+            self._evict(data, self.settings.max_bytes)
+            dump_json(self.indexfile, data)
+        return hits, misses, saved
+
+    def unpin(self, pin: str) -> None:
+        """Let the wheels of a finished run be evicted again."""
+        with self._locked():
+            data = self._load()
+            data["pins"].pop(pin, None)
+            self._evict(data, self.settings.max_bytes)
+            dump_json(self.indexfile, data)
+
+    def _evict(self, data: Dict[str, Any], max_bytes: int) -> None:
+        # caller holds the lock; wheels pinned by running installs stay,
+        # even if the store is then beyond the cap
+        files: Dict[str, Dict[str, Any]] = data["files"]
+        pins: Dict[str, Dict[str, Any]] = data["pins"]
+        now = time.time()
+        for pin in [p for p, v in pins.items() if now - v["time"] > STALE_PIN]:
+            del pins[pin]
+        pinned = {d for v in pins.values() for d in v["digests"]}
+        sizes = {e["sha256"]: e["size"] for e in files.values()}
+        total = sum(sizes.values())
+        for name in sorted(files, key=lambda n: files[n]["used"]):
+            if total <= max_bytes:
+                break
+            if files[name]["sha256"] in pinned:
+                continue
+            digest = files.pop(name)["sha256"]
+            try:
+                (self.links / name).unlink()
+            except OSError:
+                pass
+            data["evicted"] += 1
+            # other names may share the content
+            if all(e["sha256"] != digest for e in files.values()):
+                try:
+                    self._blob(digest).unlink()
+                except OSError:
+                    pass
+                total -= sizes[digest]
+
+    def evict(self, max_bytes: Optional[int] = None) -> None:
+        with self._locked():
+            data = self._load()
+            self._evict(data, self.settings.max_bytes if max_bytes is None else max_bytes)
+            dump_json(self.indexfile, data)
+
+    def clear(self) -> None:
+        """Remove all wheels not used by running installs, keeping the counters."""
+        self.evict(0)
+
+    def stats(self) -> StoreStats:
+        data = self._load()
+        files: Dict[str, Dict[str, Any]] = data["files"]
+        sizes = {e["sha256"]: e["size"] for e in files.values()}
+        return StoreStats(
+            len(files), len(sizes), sum(sizes.values()),
+            data["hits"], data["misses"], data["saved"], data["evicted"]
+        )
+
+    def resolve(self, pyexec: str, args: Sequence[str], workdir: Path) -> Tuple[int, Optional[List[str]]]:
+        """
+        Resolve `pip install` arguments against the index, so the latest
+        matching versions are used rather than older ones in the store.
+
+        pip prefers the index over `--find-links` for equal versions, so
+        the resolved wheels already stored are given as local files, which
+        are not downloaded again.
+
+        - return: `(int, List[str] | None)` - exit code of pip, and every
+                                              package to be fetched, or
+                                              None if pip cannot report
+                                              them.
+        """
+        report = workdir / "report.json"
+        code = subprocess.call([
+            pyexec, "-m", "pip", "install", "--dry-run", "--ignore-installed", "--quiet", "--report", str(report),
+            "--find-links", str(self.links), *args
+        ])
+        if code == 2:
+            # pip older than 22.2 has no `--report`
+            return 0, None
+        if code:
+            return code, None
+        try:
+            items: List[Dict[str, Any]] = load_json(report, {})["install"]
+        except (KeyError, TypeError):
+            return 0, None
+        specs: List[str] = []
+        for item in items:
+            if item.get("is_direct"):
+                return 0, None
+            name = unquote(urlsplit(item["download_info"]["url"]).path.rsplit("/", 1)[-1])
+            stored = self.links / name
+            meta = item["metadata"]
+            specs.append(str(stored) if stored.is_file() else f"{meta['name']}=={meta['version']}")
+        return 0, specs
+
+    def run(self, mode: str, pyexec: str, args: Sequence[str]) -> int:
+        """Body of `runner_command`, returns the exit code."""
+        wheel_args = [a for a in args if a not in UPGRADE_FLAGS]
+        incoming = Path(tempfile.mkdtemp(prefix=".incoming-", dir=self.root))
+        pin = f"{os.getpid()}{incoming.name}"
+        try:
+            print(f"[WheelStore] Collecting wheels, using the shared store {self.links}", flush=True)
+            code, specs = self.resolve(pyexec, wheel_args, incoming)
+            if code:
+                return code
+            cmd = [pyexec, "-m", "pip", "wheel", "--wheel-dir", str(incoming), "--find-links", str(self.links)]
+            if specs is None:
+                cmd += wheel_args
+            else:
+                cmd += ["--no-deps", *split_options(wheel_args)[0], *specs]
+            code = subprocess.call(cmd)
+            if code:
+                return code
+            # the wheels stay pinned until they are installed
+            hits, misses, saved = self.ingest(incoming, pin)
+            print(
+                f"[WheelStore] {hits} wheels from the store ({saved / (1 << 20):.1f} MiB saved), "
+                f"{misses} fetched into it", flush=True
+            )
+            shutil.rmtree(incoming, ignore_errors=True)
+            if mode != "install":
+                return 0
+            return subprocess.call([pyexec, "-m", "pip", "install", "--no-index", "--find-links", str(self.links), *args])
+        finally:
+            shutil.rmtree(incoming, ignore_errors=True)
+            try:
+                self.unpin(pin)
+            except (OSError, TimeoutError) as e:
+                # expires after `STALE_PIN`
+                print(f"[WheelStore] Cannot unpin wheels: {e}", file=sys.stderr)
+
+
+def main(argv: Sequence[str]) -> int:
+    """Entry of `--wheel-store MODE PYTHON [PIP_ARGS...]`."""
+    if len(argv) < 2 or argv[0] not in ("fetch", "install"):
+        print("usage: --wheel-store {fetch,install} PYTHON [PIP_ARGS...]", file=sys.stderr)
+        return 2
+    try:
+        return WheelStore.default().run(argv[0], argv[1], argv[2:])
+    except (OSError, TimeoutError) as e:
+        print(f"[WheelStore] {e}", file=sys.stderr)
+        return 1
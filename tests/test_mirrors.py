@@ -0,0 +1,132 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import math
+import socket
+from threading import Thread
+import time
+
+import pytest
+
+from nonebot_desktop_tk.mirrors import MirrorRanking, MirrorStat, probe_all, probe_mirror
+
+PAGE = b"<a href='nonebot2-2.0.0-py3-none-any.whl'>nonebot2-2.0.0-py3-none-any.whl</a>\n" * 64
+SLOW_DELAY = 0.3
+
+
+class IndexHandler(BaseHTTPRequestHandler):
+    def do_GET(self) -> None:
+        mirror, _, project = self.path.strip("/").partition("/")
+        if mirror == "moved":
+            self.send_response(301)
+            self.send_header("Location", f"/fast/{project}")
+            self.end_headers()
+            return
+        if mirror not in ("fast", "slow") or project != "nonebot2":
+            self.send_error(404)
+            return
+        if mirror == "slow":
+            time.sleep(SLOW_DELAY)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html")
+        self.send_header("Content-Length", str(len(PAGE)))
+        self.end_headers()
+        self.wfile.write(PAGE)
+
+    def log_message(self, *_) -> None:
+        pass
+
+
+@pytest.fixture(scope="module")
+def server():
+    httpd = ThreadingHTTPServer(("127.0.0.1", 0), IndexHandler)
+    Thread(target=httpd.serve_forever, daemon=True).start()
+    yield f"http://127.0.0.1:{httpd.server_address[1]}"
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture
+def closed_port() -> str:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        port = s.getsockname()[1]
+    return f"http://127.0.0.1:{port}/simple"
+
+
+def test_probe_fast(server):
+    stat = probe_mirror(f"{server}/fast/", timeout=2)
+    assert stat.healthy and stat.error is None
+    assert stat.latency is not None and stat.latency < SLOW_DELAY
+    assert stat.throughput is not None and stat.throughput > 0
+    assert stat.url == f"{server}/fast/"
+
+
+def test_probe_slow(server):
+    stat = probe_mirror(f"{server}/slow", timeout=2)
+    assert stat.healthy
+    assert stat.latency is not None and stat.latency >= SLOW_DELAY
+
+
+def test_probe_follows_redirects(server):
+    assert probe_mirror(f"{server}/moved", timeout=2).healthy
+
+
+def test_probe_not_found(server):
+    stat = probe_mirror(f"{server}/missing", timeout=2)
+    assert not stat.healthy
+    assert stat.error == "HTTP 404"
+    assert stat.score == math.inf
+
+
+def test_probe_closed_port(closed_port):
+    stat = probe_mirror(closed_port, timeout=2)
+    assert not stat.healthy
+    assert stat.error is not None and "ConnectionRefusedError" in stat.error
+
+
+def test_probe_timeout(server):
+    stat = probe_mirror(f"{server}/slow", timeout=SLOW_DELAY / 3)
+    assert not stat.healthy
+    assert stat.error is not None and "timed out" in stat.error
+
+
+def test_ranking(server, closed_port, tmp_path):
+    urls = [closed_port, f"{server}/slow", f"{server}/missing", f"{server}/fast"]
+    ranking = MirrorRanking(tmp_path / "mirrors.json")
+    assert ranking.best() is None
+    assert ranking.stale(urls, 3600)
+    ranking.update(probe_all(urls, timeout=2))
+    ranked = ranking.ranked()
+    assert [s.url for s in ranked[:2]] == [f"{server}/fast", f"{server}/slow"]
+    assert not any(s.healthy for s in ranked[2:])
+    assert ranking.best() == f"{server}/fast"
+    assert not ranking.stale(urls, 3600)
+    assert ranking.stale(urls, -1)
+
+
+def test_ranking_fail_and_reload(server, tmp_path):
+    fast, slow = f"{server}/fast", f"{server}/slow"
+    file = tmp_path / "mirrors.json"
+    ranking = MirrorRanking(file)
+    ranking.update([probe_mirror(fast, 2), probe_mirror(slow, 2)])
+    ranking.fail(f"{fast}/", "Max retries exceeded")
+    assert ranking.best() == slow
+    # a failure keeps the probe time, so the mirror is not probed earlier
+    assert not ranking.stale([fast], 3600)
+
+    reloaded = MirrorRanking(file)
+    assert reloaded.best() == slow
+    assert reloaded.stats[fast] == ranking.stats[fast]
+    assert reloaded.stats[fast].error == "Max retries exceeded"
+
+
+def test_ranking_ignores_bad_file(tmp_path):
+    file = tmp_path / "mirrors.json"
+    file.write_text('[{"url": "x"}, 3]', encoding="utf-8")
+    assert MirrorRanking(file).stats == {}
+
+
+def test_score_prefers_throughput():
+    now = time.time()
+    quick = MirrorStat("a", 0.05, 100.0, None, now)
+    wide = MirrorStat("b", 0.2, 10e6, None, now)
+    assert wide.score < quick.score
@@ -0,0 +1,183 @@
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import platform
+from threading import Lock, Thread
+from typing import List
+
+import pytest
+
+from nonebot_desktop_tk.distindex import DistRecord
+from nonebot_desktop_tk.outdated import IndexFile, OutdatedChecker, is_prerelease, latest_version
+
+PY = ".".join(platform.python_version_tuple()[:2])
+TOO_NEW = f">{int(platform.python_version_tuple()[0]) + 1}"
+
+# served as PEP 691 JSON
+JSON_PAGES = {
+    "alpha": [
+        {"filename": "alpha-1.0.0-py3-none-any.whl"},
+        {"filename": "alpha-1.1.0-py3-none-any.whl"},
+        {"filename": "alpha-1.2.0-py3-none-any.whl", "yanked": "broken"},
+        {"filename": "alpha-1.3.0-py3-none-any.whl", "requires-python": TOO_NEW},
+        {"filename": "alpha-2.0.0rc1-py3-none-any.whl"},
+    ],
+    "gamma": [
+        {"filename": "gamma-0.5.tar.gz"},
+        {"filename": "gamma-0.6.dev1.tar.gz"},
+    ],
+}
+# served as HTML
+HTML_PAGES = {
+    "beta-pkg": [
+        '<a href="../../files/beta_pkg-3.0-py3-none-any.whl#sha256=00">beta_pkg-3.0-py3-none-any.whl</a>',
+        '<a href="beta-pkg-3.1.tar.gz" data-requires-python="&gt;=3.6">beta-pkg-3.1.tar.gz</a>',
+        '<a href="beta-pkg-3.2.tar.gz" data-yanked="">beta-pkg-3.2.tar.gz</a>',
+        f'<a href="beta_pkg-3.3-py3-none-any.whl" data-requires-python="{TOO_NEW.replace(">", "&gt;")}">x</a>',
+        '<a href="beta_pkg-4.0b1-py3-none-any.whl">beta_pkg-4.0b1-py3-none-any.whl</a>',
+    ],
+    "torchish": [
+        '<a href="torchish-1.0+cpu-cp3-none-any.whl">torchish-1.0+cpu</a>',
+        '<a href="torchish-1.1+cpu-py3-none-any.whl">torchish-1.1+cpu</a>',
+    ],
+}
+
+
+class Server(ThreadingHTTPServer):
+    requests: List[str]
+    lock: Lock
+
+
+class IndexHandler(BaseHTTPRequestHandler):
+    server: Server
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self) -> None:
+        with self.server.lock:
+            self.server.requests.append(self.path)
+        name = self.path.strip("/").rpartition("/")[2]
+        if name in JSON_PAGES:
+            body = json.dumps({"meta": {"api-version": "1.0"}, "name": name, "files": JSON_PAGES[name]}).encode()
+            ctype = "application/vnd.pypi.simple.v1+json"
+        elif name in HTML_PAGES:
+            body = ("<html><body>\n" + "<br/>\n".join(HTML_PAGES[name]) + "\n</body></html>").encode()
+            ctype = "text/html"
+        else:
+            self.send_error(404)
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", ctype)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_) -> None:
+        pass
+
+
+@pytest.fixture
+def server():
+    httpd = Server(("127.0.0.1", 0), IndexHandler)
+    httpd.requests, httpd.lock = [], Lock()
+    Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+@pytest.fixture(autouse=True)
+def cache_home(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+
+
+def record(name: str, version: str) -> DistRecord:
+    return DistRecord(name, version, "", (), "", (0, 0))
+
+
+def index_url(server: Server) -> str:
+    return f"http://127.0.0.1:{server.server_address[1]}/simple"
+
+
+RECORDS = [
+    record("alpha", "1.0.0"),
+    record("Beta_Pkg", "3.0"),
+    record("gamma", "0.5"),
+    record("torchish", "1.0+cpu"),
+    record("missing", "1.0"),
+]
+
+
+def test_check(server):
+    checker = OutdatedChecker(index_url(server))
+    progress: List[int] = []
+    outdated, errors = checker.check(RECORDS, on_progress=lambda done, total: progress.append(done))
+    assert errors == {}
+    # yanked files, files for other Pythons and pre-releases are skipped,
+    # and a local label is not a pre-release
+    assert [(o.key, o.current, o.latest) for o in outdated] == [
+        ("alpha", "1.0.0", "1.1.0"),
+        ("beta_pkg", "3.0", "3.1"),
+        ("torchish", "1.0+cpu", "1.1+cpu"),
+    ]
+    assert progress[0] == 0 and progress[-1] == len(RECORDS)
+
+
+def test_prerelease_current(server):
+    checker = OutdatedChecker(index_url(server))
+    outdated, _ = checker.check([record("alpha", "2.0.0a1"), record("gamma", "0.6.dev0")])
+    assert {o.key: o.latest for o in outdated} == {"alpha": "2.0.0rc1", "gamma": "0.6.dev1"}
+
+
+def test_ttl_cache(server):
+    url = index_url(server)
+    checker = OutdatedChecker(url)
+    first, _ = checker.check(RECORDS)
+    assert len(server.requests) == len(RECORDS)
+
+    # fresh entries are used, also by a new checker reading the cache file
+    assert checker.check(RECORDS)[0] == first
+    assert OutdatedChecker(url).check(RECORDS)[0] == first
+    assert len(server.requests) == len(RECORDS)
+
+    # a changed installed version is queried again
+    outdated, _ = checker.check([record("alpha", "1.1.0")])
+    assert outdated == []
+    assert len(server.requests) == len(RECORDS) + 1
+
+    checker.check(RECORDS, refresh=True)
+    assert len(server.requests) == 2 * len(RECORDS) + 1
+
+    expired = OutdatedChecker(url, ttl=-1)
+    assert expired.check(RECORDS)[0] == first
+    assert len(server.requests) == 3 * len(RECORDS) + 1
+
+
+def test_errors(server):
+    server_url = index_url(server)
+    server.shutdown()
+    server.server_close()
+    checker = OutdatedChecker(server_url)
+    outdated, errors = checker.check([record("alpha", "1.0.0")])
+    assert outdated == []
+    assert list(errors) == ["alpha"]
+    # failures are not cached
+    assert checker.cached("alpha", "1.0.0") is None
+
+
+@pytest.mark.parametrize("version, pre", [
+    ("1.0", False), ("1.0+cpu", False), ("1.0.post1", False), ("1.0+dev", False), ("2!1.0-1", False),
+    ("1.0a1", True), ("1.0.0-rc.2", True), ("1.0b2+cpu", True), ("1.0.dev3", True), ("1.0.post1.dev0", True),
+    ("not a version", False),
+])
+def test_is_prerelease(version: str, pre: bool):
+    assert is_prerelease(version) is pre
+
+
+def test_latest_version_ignores_other_files():
+    files = [
+        IndexFile("alpha-9.0.zip.asc", False, None),
+        IndexFile("other-9.0.tar.gz", False, None),
+        IndexFile("alpha-1.0.tar.gz", False, None),
+        IndexFile("alpha-1.0-py3-none-any.whl", False, f">={PY}"),
+    ]
+    assert latest_version(files, "alpha") == "1.0"
+    assert latest_version([], "alpha") is None
@@ -0,0 +1,184 @@
+import gzip
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+from threading import Lock, Thread
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+import pytest
+
+from nonebot_desktop_tk.registry import (
+    FAILED, LOADING, READY, REGISTRY_URL_ENV, Registry, RegistrySnapshot, registry_urls
+)
+
+PLUGINS = [{"module_name": "nonebot_plugin_a", "project_link": "nonebot-plugin-a"}]
+PLUGINS_NEW = [*PLUGINS, {"module_name": "nonebot_plugin_b", "project_link": "nonebot-plugin-b"}]
+
+
+class Server(ThreadingHTTPServer):
+    # name -> (body, etag), or None for a broken registry
+    pages: Dict[str, Optional[Tuple[bytes, str]]]
+    requests: List[Tuple[str, Optional[str]]]
+    lock: Lock
+
+
+class RegistryHandler(BaseHTTPRequestHandler):
+    server: Server
+
+    def do_GET(self) -> None:
+        name = self.path.strip("/").rpartition(".json")[0]
+        with self.server.lock:
+            self.server.requests.append((name, self.headers.get("If-None-Match")))
+            page = self.server.pages.get(name, ...)
+        if page is ...:
+            self.send_error(404)
+            return
+        if page is None:
+            body, etag = b"<html>not json", '"broken"'
+        else:
+            body, etag = page
+            if self.headers.get("If-None-Match") == etag:
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("ETag", etag)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *_) -> None:
+        pass
+
+
+def publish(server: Server, name: str, data: Any, etag: str) -> None:
+    with server.lock:
+        server.pages[name] = (json.dumps(data).encode(), etag)
+
+
+@pytest.fixture
+def server(tmp_path, monkeypatch):
+    monkeypatch.setenv("XDG_CACHE_HOME", str(tmp_path / "cache"))
+    httpd = Server(("127.0.0.1", 0), RegistryHandler)
+    httpd.pages, httpd.requests, httpd.lock = {}, [], Lock()
+    monkeypatch.setenv(REGISTRY_URL_ENV, f"http://127.0.0.1:{httpd.server_address[1]}/{{name}}.json")
+    Thread(target=httpd.serve_forever, daemon=True).start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def stored(snap: RegistrySnapshot) -> Dict[str, Any]:
+    with gzip.open(snap.path, "rt", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def listen(reg: Registry) -> List[str]:
+    told: List[str] = []
+    reg.listeners.append(told.append)
+    return told
+
+
+def wait(reg: Registry) -> None:
+    deadline = time.monotonic() + 10
+    while reg._refreshing:
+        assert time.monotonic() < deadline
+        time.sleep(0.01)
+
+
+def refreshed(reg: Registry, name: str) -> List[str]:
+    # names told to listeners by one background refresh
+    told = listen(reg)
+    th = reg.refresh_in_background((name,))
+    assert th is not None
+    th.join(10)
+    reg.listeners.remove(told.append)
+    return told
+
+
+def test_url_override(server):
+    port = server.server_address[1]
+    assert registry_urls("plugins") == [f"http://127.0.0.1:{port}/plugins.json"]
+
+
+def test_default_urls(monkeypatch):
+    monkeypatch.delenv(REGISTRY_URL_ENV, raising=False)
+    assert registry_urls("drivers")[0] == "https://v2.nonebot.dev/drivers.json"
+
+
+def test_first_fetch(server):
+    publish(server, "plugins", PLUGINS, '"v1"')
+    reg = Registry()
+    told = listen(reg)
+    # fetched in background, without blocking
+    assert reg.get("plugins") == []
+    wait(reg)
+    assert told == ["plugins"]
+    assert reg.status("plugins") == READY
+    assert reg.get("plugins") == PLUGINS
+    snap = stored(reg.snapshots["plugins"])
+    assert snap["data"] == PLUGINS and snap["etag"] == '"v1"'
+    # a new process reads the snapshot without fetching
+    requests = len(server.requests)
+    assert Registry().get("plugins") == PLUGINS
+    assert len(server.requests) == requests
+
+
+def test_not_modified(server):
+    publish(server, "plugins", PLUGINS, '"v1"')
+    snap = RegistrySnapshot("plugins")
+    assert snap.refresh() is True
+    before = stored(snap)
+
+    reg = Registry()
+    assert refreshed(reg, "plugins") == []
+    assert server.requests[-1] == ("plugins", '"v1"')
+    after = stored(reg.snapshots["plugins"])
+    assert after["data"] == before["data"] and after["etag"] == '"v1"'
+    assert after["fetched_at"] >= before["fetched_at"]
+    assert reg.get("plugins") == PLUGINS
+
+
+def test_changed_etag(server):
+    publish(server, "plugins", PLUGINS, '"v1"')
+    reg = Registry()
+    refreshed(reg, "plugins")
+    publish(server, "plugins", PLUGINS_NEW, '"v2"')
+    assert refreshed(reg, "plugins") == ["plugins"]
+    assert server.requests[-1] == ("plugins", '"v1"')
+    assert reg.get("plugins") == PLUGINS_NEW
+    snap = stored(reg.snapshots["plugins"])
+    assert snap["data"] == PLUGINS_NEW and snap["etag"] == '"v2"'
+
+
+@pytest.mark.parametrize("broken", ["corrupt", "unreachable"])
+def test_failure_keeps_snapshot(server, monkeypatch, broken):
+    publish(server, "plugins", PLUGINS, '"v1"')
+    RegistrySnapshot("plugins").refresh()
+    if broken == "corrupt":
+        server.pages["plugins"] = None
+    else:
+        monkeypatch.setenv(REGISTRY_URL_ENV, "http://127.0.0.1:1/{name}.json")
+
+    reg = Registry()
+    assert refreshed(reg, "plugins") == []
+    assert "plugins" in reg.errors
+    assert reg.status("plugins") == READY
+    assert reg.get("plugins") == PLUGINS
+    assert stored(reg.snapshots["plugins"])["data"] == PLUGINS
+
+
+def test_first_fetch_failure(server):
+    server.pages["plugins"] = None
+    reg = Registry()
+    told = listen(reg)
+    assert reg.get("plugins") == []
+    assert reg.status("plugins") in (LOADING, FAILED)
+    wait(reg)
+    # waiting windows are told, to show the failure
+    assert told == ["plugins"]
+    assert reg.status("plugins") == FAILED
+    assert reg.errors["plugins"].startswith("JSONDecodeError")
+    assert not reg.snapshots["plugins"].path.exists()
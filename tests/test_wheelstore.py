@@ -0,0 +1,69 @@
+import json
+import os
+from pathlib import Path
+import time
+
+import pytest
+
+from nonebot_desktop_tk.wheelstore import STALE_PIN, StoreSettings, WheelStore
+
+
+@pytest.fixture
+def store(tmp_path: Path) -> WheelStore:
+    store = WheelStore(tmp_path / "store", tmp_path / "wheelstore.json")
+    store.settings = StoreSettings(True, 1 << 20)
+    return store
+
+
+def fetched(tmp_path: Path, *files) -> Path:
+    # wheels as `pip wheel` leaves them
+    incoming = tmp_path / f"incoming-{time.monotonic_ns()}"
+    incoming.mkdir()
+    for name, size in files:
+        (incoming / name).write_bytes(os.urandom(size))
+    return incoming
+
+
+def linked(store: WheelStore):
+    return sorted(p.name for p in store.links.iterdir())
+
+
+def test_pinned_wheels_beyond_cap(store, tmp_path):
+    big = ("big-1.0-py3-none-any.whl", 2 << 20)
+    assert store.ingest(fetched(tmp_path, big), "run") == (0, 1, 0)
+    assert linked(store) == [big[0]]
+    # another process clearing or evicting does not take them away
+    store.clear()
+    store.evict()
+    assert linked(store) == [big[0]]
+    store.unpin("run")
+    assert linked(store) == []
+    assert store.stats().evicted == 1
+
+
+def test_unpinned_ingest_evicts(store, tmp_path):
+    store.ingest(fetched(tmp_path, ("big-1.0-py3-none-any.whl", 2 << 20)))
+    assert linked(store) == []
+
+
+def test_eviction_skips_pinned(store, tmp_path):
+    store.ingest(fetched(tmp_path, ("old-1.0-py3-none-any.whl", 600 << 10)))
+    store.ingest(fetched(tmp_path, ("new-1.0-py3-none-any.whl", 600 << 10)), "run")
+    assert linked(store) == ["new-1.0-py3-none-any.whl"]
+    # a hit is pinned again by a later run
+    incoming = fetched(tmp_path)
+    os.link(store.links / "new-1.0-py3-none-any.whl", incoming / "new-1.0-py3-none-any.whl")
+    store.unpin("run")
+    assert store.ingest(incoming, "again")[0] == 1
+    store.clear()
+    assert linked(store) == ["new-1.0-py3-none-any.whl"]
+
+
+def test_stale_pins_expire(store, tmp_path):
+    store.ingest(fetched(tmp_path, ("big-1.0-py3-none-any.whl", 2 << 20)), "killed")
+    data = json.loads(store.indexfile.read_text(encoding="utf-8"))
+    data["pins"]["killed"]["time"] -= STALE_PIN + 1
+    store.indexfile.write_text(json.dumps(data), encoding="utf-8")
+    store.evict()
+    assert linked(store) == []
+    assert json.loads(store.indexfile.read_text(encoding="utf-8"))["pins"] == {}